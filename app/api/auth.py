@@ -5,6 +5,7 @@ from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Request,
     Response,
     status,
 )
@@ -14,6 +15,7 @@ from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
 from app.api.deps import DbSession
+from app.api.routing import ObservedAPIRoute
 from app.db.redis import get_redis
 from app.services.auth import (
     AuthenticatedSession,
@@ -22,9 +24,14 @@ from app.services.auth import (
     logout_session,
     resolve_session,
 )
+from app.services.credential_pool import CredentialPoolBusyError
+from app.services.login_throttle import (
+    LoginThrottledError,
+    login_client_address,
+)
 
 
-router = APIRouter()
+router = APIRouter(route_class=ObservedAPIRoute)
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/auth/token",
     auto_error=False,
@@ -117,11 +124,36 @@ async def get_authenticated_session(
             }
         },
         **AUTH_ERROR_RESPONSES,
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            "model": ErrorResponse,
+            "description": "Too many sign-in attempts",
+            "headers": {
+                "Retry-After": {
+                    "description": "Seconds until another attempt is allowed",
+                    "schema": {"type": "integer", "example": 30},
+                }
+            },
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "model": ErrorResponse,
+            "description": (
+                "Session store unavailable or credential workers saturated"
+            ),
+            "headers": {
+                "Retry-After": {
+                    "description": (
+                        "Seconds to wait when credential workers are saturated"
+                    ),
+                    "schema": {"type": "integer", "example": 1},
+                }
+            },
+        },
     },
     summary="Sign in with an internal account",
 )
 async def create_token(
     form: Annotated[OAuth2PasswordRequestForm, Depends()],
+    request: Request,
     response: Response,
     db: DbSession,
     redis: Annotated[Redis, Depends(get_redis)],
@@ -132,9 +164,25 @@ async def create_token(
             redis,
             auth_id=form.username,
             password=form.password,
+            client_address=login_client_address(
+                request.client.host if request.client is not None else None,
+                request.headers.get("x-forwarded-for"),
+            ),
         )
     except AuthenticationError as exc:
         raise unauthorized_exception() from exc
+    except LoginThrottledError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-in attempts",
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        ) from exc
+    except CredentialPoolBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service busy",
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        ) from exc
     except RedisError as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
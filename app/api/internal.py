@@ -0,0 +1,130 @@
+import hmac
+import os
+from dataclasses import asdict
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from pydantic import BaseModel
+
+from app.api.routing import ObservedAPIRoute
+from app.core.config import get_settings
+from app.core.metrics import METRICS_CONTENT_TYPE, render_metrics
+from app.db.mysql import query_stats, query_trace
+from app.db.query_stats import QueryStatsOrder
+
+
+INTERNAL_TOKEN_HEADER = "X-Internal-Token"
+
+
+def require_internal_token(
+    token: Annotated[str | None, Header(alias=INTERNAL_TOKEN_HEADER)] = None,
+) -> None:
+    expected = get_settings().INTERNAL_API_TOKEN
+    if (
+        token is None
+        or expected is None
+        or not expected.get_secret_value()
+        or not hmac.compare_digest(
+            token.encode("utf-8"),
+            expected.get_secret_value().encode("utf-8"),
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+
+
+router = APIRouter(
+    route_class=ObservedAPIRoute,
+    dependencies=[Depends(require_internal_token)],
+    include_in_schema=False,
+)
+
+
+class StatementStatsResponse(BaseModel):
+    sql_hash: str
+    operation: str
+    sql_length: int
+    count: int
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    rows: int
+    slow_count: int
+
+
+class QueryStatsResponse(BaseModel):
+    worker_pid: int
+    statements_tracked: int
+    statements_evicted: int
+    statements: list[StatementStatsResponse]
+
+
+class QueryTraceResponse(BaseModel):
+    request_id: str
+    method: str
+    path: str
+    sql_hash: str
+    operation: str
+    statement: str
+    duration_ms: float
+    rowcount: int | None
+    recorded_at: float
+
+
+class QueryTracesResponse(BaseModel):
+    worker_pid: int
+    traces: list[QueryTraceResponse]
+
+
+@router.get("/metrics", response_class=Response)
+async def read_metrics() -> Response:
+    return Response(
+        content=render_metrics(),
+        media_type=METRICS_CONTENT_TYPE,
+    )
+
+
+@router.get("/query-stats", response_model=QueryStatsResponse)
+async def read_query_stats(
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+    order_by: QueryStatsOrder = "total",
+) -> QueryStatsResponse:
+    return QueryStatsResponse(
+        worker_pid=os.getpid(),
+        statements_tracked=query_stats.tracked(),
+        statements_evicted=query_stats.evicted,
+        statements=[
+            StatementStatsResponse(**asdict(snapshot))
+            for snapshot in query_stats.top(limit=limit, order_by=order_by)
+        ],
+    )
+
+
+@router.get("/query-traces", response_model=QueryTracesResponse)
+async def read_query_traces(
+    limit: Annotated[int, Query(ge=1, le=10000)] = 100,
+    request_id: str | None = None,
+) -> QueryTracesResponse:
+    return QueryTracesResponse(
+        worker_pid=os.getpid(),
+        traces=[
+            QueryTraceResponse(**asdict(entry))
+            for entry in query_trace.entries(
+                limit=limit,
+                request_id=request_id,
+            )
+        ],
+    )
@@ -4,13 +4,14 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.api.auth import router as auth_router
+from app.api.routing import ObservedAPIRoute
 
 
 class PingResponse(BaseModel):
     status: Literal["ok"]
 
 
-api_router = APIRouter()
+api_router = APIRouter(route_class=ObservedAPIRoute)
 api_router.include_router(
     auth_router,
     prefix="/api/auth",
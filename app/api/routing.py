@@ -0,0 +1,40 @@
+import inspect
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from fastapi.routing import APIRoute
+
+from app.core.request_context import mark_handler_finished
+
+
+def _observe_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def observed_async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark_handler_finished()
+
+        return observed_async_endpoint
+
+    @wraps(endpoint)
+    def observed_endpoint(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            mark_handler_finished()
+
+    return observed_endpoint
+
+
+class ObservedAPIRoute(APIRoute):
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable[..., Any],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(path, _observe_endpoint(endpoint), **kwargs)
@@ -1,26 +1,60 @@
 import asyncio
+import json
 from collections.abc import Awaitable, Callable
 from typing import Any
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
 
 import typer
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.mysql import close_database, session_factory
+from app.api.internal import INTERNAL_TOKEN_HEADER
+from app.core.config import get_settings
+from app.core.logging import LOG_FORMATS, benchmark_log_format
+from app.db.mysql import close_database, commit, session_factory
+from app.db.query_stats import QueryStatsOrder
 from app.db.redis import close_redis, create_redis_client
 from app.services.auth import (
     AccountAlreadyExistsError,
     AccountNotFoundError,
     AuthenticationError,
+    benchmark_identity_lookup,
     create_internal_user,
     disable_internal_user,
     enable_internal_user,
     inspect_session,
     reset_internal_password,
 )
+from app.services.credentials import (
+    CredentialParameters,
+    CredentialScheme,
+    benchmark_credential_cost,
+    recommend_credential_cost,
+)
+from app.services.session_codec import (
+    SESSION_ENCODINGS,
+    benchmark_session_encoding,
+)
+from app.services.session_reaper import reap_stale_sessions
+from app.services.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionStoreKind,
+    benchmark_session_store,
+)
 
 
 cli = typer.Typer(no_args_is_help=True)
+BENCHMARK_COST_RANGES: dict[CredentialScheme, tuple[int, int]] = {
+    "bcrypt": (10, 14),
+    "scrypt": (12, 17),
+}
+COST_SETTINGS: dict[CredentialScheme, str] = {
+    "bcrypt": "AUTH_BCRYPT_ROUNDS",
+    "scrypt": "AUTH_SCRYPT_LOG_N",
+}
 
 
 async def _run_with_database(
@@ -33,13 +67,27 @@ async def _run_with_database(
         await close_database()
 
 
+async def _run_with_redis(
+    operation: Callable[[Redis], Awaitable[Any]],
+) -> Any:
+    redis = create_redis_client()
+    try:
+        return await operation(redis)
+    finally:
+        await redis.aclose()
+        await close_redis()
+        await close_database()
+
+
 async def _run_with_database_and_redis(
     operation: Callable[[AsyncSession, Redis], Awaitable[Any]],
 ) -> Any:
     redis = create_redis_client()
     try:
-        async with session_factory.begin() as db:
-            return await operation(db, redis)
+        async with session_factory() as db:
+            result = await operation(db, redis)
+            await commit(db)
+            return result
     finally:
         await redis.aclose()
         await close_redis()
@@ -85,15 +133,16 @@ def create_user_command(
 def reset_password_command(username: str) -> None:
     password = _password_prompt()
 
-    async def operation(db: AsyncSession) -> Any:
+    async def operation(db: AsyncSession, redis: Redis) -> Any:
         return await reset_internal_password(
             db,
+            redis,
             auth_id=username,
             password=password,
         )
 
     try:
-        user = asyncio.run(_run_with_database(operation))
+        user = asyncio.run(_run_with_database_and_redis(operation))
     except (AccountNotFoundError, ValueError) as exc:
         _exit_with_error(exc)
     typer.echo(f"Reset password for user id={user.id}")
@@ -101,11 +150,11 @@ def reset_password_command(username: str) -> None:
 
 @cli.command("disable-user")
 def disable_user_command(username: str) -> None:
-    async def operation(db: AsyncSession) -> Any:
-        return await disable_internal_user(db, auth_id=username)
+    async def operation(db: AsyncSession, redis: Redis) -> Any:
+        return await disable_internal_user(db, redis, auth_id=username)
 
     try:
-        user = asyncio.run(_run_with_database(operation))
+        user = asyncio.run(_run_with_database_and_redis(operation))
     except (AccountNotFoundError, ValueError) as exc:
         _exit_with_error(exc)
     typer.echo(f"Disabled user id={user.id}")
@@ -113,11 +162,11 @@ def disable_user_command(username: str) -> None:
 
 @cli.command("enable-user")
 def enable_user_command(username: str) -> None:
-    async def operation(db: AsyncSession) -> Any:
-        return await enable_internal_user(db, auth_id=username)
+    async def operation(db: AsyncSession, redis: Redis) -> Any:
+        return await enable_internal_user(db, redis, auth_id=username)
 
     try:
-        user = asyncio.run(_run_with_database(operation))
+        user = asyncio.run(_run_with_database_and_redis(operation))
     except (AccountNotFoundError, ValueError) as exc:
         _exit_with_error(exc)
     typer.echo(f"Enabled user id={user.id}")
@@ -145,5 +194,243 @@ def inspect_session_command() -> None:
         typer.echo(f"created_at={inspection.created_at}")
 
 
+@cli.command("reap-sessions")
+def reap_sessions_command(
+    batch_size: int = typer.Option(500, "--batch-size", min=1),
+    max_keys_per_second: float = typer.Option(
+        5000.0,
+        "--max-keys-per-second",
+        min=1,
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run"),
+) -> None:
+    async def operation(redis: Redis) -> Any:
+        # The reaper opens a short database session per batch.
+        return await reap_stale_sessions(
+            session_factory,
+            redis,
+            batch_size=batch_size,
+            max_keys_per_second=max_keys_per_second,
+            dry_run=dry_run,
+        )
+
+    result = asyncio.run(_run_with_redis(operation))
+    typer.echo(f"scanned={result.scanned}")
+    typer.echo(f"reaped={result.reaped}")
+    typer.echo(f"bytes_reclaimed={result.bytes_reclaimed}")
+    typer.echo(f"dry_run={str(dry_run).lower()}")
+
+
+@cli.command("benchmark-credential")
+def benchmark_credential_command(
+    scheme: CredentialScheme = typer.Option("bcrypt", "--scheme"),
+    min_cost: int | None = typer.Option(None, "--min-cost"),
+    max_cost: int | None = typer.Option(None, "--max-cost"),
+    target_ms: float = typer.Option(250.0, "--target-ms", min=1),
+    samples: int = typer.Option(3, "--samples", min=1),
+) -> None:
+    default_min, default_max = BENCHMARK_COST_RANGES[scheme]
+    first_cost = min_cost if min_cost is not None else default_min
+    last_cost = max_cost if max_cost is not None else default_max
+    if first_cost > last_cost:
+        _exit_with_error(ValueError("min-cost must not exceed max-cost"))
+
+    settings = get_settings()
+    is_scrypt = scheme == "scrypt"
+    results = []
+    for cost in range(first_cost, last_cost + 1):
+        parameters = CredentialParameters(
+            scheme=scheme,
+            cost=cost,
+            block_size=settings.AUTH_SCRYPT_BLOCK_SIZE if is_scrypt else None,
+            parallelism=settings.AUTH_SCRYPT_PARALLELISM if is_scrypt else None,
+        )
+        try:
+            result = benchmark_credential_cost(parameters, samples=samples)
+        except ValueError as exc:
+            _exit_with_error(exc)
+        results.append(result)
+        typer.echo(
+            f"scheme={scheme} cost={cost} "
+            f"median_ms={result.median_seconds * 1000:.1f} "
+            f"max_ms={result.max_seconds * 1000:.1f}"
+        )
+
+    recommended = recommend_credential_cost(
+        results,
+        target_seconds=target_ms / 1000,
+    )
+    if recommended is None:
+        typer.echo(f"recommended_cost=none target_ms={target_ms:g}")
+        return
+    typer.echo(f"recommended_cost={recommended.cost} target_ms={target_ms:g}")
+    typer.echo(f"AUTH_CREDENTIAL_SCHEME={scheme}")
+    typer.echo(f"{COST_SETTINGS[scheme]}={recommended.cost}")
+
+
+@cli.command("benchmark-session-encoding")
+def benchmark_session_encoding_command(
+    sessions: int = typer.Option(100000, "--sessions", min=1),
+) -> None:
+    for encoding in SESSION_ENCODINGS:
+        result = benchmark_session_encoding(encoding, sessions=sessions)
+        typer.echo(
+            f"encoding={encoding} "
+            f"key_bytes={result.key_bytes:.1f} "
+            f"payload_bytes={result.payload_bytes:.1f} "
+            f"bytes_per_session={result.bytes_per_session:.1f} "
+            f"decodes_per_second={result.decodes_per_second:.0f}"
+        )
+
+
+@cli.command("benchmark-log-format")
+def benchmark_log_format_command(
+    records: int = typer.Option(100000, "--records", min=1),
+) -> None:
+    for log_format in LOG_FORMATS:
+        result = benchmark_log_format(log_format, records=records)
+        typer.echo(
+            f"log_format={log_format} "
+            f"records_per_second={result.records_per_second:.0f} "
+            f"bytes_per_record={result.bytes_per_record:.1f}"
+        )
+
+
+@cli.command("benchmark-session-store")
+def benchmark_session_store_command(
+    store: SessionStoreKind = typer.Option("memory", "--store"),
+    sessions: int = typer.Option(10000, "--sessions", min=1),
+) -> None:
+    async def run() -> Any:
+        if store == "memory":
+            return await benchmark_session_store(
+                MemorySessionStore(),
+                name=store,
+                sessions=sessions,
+            )
+        redis = create_redis_client()
+        try:
+            return await benchmark_session_store(
+                RedisSessionStore(redis),
+                name=store,
+                sessions=sessions,
+            )
+        finally:
+            await redis.aclose()
+            await close_redis()
+
+    result = asyncio.run(run())
+    typer.echo(
+        f"store={result.store} "
+        f"writes_per_second={result.writes_per_second:.0f} "
+        f"reads_per_second={result.reads_per_second:.0f}"
+    )
+
+
+@cli.command("benchmark-identity-lookup")
+def benchmark_identity_lookup_command(
+    username: str,
+    lookups: int = typer.Option(1000, "--lookups", min=1),
+) -> None:
+    async def operation(db: AsyncSession) -> Any:
+        return await benchmark_identity_lookup(
+            db,
+            auth_id=username,
+            lookups=lookups,
+        )
+
+    try:
+        results = asyncio.run(_run_with_database(operation))
+    except (AccountNotFoundError, ValueError) as exc:
+        _exit_with_error(exc)
+    for result in results:
+        typer.echo(
+            f"path={result.path} "
+            f"us_per_lookup={result.microseconds_per_lookup:.1f} "
+            f"compiled_cache_hits={result.cache_hits} "
+            f"compiled_cache_misses={result.cache_misses}"
+        )
+
+
+def _fetch_internal(base_url: str, path: str, **query: Any) -> Any:
+    token = get_settings().INTERNAL_API_TOKEN
+    if token is None or not token.get_secret_value():
+        raise ValueError("INTERNAL_API_TOKEN is not configured")
+    request = Request(
+        f"{base_url.rstrip('/')}/internal/{path}?{urlencode(query)}",
+        headers={INTERNAL_TOKEN_HEADER: token.get_secret_value()},
+    )
+    try:
+        with urlopen(request, timeout=10) as response:
+            return json.load(response)
+    except URLError as exc:
+        raise ValueError(f"could not reach {base_url}: {exc}") from exc
+
+
+@cli.command("query-stats")
+def query_stats_command(
+    url: str = typer.Option("http://127.0.0.1:8000", "--url"),
+    limit: int = typer.Option(20, "--limit", min=1, max=500),
+    order_by: QueryStatsOrder = typer.Option("total", "--order-by"),
+) -> None:
+    try:
+        stats = _fetch_internal(
+            url,
+            "query-stats",
+            limit=limit,
+            order_by=order_by,
+        )
+    except ValueError as exc:
+        _exit_with_error(exc)
+
+    typer.echo(
+        f"worker_pid={stats['worker_pid']} "
+        f"statements_tracked={stats['statements_tracked']} "
+        f"statements_evicted={stats['statements_evicted']}"
+    )
+    for statement in stats["statements"]:
+        typer.echo(
+            f"sql_hash={statement['sql_hash']} "
+            f"operation={statement['operation']} "
+            f"count={statement['count']} "
+            f"total_ms={statement['total_ms']:.2f} "
+            f"mean_ms={statement['mean_ms']:.2f} "
+            f"p50_ms={statement['p50_ms']:.2f} "
+            f"p95_ms={statement['p95_ms']:.2f} "
+            f"p99_ms={statement['p99_ms']:.2f} "
+            f"max_ms={statement['max_ms']:.2f} "
+            f"rows={statement['rows']} "
+            f"slow={statement['slow_count']}"
+        )
+
+
+@cli.command("query-traces")
+def query_traces_command(
+    url: str = typer.Option("http://127.0.0.1:8000", "--url"),
+    limit: int = typer.Option(100, "--limit", min=1, max=10000),
+    request_id: str | None = typer.Option(None, "--request-id"),
+) -> None:
+    query: dict[str, Any] = {"limit": limit}
+    if request_id is not None:
+        query["request_id"] = request_id
+    try:
+        traces = _fetch_internal(url, "query-traces", **query)
+    except ValueError as exc:
+        _exit_with_error(exc)
+
+    typer.echo(f"worker_pid={traces['worker_pid']}")
+    for trace in traces["traces"]:
+        rowcount = trace["rowcount"]
+        typer.echo(
+            f"request_id={trace['request_id']} "
+            f"method={trace['method']} "
+            f"path={trace['path']!r} "
+            f"sql_hash={trace['sql_hash']} "
+            f"duration_ms={trace['duration_ms']:.2f} "
+            f"rowcount={rowcount if rowcount is not None else '-'} "
+            f"sql={trace['statement']!r}"
+        )
+
+
 if __name__ == "__main__":
     cli()
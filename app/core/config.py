@@ -1,7 +1,9 @@
 import os
 from functools import lru_cache
+from ipaddress import IPv4Network, IPv6Network, ip_network
+from typing import Literal
 
-from pydantic import Field, SecretStr
+from pydantic import Field, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy.engine import URL
 
@@ -11,21 +13,89 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     LOG_LEVEL: str = "info"
+    LOG_QUEUE_SIZE: int = Field(default=0, ge=0)
+    LOG_QUEUE_OVERFLOW: Literal["drop", "block"] = "drop"
+    LOG_FORMAT: Literal["text", "json"] = "text"
 
     DB_HOST: str
     DB_PORT: int = 3306
     DB_USER: str
     DB_PASSWORD: SecretStr
     DB_NAME: str
+    DB_REPLICA_HOSTS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = Field(default=1.0, ge=0)
+    DB_REPLICA_LAG_CHECK_SECONDS: float = Field(default=5.0, gt=0)
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_POOL_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, gt=0)
+    DB_POOL_ADAPTIVE_ENABLED: bool = False
+    DB_POOL_MIN_SIZE: int = Field(default=2, ge=1)
+    DB_POOL_MAX_SIZE: int = Field(default=20, ge=1)
+    DB_POOL_WAIT_THRESHOLD_SECONDS: float = Field(default=0.005, ge=0)
+    DB_POOL_MONITOR_INTERVAL_SECONDS: float = Field(default=30.0, gt=0)
+    DB_POOL_VALIDATION: Literal["pre_ping", "background"] = "pre_ping"
+    DB_POOL_VALIDATION_INTERVAL_SECONDS: float = Field(default=30.0, gt=0)
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=3600, ge=0)
+    DB_WAIT_TIMEOUT_SECONDS: int = Field(default=28800, ge=1)
 
     REDIS_HOST: str
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: SecretStr
     REDIS_DB: int = 0
+    REDIS_CLIENT_CACHE_ENABLED: bool = False
+    REDIS_CLIENT_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1)
 
     AUTH_SESSION_TTL_SECONDS: int = Field(default=604800, ge=1)
+    AUTH_CREDENTIAL_EXECUTOR: Literal["thread", "process"] = "thread"
+    AUTH_CREDENTIAL_MAX_WORKERS: int = Field(default=4, ge=1)
+    AUTH_CREDENTIAL_MAX_PENDING: int = Field(default=32, ge=0)
+    AUTH_CREDENTIAL_RETRY_AFTER_SECONDS: int = Field(default=1, ge=1)
+    AUTH_CREDENTIAL_SCHEME: Literal["bcrypt", "scrypt"] = "bcrypt"
+    AUTH_BCRYPT_ROUNDS: int = Field(default=12, ge=4, le=31)
+    AUTH_SCRYPT_LOG_N: int = Field(default=15, ge=10, le=24)
+    AUTH_SCRYPT_BLOCK_SIZE: int = Field(default=8, ge=1, le=64)
+    AUTH_SCRYPT_PARALLELISM: int = Field(default=1, ge=1, le=16)
+    AUTH_MAX_SESSIONS_PER_USER: int = Field(default=0, ge=0)
+    AUTH_SESSION_STORE: Literal["redis", "memory"] = "redis"
+    AUTH_SESSION_VALIDATION: Literal["standard", "script"] = "standard"
+    AUTH_SESSION_ENCODING: Literal["json", "compact"] = "json"
+    AUTH_SESSION_DUAL_READ: bool = False
+    AUTH_TOKEN_FORMAT: Literal["opaque", "signed"] = "opaque"
+    AUTH_TOKEN_SIGNING_KEY: SecretStr | None = None
+    AUTH_SIGNED_TOKEN_REFRESH_SECONDS: float = Field(default=5.0, gt=0)
+    AUTH_SESSION_SLIDING_ENABLED: bool = False
+    AUTH_SESSION_REFRESH_THRESHOLD_SECONDS: int = Field(default=518400, ge=1)
+    AUTH_SESSION_REFRESH_BATCH_DELAY_SECONDS: float = Field(default=0.05, ge=0)
+    AUTH_USER_SNAPSHOT_ENABLED: bool = False
+    AUTH_USER_SNAPSHOT_TTL_SECONDS: int = Field(default=3600, ge=1)
+    AUTH_SESSION_CACHE_ENABLED: bool = False
+    AUTH_SESSION_CACHE_TTL_SECONDS: float = Field(default=5.0, gt=0)
+    AUTH_SESSION_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1)
+    AUTH_LOGIN_THROTTLE_ENABLED: bool = True
+    AUTH_LOGIN_THROTTLE_WINDOW_SECONDS: int = Field(default=60, ge=1)
+    AUTH_LOGIN_MAX_ATTEMPTS_PER_USERNAME: int = Field(default=10, ge=1)
+    AUTH_LOGIN_MAX_ATTEMPTS_PER_CLIENT: int = Field(default=100, ge=1)
+    AUTH_TRUSTED_PROXIES: str = ""
 
     DB_SLOW_QUERY_THRESHOLD_SECONDS: float = Field(default=2.0, ge=0)
+    DB_SLOW_QUERY_SUMMARY_INTERVAL_SECONDS: float = Field(default=0.0, ge=0)
+    DB_SLOW_QUERY_ADAPTIVE_ENABLED: bool = False
+    DB_SLOW_QUERY_ADAPTIVE_MULTIPLIER: float = Field(default=4.0, gt=1)
+    DB_SLOW_QUERY_ADAPTIVE_MIN_SAMPLES: int = Field(default=100, ge=1)
+    DB_SLOW_QUERY_ADAPTIVE_FLOOR_SECONDS: float = Field(default=0.05, ge=0)
+    DB_SLOW_QUERY_EXPLAIN_ENABLED: bool = False
+    DB_SLOW_QUERY_EXPLAIN_MAX_PLANS: int = Field(default=500, ge=1)
+    DB_SLOW_QUERY_EXPLAIN_MIN_INTERVAL_SECONDS: float = Field(
+        default=1.0,
+        ge=0,
+    )
+    DB_QUERY_STATS_MAX_STATEMENTS: int = Field(default=500, ge=1)
+    DB_QUERY_TRACE_SAMPLE_RATE: float = Field(default=0.0, ge=0, le=1)
+    DB_QUERY_TRACE_BUFFER_SIZE: int = Field(default=1000, ge=1)
+    DB_REQUEST_QUERY_BUDGET: int = Field(default=0, ge=0)
+    DB_REQUEST_REPEATED_STATEMENT_LIMIT: int = Field(default=0, ge=0)
+
+    INTERNAL_API_TOKEN: SecretStr | None = None
 
     model_config = SettingsConfigDict(
         env_file=f".env.{os.getenv('APP_ENV', 'development')}",
@@ -33,6 +103,75 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def require_token_signing_key(self) -> "Settings":
+        signing_key = self.AUTH_TOKEN_SIGNING_KEY
+        if self.AUTH_TOKEN_FORMAT == "signed" and (
+            signing_key is None or len(signing_key.get_secret_value()) < 32
+        ):
+            raise ValueError(
+                "AUTH_TOKEN_SIGNING_KEY must be at least 32 characters "
+                "when AUTH_TOKEN_FORMAT is signed"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def require_redis_session_store_for_scripts(self) -> "Settings":
+        if (
+            self.AUTH_SESSION_STORE != "redis"
+            and self.AUTH_SESSION_VALIDATION == "script"
+        ):
+            raise ValueError(
+                "AUTH_SESSION_VALIDATION=script requires "
+                "AUTH_SESSION_STORE=redis"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def require_ordered_pool_bounds(self) -> "Settings":
+        if self.DB_POOL_ADAPTIVE_ENABLED and not (
+            self.DB_POOL_MIN_SIZE <= self.DB_POOL_SIZE <= self.DB_POOL_MAX_SIZE
+        ):
+            raise ValueError(
+                "DB_POOL_SIZE must be between DB_POOL_MIN_SIZE and "
+                "DB_POOL_MAX_SIZE when DB_POOL_ADAPTIVE_ENABLED is true"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def require_validation_within_wait_timeout(self) -> "Settings":
+        if (
+            self.DB_POOL_VALIDATION == "background"
+            and self.DB_WAIT_TIMEOUT_SECONDS
+            <= 3 * self.DB_POOL_VALIDATION_INTERVAL_SECONDS
+        ):
+            raise ValueError(
+                "DB_WAIT_TIMEOUT_SECONDS must exceed three times "
+                "DB_POOL_VALIDATION_INTERVAL_SECONDS when "
+                "DB_POOL_VALIDATION is background"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def require_internal_api_token_length(self) -> "Settings":
+        token = self.INTERNAL_API_TOKEN
+        if token is not None and 0 < len(token.get_secret_value()) < 32:
+            raise ValueError(
+                "INTERNAL_API_TOKEN must be empty or at least 32 characters"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def require_valid_trusted_proxies(self) -> "Settings":
+        try:
+            self.trusted_proxy_networks
+        except ValueError as exc:
+            raise ValueError(
+                "AUTH_TRUSTED_PROXIES must be comma-separated IP addresses "
+                "or networks"
+            ) from exc
+        return self
+
     @property
     def allowed_origins(self) -> list[str]:
         return [
@@ -42,17 +181,37 @@ class Settings(BaseSettings):
         ]
 
     @property
-    def database_url(self) -> URL:
+    def trusted_proxy_networks(self) -> list[IPv4Network | IPv6Network]:
+        return [
+            ip_network(proxy.strip(), strict=False)
+            for proxy in self.AUTH_TRUSTED_PROXIES.split(",")
+            if proxy.strip()
+        ]
+
+    def _mysql_url(self, host: str, port: int) -> URL:
         return URL.create(
             drivername="mysql+aiomysql",
             username=self.DB_USER,
             password=self.DB_PASSWORD.get_secret_value(),
-            host=self.DB_HOST,
-            port=self.DB_PORT,
+            host=host,
+            port=port,
             database=self.DB_NAME,
             query={"charset": "utf8mb4"},
         )
 
+    @property
+    def database_url(self) -> URL:
+        return self._mysql_url(self.DB_HOST, self.DB_PORT)
+
+    @property
+    def replica_database_urls(self) -> list[URL]:
+        urls = []
+        for replica in self.DB_REPLICA_HOSTS.split(","):
+            host, _, port = replica.strip().partition(":")
+            if host:
+                urls.append(self._mysql_url(host, int(port or self.DB_PORT)))
+        return urls
+
 
 @lru_cache
 def get_settings() -> Settings:
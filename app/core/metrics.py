@@ -0,0 +1,109 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+UNMATCHED_ROUTE = "unmatched"
+REQUEST_DURATION_BUCKETS_SECONDS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+REQUEST_LABELS = ("method", "route", "status_class")
+
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "HTTP requests by route template and status class",
+    REQUEST_LABELS,
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration by route template and status class",
+    REQUEST_LABELS,
+    buckets=REQUEST_DURATION_BUCKETS_SECONDS,
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped",
+    "Log records dropped because the log queue was full",
+)
+# Pool gauges are summed over live worker processes.
+POOL_SIZE = Gauge(
+    "pool_size",
+    "Idle connections each pool keeps",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+POOL_CHECKED_OUT = Gauge(
+    "pool_checked_out",
+    "Connections checked out of the pool",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "pool_overflow",
+    "Open connections above the pool size",
+    ("pool",),
+    multiprocess_mode="livesum",
+)
+POOL_WAIT_P95 = Gauge(
+    "pool_checkout_wait_p95_seconds",
+    "95th percentile checkout wait, as a bucket upper bound",
+    ("pool",),
+    multiprocess_mode="livemax",
+)
+
+
+def observe_request(
+    *,
+    method: str,
+    route: str,
+    status_code: int,
+    duration_seconds: float,
+) -> None:
+    labels = (method, route, f"{status_code // 100}xx")
+    HTTP_REQUESTS.labels(*labels).inc()
+    HTTP_REQUEST_DURATION.labels(*labels).observe(duration_seconds)
+
+
+def observe_pool(
+    *,
+    pool: str,
+    size: int,
+    checked_out: int,
+    overflow: int,
+    wait_p95_seconds: float,
+) -> None:
+    POOL_SIZE.labels(pool).set(size)
+    POOL_CHECKED_OUT.labels(pool).set(checked_out)
+    POOL_OVERFLOW.labels(pool).set(overflow)
+    POOL_WAIT_P95.labels(pool).set(wait_p95_seconds)
+
+
+def render_metrics() -> bytes:
+    directory = os.environ.get(MULTIPROCESS_DIR_ENV)
+    if not directory:
+        return generate_latest(REGISTRY)
+    # Every worker writes its own files; reading them all reports the
+    # whole process tree from whichever worker serves the scrape.
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=directory)
+    return generate_latest(registry)
@@ -1,5 +1,25 @@
+from collections import Counter
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from time import perf_counter
+
+
+PHASE_DATABASE = "db"
+PHASE_REDIS = "redis"
+PHASE_AUTH = "auth"
+PHASE_SERIALIZATION = "serialize"
+REQUEST_PHASES = (
+    PHASE_DATABASE,
+    PHASE_REDIS,
+    PHASE_AUTH,
+    PHASE_SERIALIZATION,
+)
+
+
+@dataclass
+class PhaseTiming:
+    seconds: float = 0.0
+    count: int = 0
 
 
 @dataclass
@@ -8,6 +28,20 @@ class RequestContext:
     method: str
     path: str
     session_fingerprint: str | None = None
+    phases: dict[str, PhaseTiming] = field(default_factory=dict)
+    statement_counts: Counter[str] = field(default_factory=Counter)
+    trace_queries: bool = False
+    # When the endpoint and its function-scoped dependencies finished;
+    # the rest of the time until the response starts is serialization.
+    handler_finished_at: float | None = None
+
+    def record_phase(self, phase: str, seconds: float, count: int = 1) -> None:
+        timing = self.phases.setdefault(phase, PhaseTiming())
+        timing.seconds += seconds
+        timing.count += count
+
+    def phase(self, phase: str) -> PhaseTiming:
+        return self.phases.get(phase, PhaseTiming())
 
 
 request_context: ContextVar[RequestContext | None] = ContextVar(
@@ -18,3 +52,15 @@ request_context: ContextVar[RequestContext | None] = ContextVar(
 
 def get_request_context() -> RequestContext | None:
     return request_context.get()
+
+
+def record_phase(phase: str, seconds: float, count: int = 1) -> None:
+    context = request_context.get()
+    if context is not None:
+        context.record_phase(phase, seconds, count)
+
+
+def mark_handler_finished() -> None:
+    context = request_context.get()
+    if context is not None:
+        context.handler_finished_at = perf_counter()
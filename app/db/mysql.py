@@ -1,36 +1,394 @@
-from collections.abc import AsyncIterator
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from time import monotonic, perf_counter
+from typing import Any
 
+from sqlalchemy import Executable, event, text
+from sqlalchemy.engine import URL, Result, Row
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
 
 from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.core.request_context import (
+    PHASE_DATABASE,
+    mark_handler_finished,
+    record_phase,
+)
+from app.db.pool import (
+    InstrumentedQueuePool,
+    MonitoredPool,
+    PoolMetrics,
+    log_pool_stats,
+    run_pool_monitor,
+    run_pool_validator,
+)
+from app.db.query_plans import QueryPlanCapture
+from app.db.query_stats import (
+    QueryStats,
+    log_slow_query_summaries,
+    run_slow_query_summaries,
+)
+from app.db.query_trace import QueryTraceBuffer
 from app.db.slow_query import install_slow_query_logging
+from app.db.statement_cache import (
+    compiled_cache_stats,
+    install_compiled_cache_metrics,
+)
 
 
+CONNECTION_LOGGER = logging.getLogger("app.db.connection")
+STATEMENT_CACHE_LOGGER = logging.getLogger("app.db.statement_cache")
+REPLICA_LOGGER = logging.getLogger("app.db.replica")
+HAS_WRITES_INFO_KEY = "has_writes"
+AFTER_COMMIT_INFO_KEY = "after_commit"
+REPLICA_LAG_CHECK_TIMEOUT_SECONDS = 1.0
 settings = get_settings()
-
-engine = create_async_engine(
-    settings.database_url,
-    pool_pre_ping=True,
+query_stats = QueryStats(
+    max_statements=settings.DB_QUERY_STATS_MAX_STATEMENTS,
+    summarize_slow_queries=settings.DB_SLOW_QUERY_SUMMARY_INTERVAL_SECONDS > 0,
+    adaptive_multiplier=(
+        settings.DB_SLOW_QUERY_ADAPTIVE_MULTIPLIER
+        if settings.DB_SLOW_QUERY_ADAPTIVE_ENABLED
+        else None
+    ),
+    adaptive_min_samples=settings.DB_SLOW_QUERY_ADAPTIVE_MIN_SAMPLES,
+    adaptive_floor_seconds=settings.DB_SLOW_QUERY_ADAPTIVE_FLOOR_SECONDS,
 )
-install_slow_query_logging(
-    engine.sync_engine,
-    threshold_seconds=settings.DB_SLOW_QUERY_THRESHOLD_SECONDS,
+query_plans = (
+    QueryPlanCapture(
+        max_plans=settings.DB_SLOW_QUERY_EXPLAIN_MAX_PLANS,
+        min_interval_seconds=(
+            settings.DB_SLOW_QUERY_EXPLAIN_MIN_INTERVAL_SECONDS
+        ),
+    )
+    if settings.DB_SLOW_QUERY_EXPLAIN_ENABLED
+    else None
 )
+query_trace = QueryTraceBuffer(size=settings.DB_QUERY_TRACE_BUFFER_SIZE)
+
+
+class PrimarySession(Session):
+    pass
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_flush_as_write(session: Session, _: UOWTransaction) -> None:
+    session.info[HAS_WRITES_INFO_KEY] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_statement_as_write(state: ORMExecuteState) -> None:
+    if not state.is_select or state.is_for_update:
+        state.session.info[HAS_WRITES_INFO_KEY] = True
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _discard_after_commit_hooks(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT_INFO_KEY, None)
+
+
+def after_commit(
+    db: AsyncSession,
+    hook: Callable[[], Awaitable[None]],
+) -> None:
+    db.info.setdefault(AFTER_COMMIT_INFO_KEY, []).append(hook)
+
+
+async def _run_after_commit_hooks(db: AsyncSession) -> None:
+    for hook in db.info.pop(AFTER_COMMIT_INFO_KEY, []):
+        await hook()
+
+
+async def commit(db: AsyncSession) -> None:
+    await db.commit()
+    await _run_after_commit_hooks(db)
+
+
+def _create_engine(url: URL, *, pool_name: str) -> AsyncEngine:
+    adaptive = settings.DB_POOL_ADAPTIVE_ENABLED
+    created = create_async_engine(
+        url,
+        # Background validation keeps idle connections alive instead.
+        pool_pre_ping=settings.DB_POOL_VALIDATION == "pre_ping",
+        poolclass=InstrumentedQueuePool,
+        pool_size=(
+            settings.DB_POOL_MAX_SIZE if adaptive else settings.DB_POOL_SIZE
+        ),
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    pool = created.sync_engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+    pool.configure(
+        metrics=PoolMetrics(pool_name),
+        min_size=settings.DB_POOL_MIN_SIZE if adaptive else pool.size(),
+        target_size=settings.DB_POOL_SIZE,
+    )
+    install_slow_query_logging(
+        created.sync_engine,
+        threshold_seconds=settings.DB_SLOW_QUERY_THRESHOLD_SECONDS,
+        query_stats=query_stats,
+        query_plans=query_plans,
+        query_trace=query_trace,
+    )
+    install_compiled_cache_metrics(created.sync_engine)
+    return created
+
+
+engine = _create_engine(settings.database_url, pool_name="mysql")
 session_factory = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
 )
 
+replica_engines = [
+    _create_engine(url, pool_name=f"mysql-replica:{url.host}:{url.port}")
+    for url in settings.replica_database_urls
+]
+replica_session_factory = async_sessionmaker(
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+async def _replica_lag_seconds(replica: AsyncEngine) -> float | None:
+    async with replica.connect() as connection:
+        status = (
+            (await connection.execute(text("SHOW REPLICA STATUS")))
+            .mappings()
+            .first()
+        )
+    if status is None:
+        return None
+    lag = status.get("Seconds_Behind_Source")
+    # NULL while replication is stopped or broken.
+    return float(lag) if lag is not None else None
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replicas: list[AsyncEngine],
+        *,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ) -> None:
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._healthy: list[AsyncEngine] = []
+        self._checked_at: float | None = None
+        self._check_lock = asyncio.Lock()
+        self._next_index = 0
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._checked_at is not None
+            and monotonic() - self._checked_at < self.check_interval_seconds
+        )
+
+    async def _measure(self, replica: AsyncEngine) -> float | None:
+        try:
+            return await asyncio.wait_for(
+                _replica_lag_seconds(replica),
+                REPLICA_LAG_CHECK_TIMEOUT_SECONDS,
+            )
+        except (SQLAlchemyError, OSError, TimeoutError):
+            REPLICA_LOGGER.warning(
+                "replica_lag_check_failed replica=%(replica)s",
+                LogFields(replica=replica.url.host),
+                exc_info=True,
+            )
+            return None
+
+    async def check(self) -> None:
+        lags = await asyncio.gather(
+            *(self._measure(replica) for replica in self.replicas)
+        )
+        self._healthy = [
+            replica
+            for replica, lag in zip(self.replicas, lags, strict=True)
+            if lag is not None and lag <= self.max_lag_seconds
+        ]
+        self._checked_at = monotonic()
+        if len(self._healthy) < len(self.replicas):
+            REPLICA_LOGGER.info(
+                "replica_routing healthy=%(healthy)d "
+                "configured=%(configured)d",
+                LogFields(
+                    healthy=len(self._healthy),
+                    configured=len(self.replicas),
+                ),
+            )
+
+    async def choose(self) -> AsyncEngine | None:
+        if not self.replicas:
+            return None
+        if not self._is_fresh():
+            async with self._check_lock:
+                if not self._is_fresh():
+                    await self.check()
+        if not self._healthy:
+            return None
+        self._next_index = (self._next_index + 1) % len(self._healthy)
+        return self._healthy[self._next_index]
+
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.DB_REPLICA_LAG_CHECK_SECONDS,
+)
+
+
+async def read_from_replica(
+    db: AsyncSession,
+    statement: Executable,
+    parameters: dict[str, Any] | None = None,
+) -> Sequence[Row[Any]] | None:
+    # Reads after a write in the same transaction must see that write.
+    if db.info.get(HAS_WRITES_INFO_KEY):
+        return None
+    replica = await replica_router.choose()
+    if replica is None:
+        return None
+    async with replica_session_factory(bind=replica) as replica_db:
+        return (await execute_read(replica_db, statement, parameters)).all()
+
+
+async def execute_read(
+    db: AsyncSession,
+    statement: Executable,
+    parameters: dict[str, Any] | None = None,
+) -> Result[Any]:
+    # Only a session's first statement can be replayed on a new connection;
+    # a disconnect later would lose the rest of the transaction.
+    replayable = not db.in_transaction()
+    try:
+        return await db.execute(statement, parameters)
+    except DBAPIError as exc:
+        if not (replayable and exc.connection_invalidated):
+            raise
+        CONNECTION_LOGGER.warning("stale_connection_read_retried")
+    await db.rollback()
+    return await db.execute(statement, parameters)
+
 
 async def get_db() -> AsyncIterator[AsyncSession]:
-    async with session_factory.begin() as session:
+    async with session_factory() as session:
         yield session
+        commit_started_at = perf_counter()
+        await session.commit()
+        record_phase(PHASE_DATABASE, perf_counter() - commit_started_at, 0)
+        await _run_after_commit_hooks(session)
+    mark_handler_finished()
+
+
+def database_pools() -> list[InstrumentedQueuePool]:
+    pools = []
+    for database in (engine, *replica_engines):
+        pool = database.sync_engine.pool
+        assert isinstance(pool, InstrumentedQueuePool)
+        pools.append(pool)
+    return pools
+
+
+def start_pool_monitor(*extra_pools: MonitoredPool) -> asyncio.Task[None]:
+    return asyncio.create_task(
+        run_pool_monitor(
+            lambda: [*database_pools(), *extra_pools],
+            interval_seconds=settings.DB_POOL_MONITOR_INTERVAL_SECONDS,
+            adaptive=settings.DB_POOL_ADAPTIVE_ENABLED,
+            wait_threshold_seconds=settings.DB_POOL_WAIT_THRESHOLD_SECONDS,
+        ),
+        name="pool-monitor",
+    )
+
+
+async def stop_pool_monitor(
+    task: asyncio.Task[None],
+    *extra_pools: MonitoredPool,
+) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    for pool in (*database_pools(), *extra_pools):
+        log_pool_stats(pool.stats())
+
+
+def start_pool_validator() -> asyncio.Task[None] | None:
+    if settings.DB_POOL_VALIDATION != "background":
+        return None
+    return asyncio.create_task(
+        run_pool_validator(
+            database_pools,
+            interval_seconds=settings.DB_POOL_VALIDATION_INTERVAL_SECONDS,
+            wait_timeout_seconds=settings.DB_WAIT_TIMEOUT_SECONDS,
+            recycle_seconds=settings.DB_POOL_RECYCLE_SECONDS,
+        ),
+        name="pool-validator",
+    )
+
+
+async def stop_pool_validator(task: asyncio.Task[None] | None) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def start_slow_query_summaries() -> asyncio.Task[None] | None:
+    if not query_stats.summarize_slow_queries:
+        return None
+    return asyncio.create_task(
+        run_slow_query_summaries(
+            query_stats,
+            interval_seconds=settings.DB_SLOW_QUERY_SUMMARY_INTERVAL_SECONDS,
+        ),
+        name="slow-query-summaries",
+    )
+
+
+async def stop_slow_query_summaries(task: asyncio.Task[None] | None) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    log_slow_query_summaries(query_stats)
 
 
 async def close_database() -> None:
+    stats = compiled_cache_stats()
+    STATEMENT_CACHE_LOGGER.info(
+        "compiled_cache hits=%(hits)d misses=%(misses)d "
+        "uncached=%(uncached)d hit_ratio=%(hit_ratio).3f",
+        LogFields(
+            hits=stats.hits,
+            misses=stats.misses,
+            uncached=stats.uncached,
+            hit_ratio=round(stats.hit_ratio, 3),
+        ),
+    )
+    if query_plans is not None:
+        await query_plans.close()
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
@@ -0,0 +1,393 @@
+import asyncio
+import logging
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from time import perf_counter, time
+from typing import Any, Protocol
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+from sqlalchemy.util import greenlet_spawn
+from sqlalchemy.util.queue import Empty, Full
+
+from app.core.logging import LogFields
+from app.core.metrics import observe_pool
+
+
+POOL_LOGGER = logging.getLogger("app.db.pool")
+CHECKED_OUT_AT_INFO_KEY = "checked_out_at"
+CHECKED_IN_AT_INFO_KEY = "checked_in_at"
+WAIT_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+HOLD_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class Histogram:
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, quantile: float) -> float:
+        # Reports the upper bound of the bucket holding the quantile.
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for bound, bucket_count in zip(
+            self.bounds, self.bucket_counts, strict=False
+        ):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+@dataclass(frozen=True)
+class PoolValidation:
+    pinged: int = 0
+    replaced: int = 0
+    dropped: int = 0
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    pool: str
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    wait_mean_seconds: float
+    wait_p95_seconds: float
+    hold_mean_seconds: float
+    hold_p95_seconds: float
+
+
+class PoolMetrics:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wait = Histogram(WAIT_BUCKETS_SECONDS)
+        self.hold = Histogram(HOLD_BUCKETS_SECONDS)
+        self.peak_checked_out = 0
+
+    def observe_checkout(
+        self,
+        wait_seconds: float,
+        *,
+        checked_out: int,
+    ) -> None:
+        self.wait.observe(wait_seconds)
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def observe_checkin(self, hold_seconds: float) -> None:
+        self.hold.observe(hold_seconds)
+
+    def stats(
+        self,
+        *,
+        size: int,
+        checked_out: int,
+        overflow: int,
+    ) -> PoolStats:
+        return PoolStats(
+            pool=self.name,
+            size=size,
+            checked_out=checked_out,
+            overflow=overflow,
+            checkouts=self.wait.count,
+            wait_mean_seconds=self.wait.mean(),
+            wait_p95_seconds=self.wait.quantile(0.95),
+            hold_mean_seconds=self.hold.mean(),
+            hold_p95_seconds=self.hold.quantile(0.95),
+        )
+
+
+class MonitoredPool(Protocol):
+    def stats(self) -> PoolStats: ...
+
+
+def export_pool_stats(stats: PoolStats) -> None:
+    observe_pool(
+        pool=stats.pool,
+        size=stats.size,
+        checked_out=stats.checked_out,
+        overflow=stats.overflow,
+        wait_p95_seconds=stats.wait_p95_seconds,
+    )
+
+
+def log_pool_stats(stats: PoolStats) -> None:
+    POOL_LOGGER.info(
+        "pool_stats pool=%(pool)s size=%(size)d checked_out=%(checked_out)d "
+        "overflow=%(overflow)d checkouts=%(checkouts)d "
+        "wait_mean_ms=%(wait_mean_ms).2f wait_p95_ms=%(wait_p95_ms).2f "
+        "hold_mean_ms=%(hold_mean_ms).2f hold_p95_ms=%(hold_p95_ms).2f",
+        LogFields(
+            pool=stats.pool,
+            size=stats.size,
+            checked_out=stats.checked_out,
+            overflow=stats.overflow,
+            checkouts=stats.checkouts,
+            wait_mean_ms=round(stats.wait_mean_seconds * 1000, 2),
+            wait_p95_ms=round(stats.wait_p95_seconds * 1000, 2),
+            hold_mean_ms=round(stats.hold_mean_seconds * 1000, 2),
+            hold_p95_ms=round(stats.hold_p95_seconds * 1000, 2),
+        ),
+    )
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # The queue holds up to size() idle connections; target_size is how
+    # many of them are kept, which adaptive sizing moves within bounds.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics(self._orig_logging_name or "mysql")
+        self.min_size = self.size()
+        self.target_size = self.size()
+        self._adjusted_checkouts = 0
+        self._adjusted_wait_seconds = 0.0
+
+    def configure(
+        self,
+        *,
+        metrics: PoolMetrics,
+        min_size: int,
+        target_size: int,
+    ) -> None:
+        self.metrics = metrics
+        self.min_size = min_size
+        self.target_size = target_size
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        assert isinstance(pool, InstrumentedQueuePool)
+        pool.configure(
+            metrics=self.metrics,
+            min_size=self.min_size,
+            target_size=self.target_size,
+        )
+        return pool
+
+    def open_connections(self) -> int:
+        return self.size() + self._overflow
+
+    def stats(self) -> PoolStats:
+        return self.metrics.stats(
+            size=self.target_size,
+            checked_out=self.checkedout(),
+            overflow=max(0, self.open_connections() - self.target_size),
+        )
+
+    def connect(self) -> Any:
+        started_at = perf_counter()
+        connection = super().connect()
+        checked_out_at = perf_counter()
+        connection.info[CHECKED_OUT_AT_INFO_KEY] = checked_out_at
+        self.metrics.observe_checkout(
+            checked_out_at - started_at,
+            checked_out=self.checkedout(),
+        )
+        return connection
+
+    def _close_record(self, record: ConnectionPoolEntry) -> None:
+        try:
+            record.close()
+        finally:
+            self._dec_overflow()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop(CHECKED_OUT_AT_INFO_KEY, None)
+        if checked_out_at is not None:
+            self.metrics.observe_checkin(perf_counter() - checked_out_at)
+        if self.checkedin() >= self.target_size:
+            self._close_record(record)
+            return
+        record.info[CHECKED_IN_AT_INFO_KEY] = time()
+        super()._do_return_conn(record)
+
+    def trim(self) -> int:
+        closed = 0
+        while self.checkedin() > self.target_size:
+            try:
+                record = self._pool.get(False)
+            except Empty:
+                break
+            self._close_record(record)
+            closed += 1
+        return closed
+
+    def _replace_record(
+        self,
+        record: ConnectionPoolEntry,
+    ) -> ConnectionPoolEntry | None:
+        record.close()
+        try:
+            return self._create_connection()
+        except Exception:
+            POOL_LOGGER.warning(
+                "pool_reconnect_failed pool=%(pool)s",
+                LogFields(pool=self.metrics.name),
+                exc_info=True,
+            )
+            self._dec_overflow()
+            return None
+
+    def validate_idle(
+        self,
+        *,
+        ping_after_seconds: float,
+        replace_after_seconds: float,
+        recycle_seconds: float,
+    ) -> PoolValidation:
+        # Each idle connection is taken out of the queue while it is checked,
+        # so requests never receive a connection that is being pinged.
+        pinged = replaced = dropped = 0
+        for _ in range(self.checkedin()):
+            try:
+                record = self._pool.get(False)
+            except Empty:
+                break
+            now = time()
+            idle_seconds = now - record.info.get(
+                CHECKED_IN_AT_INFO_KEY,
+                record.last_connect_time,
+            )
+            expired = (
+                record.dbapi_connection is None
+                or idle_seconds >= replace_after_seconds
+                or (
+                    recycle_seconds > 0
+                    and now - record.last_connect_time >= recycle_seconds
+                )
+            )
+            if not expired and idle_seconds >= ping_after_seconds:
+                pinged += 1
+                try:
+                    self._dialect.do_ping(record.dbapi_connection)
+                    record.info[CHECKED_IN_AT_INFO_KEY] = time()
+                except Exception:
+                    expired = True
+            if expired:
+                replacement = self._replace_record(record)
+                if replacement is None:
+                    dropped += 1
+                    continue
+                replaced += 1
+                replacement.info[CHECKED_IN_AT_INFO_KEY] = time()
+                record = replacement
+            try:
+                self._pool.put(record, False)
+            except Full:
+                # Check-ins during the ping refilled the queue; close the
+                # record like a check-in to a full pool would.
+                self._close_record(record)
+                dropped += 1
+        return PoolValidation(
+            pinged=pinged,
+            replaced=replaced,
+            dropped=dropped,
+        )
+
+    def adjust(self, *, wait_threshold_seconds: float) -> int:
+        checkouts = self.metrics.wait.count - self._adjusted_checkouts
+        waited = self.metrics.wait.sum - self._adjusted_wait_seconds
+        peak_checked_out = self.metrics.peak_checked_out
+        self._adjusted_checkouts = self.metrics.wait.count
+        self._adjusted_wait_seconds = self.metrics.wait.sum
+        self.metrics.peak_checked_out = self.checkedout()
+
+        target_size = self.target_size
+        if checkouts and waited / checkouts > wait_threshold_seconds:
+            target_size = min(
+                self.size(),
+                max(target_size + 1, peak_checked_out),
+            )
+        elif peak_checked_out < target_size:
+            target_size = max(self.min_size, target_size - 1)
+        if target_size != self.target_size:
+            POOL_LOGGER.info(
+                "pool_resized pool=%(pool)s from=%(from)d to=%(to)d "
+                "peak_checked_out=%(peak_checked_out)d",
+                LogFields(
+                    {
+                        "pool": self.metrics.name,
+                        "from": self.target_size,
+                        "to": target_size,
+                        "peak_checked_out": peak_checked_out,
+                    }
+                ),
+            )
+            self.target_size = target_size
+        self.trim()
+        return target_size
+
+
+async def run_pool_monitor(
+    pools: Callable[[], Sequence[MonitoredPool]],
+    *,
+    interval_seconds: float,
+    adaptive: bool,
+    wait_threshold_seconds: float,
+) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for pool in pools():
+            if adaptive and isinstance(pool, InstrumentedQueuePool):
+                # Trimming closes driver connections, which awaits.
+                await greenlet_spawn(
+                    pool.adjust,
+                    wait_threshold_seconds=wait_threshold_seconds,
+                )
+            stats = pool.stats()
+            log_pool_stats(stats)
+            export_pool_stats(stats)
+
+
+async def run_pool_validator(
+    pools: Callable[[], Sequence[InstrumentedQueuePool]],
+    *,
+    interval_seconds: float,
+    wait_timeout_seconds: float,
+    recycle_seconds: float,
+) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for pool in pools():
+            try:
+                # Pings and reconnects await the driver.
+                validation = await greenlet_spawn(
+                    pool.validate_idle,
+                    ping_after_seconds=interval_seconds,
+                    # Replace rather than ping a connection the server may
+                    # close before the next round.
+                    replace_after_seconds=(
+                        wait_timeout_seconds - 2 * interval_seconds
+                    ),
+                    recycle_seconds=recycle_seconds,
+                )
+            except Exception:
+                POOL_LOGGER.warning(
+                    "pool_validation_failed pool=%(pool)s",
+                    LogFields(pool=pool.metrics.name),
+                    exc_info=True,
+                )
+                continue
+            if validation.replaced or validation.dropped:
+                POOL_LOGGER.info(
+                    "pool_validated pool=%(pool)s pinged=%(pinged)d "
+                    "replaced=%(replaced)d dropped=%(dropped)d",
+                    LogFields(
+                        pool=pool.metrics.name,
+                        pinged=validation.pinged,
+                        replaced=validation.replaced,
+                        dropped=validation.dropped,
+                    ),
+                )
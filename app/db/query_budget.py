@@ -0,0 +1,67 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+
+from app.core.logging import LogFields
+from app.core.request_context import RequestContext
+
+
+QUERY_BUDGET_LOGGER = logging.getLogger("app.db.query_budget")
+
+
+@dataclass(frozen=True)
+class QueryBudgetViolation:
+    queries: int
+    repeated: dict[str, int]
+
+
+def find_query_budget_violation(
+    statement_counts: Counter[str],
+    *,
+    query_budget: int,
+    repeated_statement_limit: int,
+) -> QueryBudgetViolation | None:
+    queries = statement_counts.total()
+    repeated = (
+        {
+            sql_hash: count
+            for sql_hash, count in statement_counts.most_common()
+            if count > repeated_statement_limit
+        }
+        if repeated_statement_limit
+        else {}
+    )
+    if repeated or (query_budget and queries > query_budget):
+        return QueryBudgetViolation(queries=queries, repeated=repeated)
+    return None
+
+
+def check_query_budget(
+    context: RequestContext,
+    *,
+    query_budget: int,
+    repeated_statement_limit: int,
+) -> QueryBudgetViolation | None:
+    violation = find_query_budget_violation(
+        context.statement_counts,
+        query_budget=query_budget,
+        repeated_statement_limit=repeated_statement_limit,
+    )
+    if violation is None:
+        return None
+    QUERY_BUDGET_LOGGER.warning(
+        "query_budget_exceeded request_id=%(request_id)s method=%(method)s "
+        "path=%(path)r queries=%(queries)d query_budget=%(query_budget)d "
+        "repeated_statement_limit=%(repeated_statement_limit)d "
+        "repeated=%(repeated)s",
+        LogFields(
+            request_id=context.request_id,
+            method=context.method,
+            path=context.path,
+            queries=violation.queries,
+            query_budget=query_budget,
+            repeated_statement_limit=repeated_statement_limit,
+            repeated=dict(violation.repeated),
+        ),
+    )
+    return violation
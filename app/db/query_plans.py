@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.logging import LogFields
+from app.db.query_stats import StatementFingerprint
+
+
+QUERY_PLAN_LOGGER = logging.getLogger("app.db.query_plan")
+EXPLAINABLE_OPERATIONS = frozenset({"SELECT", "UPDATE", "DELETE"})
+# Full table scans and full index scans read every row of the table.
+FULL_SCAN_ACCESS_TYPES = frozenset({"ALL", "index"})
+QUERY_PLAN_TIMEOUT_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class PlanTable:
+    table: str
+    access_type: str
+    key: str | None
+    rows_examined: int
+
+    @property
+    def full_scan(self) -> bool:
+        return self.access_type in FULL_SCAN_ACCESS_TYPES
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    sql_hash: str
+    query_cost: float | None
+    tables: tuple[PlanTable, ...]
+
+    @property
+    def full_scans(self) -> tuple[str, ...]:
+        return tuple(table.table for table in self.tables if table.full_scan)
+
+    @property
+    def rows_examined(self) -> int:
+        return sum(table.rows_examined for table in self.tables)
+
+
+def _plan_tables(node: Any) -> Iterator[dict[str, Any]]:
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict) and "table_name" in table:
+            yield table
+        for value in node.values():
+            yield from _plan_tables(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _plan_tables(value)
+
+
+def summarize_plan(sql_hash: str, plan: dict[str, Any]) -> QueryPlan:
+    # Conditions in the plan can contain literals, so only the access path
+    # of each table is kept.
+    query_block = plan.get("query_block", {})
+    query_cost = query_block.get("cost_info", {}).get("query_cost")
+    return QueryPlan(
+        sql_hash=sql_hash,
+        query_cost=float(query_cost) if query_cost is not None else None,
+        tables=tuple(
+            PlanTable(
+                table=table["table_name"],
+                access_type=table.get("access_type", "-"),
+                key=table.get("key"),
+                rows_examined=int(table.get("rows_examined_per_scan", 0)),
+            )
+            for table in _plan_tables(plan)
+        ),
+    )
+
+
+def log_query_plan(plan: QueryPlan, *, operation: str) -> None:
+    QUERY_PLAN_LOGGER.warning(
+        "slow_query_plan operation=%(operation)s sql_hash=%(sql_hash)s "
+        "query_cost=%(query_cost)s rows_examined=%(rows_examined)d "
+        "full_scans=%(full_scans)s tables=%(tables)s",
+        LogFields(
+            operation=operation,
+            sql_hash=plan.sql_hash,
+            query_cost=(
+                round(plan.query_cost, 2)
+                if plan.query_cost is not None
+                else None
+            ),
+            rows_examined=plan.rows_examined,
+            full_scans=list(plan.full_scans),
+            tables=[
+                f"{table.table}:{table.access_type}:{table.key or '-'}:"
+                f"{table.rows_examined}"
+                for table in plan.tables
+            ],
+        ),
+    )
+
+
+class QueryPlanCapture:
+    def __init__(
+        self,
+        *,
+        max_plans: int,
+        min_interval_seconds: float,
+    ) -> None:
+        self.max_plans = max_plans
+        self.min_interval_seconds = min_interval_seconds
+        # A None plan marks a statement whose EXPLAIN failed.
+        self._plans: OrderedDict[str, QueryPlan | None] = OrderedDict()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._captured_at: float | None = None
+
+    def plan(self, sql_hash: str) -> QueryPlan | None:
+        return self._plans.get(sql_hash)
+
+    def _store(self, sql_hash: str, plan: QueryPlan | None) -> None:
+        self._plans[sql_hash] = plan
+        self._plans.move_to_end(sql_hash)
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+
+    def request(
+        self,
+        engine: Engine,
+        fingerprint: StatementFingerprint,
+        statement: str,
+        parameters: Any,
+    ) -> None:
+        if (
+            fingerprint.operation not in EXPLAINABLE_OPERATIONS
+            or fingerprint.sql_hash in self._plans
+        ):
+            return
+        now = monotonic()
+        if (
+            self._captured_at is not None
+            and now - self._captured_at < self.min_interval_seconds
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._captured_at = now
+        # Reserve the hash so concurrent slow executions do not queue more.
+        self._store(fingerprint.sql_hash, None)
+        # A fresh context keeps the EXPLAIN out of the request's counters.
+        task = loop.create_task(
+            self._capture(engine, fingerprint, statement, parameters),
+            name=f"query-plan-{fingerprint.sql_hash}",
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _capture(
+        self,
+        engine: Engine,
+        fingerprint: StatementFingerprint,
+        statement: str,
+        parameters: Any,
+    ) -> None:
+        try:
+            raw_plan = await asyncio.wait_for(
+                greenlet_spawn(self._explain, engine, statement, parameters),
+                QUERY_PLAN_TIMEOUT_SECONDS,
+            )
+            plan = summarize_plan(fingerprint.sql_hash, json.loads(raw_plan))
+        except Exception:
+            QUERY_PLAN_LOGGER.warning(
+                "query_plan_failed operation=%(operation)s "
+                "sql_hash=%(sql_hash)s",
+                LogFields(
+                    operation=fingerprint.operation,
+                    sql_hash=fingerprint.sql_hash,
+                ),
+                exc_info=True,
+            )
+            return
+        self._store(fingerprint.sql_hash, plan)
+        log_query_plan(plan, operation=fingerprint.operation)
+
+    def _explain(
+        self,
+        engine: Engine,
+        statement: str,
+        parameters: Any,
+    ) -> str:
+        # A separate pooled connection, so the request's transaction and
+        # connection are not touched.
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(
+                f"EXPLAIN FORMAT=JSON {statement}",
+                parameters,
+            ).scalar_one()
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
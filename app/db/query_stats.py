@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from app.core.logging import LogFields
+from app.db.pool import Histogram
+
+
+QUERY_STATS_LOGGER = logging.getLogger("app.db.query_stats")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+LATENCY_BUCKETS_SECONDS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QueryStatsOrder = Literal["total", "mean", "p99", "count"]
+
+
+def normalize_sql(statement: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", statement).strip()
+
+
+def sql_operation(statement: str) -> str:
+    normalized = normalize_sql(statement)
+    if not normalized:
+        return "UNKNOWN"
+    return normalized.split(" ", 1)[0].upper()
+
+
+@dataclass(frozen=True, slots=True)
+class StatementFingerprint:
+    sql_hash: str
+    operation: str
+    sql_length: int
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_sql(statement: str) -> StatementFingerprint:
+    # Compiled statements repeat verbatim, so hashing runs once per shape.
+    normalized = normalize_sql(statement)
+    return StatementFingerprint(
+        sql_hash=hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16],
+        operation=sql_operation(normalized),
+        sql_length=len(normalized),
+    )
+
+
+class StatementStats:
+    __slots__ = (
+        "fingerprint",
+        "count",
+        "total_seconds",
+        "max_seconds",
+        "rows",
+        "latency",
+        "slow_count",
+        "slow_pending",
+        "slow_pending_seconds",
+        "slow_pending_max_seconds",
+    )
+
+    def __init__(self, fingerprint: StatementFingerprint) -> None:
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.latency = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.slow_count = 0
+        # Slow executions not yet reported in a slow_query_summary.
+        self.slow_pending = 0
+        self.slow_pending_seconds = 0.0
+        self.slow_pending_max_seconds = 0.0
+
+    def observe(self, seconds: float, rowcount: int) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if rowcount >= 0:
+            self.rows += rowcount
+        self.latency.observe(seconds)
+
+
+@dataclass(frozen=True)
+class StatementSnapshot:
+    sql_hash: str
+    operation: str
+    sql_length: int
+    count: int
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    rows: int
+    slow_count: int
+
+
+@dataclass(frozen=True)
+class SlowQuerySummary:
+    sql_hash: str
+    operation: str
+    count: int
+    total_ms: float
+    max_ms: float
+
+
+def _snapshot(stats: StatementStats) -> StatementSnapshot:
+    latency = stats.latency
+    return StatementSnapshot(
+        sql_hash=stats.fingerprint.sql_hash,
+        operation=stats.fingerprint.operation,
+        sql_length=stats.fingerprint.sql_length,
+        count=stats.count,
+        total_ms=stats.total_seconds * 1000,
+        mean_ms=latency.mean() * 1000,
+        # Bucket upper bounds are capped by the slowest observed execution.
+        p50_ms=min(latency.quantile(0.5), stats.max_seconds) * 1000,
+        p95_ms=min(latency.quantile(0.95), stats.max_seconds) * 1000,
+        p99_ms=min(latency.quantile(0.99), stats.max_seconds) * 1000,
+        max_ms=stats.max_seconds * 1000,
+        rows=stats.rows,
+        slow_count=stats.slow_count,
+    )
+
+
+SNAPSHOT_ORDERS = {
+    "total": lambda snapshot: snapshot.total_ms,
+    "mean": lambda snapshot: snapshot.mean_ms,
+    "p99": lambda snapshot: snapshot.p99_ms,
+    "count": lambda snapshot: snapshot.count,
+}
+
+
+class QueryStats:
+    def __init__(
+        self,
+        *,
+        max_statements: int,
+        summarize_slow_queries: bool = False,
+        adaptive_multiplier: float | None = None,
+        adaptive_min_samples: int = 100,
+        adaptive_floor_seconds: float = 0.0,
+    ) -> None:
+        self.max_statements = max_statements
+        self.summarize_slow_queries = summarize_slow_queries
+        self.adaptive_multiplier = adaptive_multiplier
+        self.adaptive_min_samples = adaptive_min_samples
+        self.adaptive_floor_seconds = adaptive_floor_seconds
+        self.evicted = 0
+        self._statements: OrderedDict[str, StatementStats] = OrderedDict()
+
+    def statement(self, fingerprint: StatementFingerprint) -> StatementStats:
+        statements = self._statements
+        stats = statements.get(fingerprint.sql_hash)
+        if stats is not None:
+            statements.move_to_end(fingerprint.sql_hash)
+            return stats
+        if len(statements) >= self.max_statements:
+            # Statements not seen for the longest time are dropped first.
+            statements.popitem(last=False)
+            self.evicted += 1
+        stats = statements[fingerprint.sql_hash] = StatementStats(fingerprint)
+        return stats
+
+    def threshold_seconds(
+        self,
+        stats: StatementStats,
+        threshold_seconds: float,
+    ) -> float:
+        if (
+            self.adaptive_multiplier is None
+            or stats.count < self.adaptive_min_samples
+        ):
+            return threshold_seconds
+        baseline = min(stats.latency.quantile(0.95), stats.max_seconds)
+        adaptive_seconds = baseline * self.adaptive_multiplier
+        return min(
+            threshold_seconds,
+            max(self.adaptive_floor_seconds, adaptive_seconds),
+        )
+
+    def record_slow(self, stats: StatementStats, seconds: float) -> bool:
+        stats.slow_count += 1
+        if not self.summarize_slow_queries:
+            return True
+        stats.slow_pending += 1
+        stats.slow_pending_seconds += seconds
+        stats.slow_pending_max_seconds = max(
+            stats.slow_pending_max_seconds,
+            seconds,
+        )
+        # Only the first slow execution in a summary window is logged.
+        return stats.slow_pending == 1
+
+    def drain_slow_summaries(self) -> list[SlowQuerySummary]:
+        summaries = []
+        for stats in self._statements.values():
+            # The first execution was already logged on its own.
+            if stats.slow_pending > 1:
+                summaries.append(
+                    SlowQuerySummary(
+                        sql_hash=stats.fingerprint.sql_hash,
+                        operation=stats.fingerprint.operation,
+                        count=stats.slow_pending,
+                        total_ms=stats.slow_pending_seconds * 1000,
+                        max_ms=stats.slow_pending_max_seconds * 1000,
+                    )
+                )
+            stats.slow_pending = 0
+            stats.slow_pending_seconds = 0.0
+            stats.slow_pending_max_seconds = 0.0
+        return summaries
+
+    def tracked(self) -> int:
+        return len(self._statements)
+
+    def top(
+        self,
+        *,
+        limit: int,
+        order_by: QueryStatsOrder = "total",
+    ) -> list[StatementSnapshot]:
+        snapshots = [_snapshot(stats) for stats in self._statements.values()]
+        snapshots.sort(key=SNAPSHOT_ORDERS[order_by], reverse=True)
+        return snapshots[:limit]
+
+    def reset(self) -> None:
+        self._statements.clear()
+        self.evicted = 0
+
+
+def log_slow_query_summaries(query_stats: QueryStats) -> None:
+    for summary in query_stats.drain_slow_summaries():
+        QUERY_STATS_LOGGER.warning(
+            "slow_query_summary operation=%(operation)s sql_hash=%(sql_hash)s "
+            "count=%(count)d total_ms=%(total_ms).2f max_ms=%(max_ms).2f",
+            LogFields(
+                operation=summary.operation,
+                sql_hash=summary.sql_hash,
+                count=summary.count,
+                total_ms=round(summary.total_ms, 2),
+                max_ms=round(summary.max_ms, 2),
+            ),
+        )
+
+
+async def run_slow_query_summaries(
+    query_stats: QueryStats,
+    *,
+    interval_seconds: float,
+) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        log_slow_query_summaries(query_stats)
@@ -0,0 +1,87 @@
+from collections import deque
+from dataclasses import dataclass
+from time import time
+
+from app.core.request_context import RequestContext
+from app.db.query_stats import fingerprint_sql, normalize_sql
+
+
+@dataclass(frozen=True, slots=True)
+class QueryTrace:
+    request_id: str
+    method: str
+    path: str
+    statement: str
+    duration_seconds: float
+    rowcount: int
+    recorded_at: float
+
+
+@dataclass(frozen=True)
+class QueryTraceEntry:
+    request_id: str
+    method: str
+    path: str
+    sql_hash: str
+    operation: str
+    statement: str
+    duration_ms: float
+    rowcount: int | None
+    recorded_at: float
+
+
+class QueryTraceBuffer:
+    def __init__(self, *, size: int) -> None:
+        self._traces: deque[QueryTrace] = deque(maxlen=size)
+
+    def record(
+        self,
+        context: RequestContext,
+        statement: str,
+        duration_seconds: float,
+        rowcount: int,
+    ) -> None:
+        # Normalization is deferred to entries() to keep sampling cheap.
+        self._traces.append(
+            QueryTrace(
+                request_id=context.request_id,
+                method=context.method,
+                path=context.path,
+                statement=statement,
+                duration_seconds=duration_seconds,
+                rowcount=rowcount,
+                recorded_at=time(),
+            )
+        )
+
+    def entries(
+        self,
+        *,
+        limit: int,
+        request_id: str | None = None,
+    ) -> list[QueryTraceEntry]:
+        entries = []
+        # Newest first; copying guards against appends while iterating.
+        for trace in reversed(list(self._traces)):
+            if request_id is not None and trace.request_id != request_id:
+                continue
+            fingerprint = fingerprint_sql(trace.statement)
+            entries.append(
+                QueryTraceEntry(
+                    request_id=trace.request_id,
+                    method=trace.method,
+                    path=trace.path,
+                    sql_hash=fingerprint.sql_hash,
+                    operation=fingerprint.operation,
+                    statement=normalize_sql(trace.statement),
+                    duration_ms=trace.duration_seconds * 1000,
+                    rowcount=trace.rowcount if trace.rowcount >= 0 else None,
+                    recorded_at=trace.recorded_at,
+                )
+            )
+            if len(entries) >= limit:
+                break
+        return entries
+
+    def clear(self) -> None:
+        self._traces.clear()
@@ -1,13 +1,62 @@
+import asyncio
+import logging
+from collections import OrderedDict
 from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+from time import perf_counter
+from typing import Any
 
 from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import AbstractConnection
+from redis.exceptions import RedisError
 
 from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.core.request_context import PHASE_REDIS, record_phase
+from app.db.pool import PoolMetrics, PoolStats
 
 
 settings = get_settings()
+CLIENT_CACHE_LOGGER = logging.getLogger("app.redis.client_cache")
+TRACKING_INVALIDATION_CHANNEL = "__redis__:invalidate"
+TRACKING_RETRY_SECONDS = 1.0
+TRACKING_HEALTH_CHECK_SECONDS = 5.0
 
-redis_pool = ConnectionPool(
+
+class InstrumentedConnectionPool(ConnectionPool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics("redis")
+        self._checked_out_at: dict[AbstractConnection, float] = {}
+
+    async def get_connection(self, *args: Any, **kwargs: Any) -> Any:
+        started_at = perf_counter()
+        connection = await super().get_connection(*args, **kwargs)
+        checked_out_at = perf_counter()
+        self._checked_out_at[connection] = checked_out_at
+        self.metrics.observe_checkout(
+            checked_out_at - started_at,
+            checked_out=len(self._in_use_connections),
+        )
+        return connection
+
+    async def release(self, connection: AbstractConnection) -> None:
+        checked_out_at = self._checked_out_at.pop(connection, None)
+        if checked_out_at is not None:
+            self.metrics.observe_checkin(perf_counter() - checked_out_at)
+        await super().release(connection)
+
+    def stats(self) -> PoolStats:
+        checked_out = len(self._in_use_connections)
+        return self.metrics.stats(
+            size=len(self._available_connections) + checked_out,
+            checked_out=checked_out,
+            overflow=0,
+        )
+
+
+redis_pool = InstrumentedConnectionPool(
     host=settings.REDIS_HOST,
     port=settings.REDIS_PORT,
     password=settings.REDIS_PASSWORD.get_secret_value() or None,
@@ -17,8 +66,39 @@ redis_pool = ConnectionPool(
 )
 
 
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        commands = len(self.command_stack)
+        started_at = perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_phase(PHASE_REDIS, perf_counter() - started_at, commands)
+
+
+class TimedRedis(Redis):
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started_at = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_phase(PHASE_REDIS, perf_counter() - started_at)
+
+    def pipeline(
+        self,
+        transaction: bool = True,
+        shard_hint: str | None = None,
+    ) -> Pipeline:
+        return TimedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
+
 def create_redis_client() -> Redis:
-    return Redis(connection_pool=redis_pool)
+    return TimedRedis(connection_pool=redis_pool)
 
 
 async def get_redis() -> AsyncIterator[Redis]:
@@ -31,3 +111,204 @@ async def get_redis() -> AsyncIterator[Redis]:
 
 async def close_redis() -> None:
     await redis_pool.aclose()
+
+
+@dataclass
+class ClientCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    flushes: int = 0
+    size: int = 0
+
+
+class ClientSideCache:
+    def __init__(self, *, max_entries: int, prefixes: tuple[str, ...]) -> None:
+        self.max_entries = max_entries
+        self.prefixes = prefixes
+        self._values: OrderedDict[str, str] = OrderedDict()
+        # Keys read from Redis whose invalidation has not arrived since.
+        self._pending: set[str] = set()
+        self._active = False
+        self._stats = ClientCacheStats()
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def stats(self) -> ClientCacheStats:
+        return replace(self._stats, size=len(self._values))
+
+    def activate(self) -> None:
+        self.flush()
+        self._active = True
+
+    def deactivate(self) -> None:
+        self._active = False
+        self.flush()
+
+    def get(self, key: str) -> str | None:
+        if not self._active or not key.startswith(self.prefixes):
+            return None
+        value = self._values.get(key)
+        if value is None:
+            self._stats.misses += 1
+            if len(self._pending) >= self.max_entries:
+                self._pending.clear()
+            self._pending.add(key)
+            return None
+        self._values.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def put(self, key: str, value: str | None) -> None:
+        # A read that raced an invalidation must not repopulate the cache.
+        if key not in self._pending:
+            return
+        self._pending.discard(key)
+        if value is None or not self._active:
+            return
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    def invalidate(self, keys: list[str] | None) -> None:
+        if keys is None:
+            self.flush()
+            return
+        for key in keys:
+            self._pending.discard(key)
+            if self._values.pop(key, None) is not None:
+                self._stats.invalidations += 1
+
+    def flush(self) -> None:
+        self._values.clear()
+        self._pending.clear()
+        self._stats.flushes += 1
+
+
+async def _command(connection: AbstractConnection, *args: object) -> object:
+    await connection.send_command(*args)
+    return await connection.read_response()
+
+
+async def _listen_for_invalidations(
+    connection: AbstractConnection,
+    cache: ClientSideCache,
+) -> None:
+    while True:
+        message = await connection.read_response()
+        if isinstance(message, list) and message[0] == "message":
+            cache.invalidate(message[2])
+
+
+async def _check_tracking_connection(connection: AbstractConnection) -> None:
+    # Tracking ends silently with its connection, so probe it.
+    while True:
+        await asyncio.sleep(TRACKING_HEALTH_CHECK_SECONDS)
+        await _command(connection, "PING")
+
+
+async def run_client_cache_tracking(cache: ClientSideCache) -> None:
+    prefix_arguments = [
+        argument
+        for prefix in cache.prefixes
+        for argument in ("PREFIX", prefix)
+    ]
+    while True:
+        listener = redis_pool.make_connection()
+        tracker = redis_pool.make_connection()
+        tasks: list[asyncio.Task[None]] = []
+        try:
+            await listener.connect()
+            listener_id = await _command(listener, "CLIENT", "ID")
+            await _command(
+                listener,
+                "SUBSCRIBE",
+                TRACKING_INVALIDATION_CHANNEL,
+            )
+            await tracker.connect()
+            await _command(
+                tracker,
+                "CLIENT",
+                "TRACKING",
+                "ON",
+                "REDIRECT",
+                listener_id,
+                "BCAST",
+                *prefix_arguments,
+            )
+            cache.activate()
+            tasks = [
+                asyncio.create_task(
+                    _listen_for_invalidations(listener, cache)
+                ),
+                asyncio.create_task(_check_tracking_connection(tracker)),
+            ]
+            done, _ = await asyncio.wait(
+                tasks,
+                return_when=asyncio.FIRST_EXCEPTION,
+            )
+            for task in done:
+                task.result()
+        except (RedisError, OSError):
+            CLIENT_CACHE_LOGGER.warning(
+                "redis_client_cache_tracking_lost",
+                exc_info=True,
+            )
+        finally:
+            cache.deactivate()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await listener.disconnect()
+            await tracker.disconnect()
+        await asyncio.sleep(TRACKING_RETRY_SECONDS)
+
+
+_client_cache: ClientSideCache | None = None
+
+
+def get_client_cache() -> ClientSideCache | None:
+    return _client_cache
+
+
+def start_client_cache_tracking(
+    prefixes: tuple[str, ...],
+) -> asyncio.Task[None] | None:
+    global _client_cache
+    if not settings.REDIS_CLIENT_CACHE_ENABLED:
+        return None
+    _client_cache = ClientSideCache(
+        max_entries=settings.REDIS_CLIENT_CACHE_MAX_ENTRIES,
+        prefixes=prefixes,
+    )
+    return asyncio.create_task(
+        run_client_cache_tracking(_client_cache),
+        name="redis-client-cache-tracking",
+    )
+
+
+async def stop_client_cache_tracking(task: asyncio.Task[None] | None) -> None:
+    global _client_cache
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    if _client_cache is not None:
+        stats = _client_cache.stats()
+        CLIENT_CACHE_LOGGER.info(
+            "redis_client_cache_stopped hits=%(hits)d misses=%(misses)d "
+            "invalidations=%(invalidations)d flushes=%(flushes)d",
+            LogFields(
+                hits=stats.hits,
+                misses=stats.misses,
+                invalidations=stats.invalidations,
+                flushes=stats.flushes,
+            ),
+        )
+    _client_cache = None
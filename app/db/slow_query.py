@@ -1,6 +1,4 @@
-import hashlib
 import logging
-import re
 from time import perf_counter
 from typing import Any
 from weakref import WeakSet
@@ -8,30 +6,35 @@ from weakref import WeakSet
 from sqlalchemy import event
 from sqlalchemy.engine import Connection, Engine
 
-from app.core.request_context import get_request_context
+from app.core.logging import LogFields
+from app.core.request_context import PHASE_DATABASE, get_request_context
+from app.db.query_plans import QueryPlanCapture
+from app.db.query_stats import QueryStats, fingerprint_sql
+from app.db.query_trace import QueryTraceBuffer
 
 
 SLOW_QUERY_LOGGER = logging.getLogger("app.db.slow_query")
 TIMER_STACK_KEY = "_slow_query_started_at"
-WHITESPACE_PATTERN = re.compile(r"\s+")
 INSTALLED_ENGINES: WeakSet[Engine] = WeakSet()
-
-
-def normalize_sql(statement: str) -> str:
-    return WHITESPACE_PATTERN.sub(" ", statement).strip()
-
-
-def sql_operation(statement: str) -> str:
-    normalized = normalize_sql(statement)
-    if not normalized:
-        return "UNKNOWN"
-    return normalized.split(" ", 1)[0].upper()
+SLOW_QUERY_LOG_MESSAGE = (
+    "slow_query duration_ms=%(duration_ms).2f threshold_ms=%(threshold_ms).2f "
+    "operation=%(operation)s sql_hash=%(sql_hash)s "
+    "sql_length=%(sql_length)d executemany=%(executemany)s "
+    "rowcount=%(rowcount)s"
+)
+SLOW_QUERY_REQUEST_LOG_MESSAGE = (
+    f"{SLOW_QUERY_LOG_MESSAGE} request_id=%(request_id)s "
+    "method=%(method)s path=%(path)r"
+)
 
 
 def install_slow_query_logging(
     engine: Engine,
     *,
     threshold_seconds: float,
+    query_stats: QueryStats | None = None,
+    query_plans: QueryPlanCapture | None = None,
+    query_trace: QueryTraceBuffer | None = None,
 ) -> None:
     if engine in INSTALLED_ENGINES:
         return
@@ -50,7 +53,7 @@ def install_slow_query_logging(
         connection: Connection,
         cursor: Any,
         statement: str,
-        _parameters: Any,
+        parameters: Any,
         _context: Any,
         executemany: bool,
     ) -> None:
@@ -59,33 +62,59 @@ def install_slow_query_logging(
             return
 
         duration_seconds = perf_counter() - stack.pop()
-        if duration_seconds < threshold_seconds:
-            return
-
-        normalized = normalize_sql(statement)
-        sql_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+        fingerprint = fingerprint_sql(statement)
         rowcount = getattr(cursor, "rowcount", -1)
-        rowcount_field = rowcount if rowcount >= 0 else "-"
         context = get_request_context()
-        context_fields = ""
         if context is not None:
-            context_fields = (
-                f" request_id={context.request_id}"
-                f" method={context.method} path={context.path!r}"
+            context.record_phase(PHASE_DATABASE, duration_seconds)
+            context.statement_counts[fingerprint.sql_hash] += 1
+            if context.trace_queries and query_trace is not None:
+                query_trace.record(
+                    context,
+                    statement,
+                    duration_seconds,
+                    rowcount,
+                )
+        statement_threshold = threshold_seconds
+        if query_stats is None and duration_seconds < threshold_seconds:
+            return
+        if query_stats is not None:
+            stats = query_stats.statement(fingerprint)
+            # The baseline excludes the execution being judged.
+            statement_threshold = query_stats.threshold_seconds(
+                stats,
+                threshold_seconds,
             )
+            stats.observe(duration_seconds, rowcount)
+            if duration_seconds < statement_threshold or not (
+                query_stats.record_slow(stats, duration_seconds)
+            ):
+                return
+
         SLOW_QUERY_LOGGER.warning(
-            "slow_query duration_ms=%.2f threshold_ms=%.2f "
-            "operation=%s sql_hash=%s sql_length=%d executemany=%s "
-            "rowcount=%s%s",
-            duration_seconds * 1000,
-            threshold_seconds * 1000,
-            sql_operation(normalized),
-            sql_hash,
-            len(normalized),
-            str(executemany).lower(),
-            rowcount_field,
-            context_fields,
+            SLOW_QUERY_LOG_MESSAGE
+            if context is None
+            else SLOW_QUERY_REQUEST_LOG_MESSAGE,
+            LogFields(
+                duration_ms=round(duration_seconds * 1000, 2),
+                threshold_ms=round(statement_threshold * 1000, 2),
+                operation=fingerprint.operation,
+                sql_hash=fingerprint.sql_hash,
+                sql_length=fingerprint.sql_length,
+                executemany=executemany,
+                rowcount=rowcount if rowcount >= 0 else None,
+                request_id=context.request_id if context else None,
+                method=context.method if context else None,
+                path=context.path if context else None,
+            ),
         )
+        if query_plans is not None and not executemany:
+            query_plans.request(
+                connection.engine,
+                fingerprint,
+                statement,
+                parameters,
+            )
 
     def handle_error(exception_context: Any) -> None:
         connection = exception_context.connection
@@ -0,0 +1,58 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+from weakref import WeakSet
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+INSTALLED_ENGINES: WeakSet[Engine] = WeakSet()
+_cache_results: Counter[CacheStats] = Counter()
+
+
+@dataclass(frozen=True)
+class CompiledCacheStats:
+    hits: int
+    misses: int
+    uncached: int
+
+    @property
+    def hit_ratio(self) -> float:
+        cached = self.hits + self.misses
+        return self.hits / cached if cached else 0.0
+
+
+def compiled_cache_stats() -> CompiledCacheStats:
+    hits = _cache_results[CacheStats.CACHE_HIT]
+    misses = _cache_results[CacheStats.CACHE_MISS]
+    return CompiledCacheStats(
+        hits=hits,
+        misses=misses,
+        uncached=_cache_results.total() - hits - misses,
+    )
+
+
+def reset_compiled_cache_stats() -> None:
+    _cache_results.clear()
+
+
+def install_compiled_cache_metrics(engine: Engine) -> None:
+    if engine in INSTALLED_ENGINES:
+        return
+
+    def after_cursor_execute(
+        _connection: Connection,
+        _cursor: Any,
+        _statement: str,
+        _parameters: Any,
+        context: Any,
+        _executemany: bool,
+    ) -> None:
+        # Driver-level SQL has no cache key and counts as uncached.
+        cache_hit = getattr(context, "cache_hit", CacheStats.NO_CACHE_KEY)
+        _cache_results[cache_hit] += 1
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    INSTALLED_ENGINES.add(engine)
@@ -6,11 +6,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.types import ASGIApp
 
 from app.api import api_router
+from app.api.internal import router as internal_router
+from app.api.routing import ObservedAPIRoute
 from app.core.config import get_settings
-from app.core.logging import setup_logging
-from app.db.mysql import close_database
-from app.db.redis import close_redis
+from app.core.logging import setup_logging, stop_logging
+from app.db.mysql import (
+    close_database,
+    start_pool_monitor,
+    start_pool_validator,
+    start_slow_query_summaries,
+    stop_pool_monitor,
+    stop_pool_validator,
+    stop_slow_query_summaries,
+)
+from app.db.redis import (
+    close_redis,
+    redis_pool,
+    start_client_cache_tracking,
+    stop_client_cache_tracking,
+)
 from app.middlewares import RequestObservabilityMiddleware
+from app.services.credential_pool import close_credential_pool
+from app.services.session_cache import (
+    start_session_invalidation_listener,
+    stop_session_invalidation_listener,
+)
+from app.services.session_codec import (
+    COMPACT_SESSION_KEY_PREFIX,
+    SESSION_KEY_PREFIX,
+)
+from app.services.session_refresh import close_session_refresher
 
 
 class ScaffoldFastAPI(FastAPI):
@@ -22,19 +47,44 @@ class ScaffoldFastAPI(FastAPI):
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    yield
-    await close_redis()
-    await close_database()
+    pool_monitor = start_pool_monitor(redis_pool)
+    pool_validator = start_pool_validator()
+    slow_query_summaries = start_slow_query_summaries()
+    invalidation_listener = start_session_invalidation_listener()
+    client_cache_tracking = start_client_cache_tracking(
+        (SESSION_KEY_PREFIX, COMPACT_SESSION_KEY_PREFIX)
+    )
+    try:
+        yield
+        await stop_client_cache_tracking(client_cache_tracking)
+        await stop_session_invalidation_listener(invalidation_listener)
+        await close_session_refresher()
+        await stop_slow_query_summaries(slow_query_summaries)
+        await stop_pool_validator(pool_validator)
+        await stop_pool_monitor(pool_monitor, redis_pool)
+        await close_redis()
+        await close_database()
+        close_credential_pool()
+    finally:
+        # Last and unconditional, so queued records, including those about
+        # a failed shutdown step, are still written.
+        stop_logging()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    setup_logging(settings.LOG_LEVEL)
+    setup_logging(
+        settings.LOG_LEVEL,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        overflow=settings.LOG_QUEUE_OVERFLOW,
+        log_format=settings.LOG_FORMAT,
+    )
     app = ScaffoldFastAPI(
         title="FastAPI Scaffold",
         debug=settings.DEBUG,
         lifespan=lifespan,
     )
+    app.router.route_class = ObservedAPIRoute
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
@@ -44,6 +94,7 @@ def create_app() -> FastAPI:
         expose_headers=["X-Request-ID", "Server-Timing"],
     )
     app.include_router(api_router)
+    app.include_router(internal_router, prefix="/internal")
     return app
 
 
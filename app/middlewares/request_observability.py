@@ -1,16 +1,40 @@
 import logging
 import re
+from random import random
 from time import perf_counter
 from uuid import uuid4
 
 from starlette.datastructures import Headers, MutableHeaders
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.request_context import RequestContext, request_context
+from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.core.metrics import UNMATCHED_ROUTE, observe_request
+from app.core.request_context import (
+    PHASE_AUTH,
+    PHASE_DATABASE,
+    PHASE_REDIS,
+    PHASE_SERIALIZATION,
+    REQUEST_PHASES,
+    RequestContext,
+    request_context,
+)
+from app.db.query_budget import check_query_budget
 
 
 REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
 ACCESS_LOGGER = logging.getLogger("app.access")
+COUNTED_PHASES = {PHASE_DATABASE: "queries", PHASE_REDIS: "commands"}
+ACCESS_LOG_MESSAGE = (
+    "request_completed request_id=%(request_id)s method=%(method)s "
+    "path=%(path)r status=%(status)d duration_ms=%(duration_ms).2f "
+    "db_ms=%(db_ms).2f db_queries=%(db_queries)d "
+    "redis_ms=%(redis_ms).2f redis_commands=%(redis_commands)d "
+    "auth_ms=%(auth_ms).2f serialize_ms=%(serialize_ms).2f"
+)
+ACCESS_SESSION_LOG_MESSAGE = (
+    f"{ACCESS_LOG_MESSAGE} session_fp=%(session_fp)s"
+)
 
 
 def normalize_request_id(value: str | None) -> str:
@@ -19,9 +43,35 @@ def normalize_request_id(value: str | None) -> str:
     return uuid4().hex
 
 
+def route_template(scope: Scope) -> str:
+    # Raw paths carry IDs; the matched route keeps label cardinality bounded.
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if isinstance(path, str) else UNMATCHED_ROUTE
+
+
+def server_timing(context: RequestContext, duration_ms: float) -> str:
+    metrics = [f"app;dur={duration_ms:.2f}"]
+    for phase in REQUEST_PHASES:
+        timing = context.phases.get(phase)
+        if timing is None:
+            continue
+        metric = f"{phase};dur={timing.seconds * 1000:.2f}"
+        if phase in COUNTED_PHASES:
+            metric += f';desc="{timing.count} {COUNTED_PHASES[phase]}"'
+        metrics.append(metric)
+    return ", ".join(metrics)
+
+
 class RequestObservabilityMiddleware:
     def __init__(self, app: ASGIApp) -> None:
         self.app = app
+        settings = get_settings()
+        self.query_budget = settings.DB_REQUEST_QUERY_BUDGET
+        self.repeated_statement_limit = (
+            settings.DB_REQUEST_REPEATED_STATEMENT_LIMIT
+        )
+        self.query_trace_sample_rate = settings.DB_QUERY_TRACE_SAMPLE_RATE
 
     async def __call__(
         self,
@@ -42,6 +92,10 @@ class RequestObservabilityMiddleware:
             request_id=request_id,
             method=method,
             path=path,
+            trace_queries=(
+                self.query_trace_sample_rate > 0
+                and random() < self.query_trace_sample_rate
+            ),
         )
         context_token = request_context.set(context)
         started_at = perf_counter()
@@ -51,30 +105,56 @@ class RequestObservabilityMiddleware:
             nonlocal status_code
             if message["type"] == "http.response.start":
                 status_code = message["status"]
-                duration_ms = (perf_counter() - started_at) * 1000
+                response_started_at = perf_counter()
+                if context.handler_finished_at is not None:
+                    context.record_phase(
+                        PHASE_SERIALIZATION,
+                        response_started_at - context.handler_finished_at,
+                    )
+                duration_ms = (response_started_at - started_at) * 1000
                 headers = MutableHeaders(scope=message)
                 headers["X-Request-ID"] = request_id
-                headers["Server-Timing"] = f"app;dur={duration_ms:.2f}"
+                headers["Server-Timing"] = server_timing(context, duration_ms)
             await send(message)
 
         try:
             await self.app(scope, receive, send_with_observability)
         finally:
-            duration_ms = (perf_counter() - started_at) * 1000
+            duration_seconds = perf_counter() - started_at
+            duration_ms = duration_seconds * 1000
+            observe_request(
+                method=method,
+                route=route_template(scope),
+                status_code=status_code,
+                duration_seconds=duration_seconds,
+            )
             if path != "/ping":
-                session_field = (
-                    f" session_fp={context.session_fingerprint}"
-                    if context.session_fingerprint is not None
-                    else ""
-                )
+                database = context.phase(PHASE_DATABASE)
+                redis = context.phase(PHASE_REDIS)
+                auth = context.phase(PHASE_AUTH)
+                serialization = context.phase(PHASE_SERIALIZATION)
                 ACCESS_LOGGER.info(
-                    "request_completed request_id=%s method=%s path=%r "
-                    "status=%d duration_ms=%.2f%s",
-                    request_id,
-                    method,
-                    path,
-                    status_code,
-                    duration_ms,
-                    session_field,
+                    ACCESS_LOG_MESSAGE
+                    if context.session_fingerprint is None
+                    else ACCESS_SESSION_LOG_MESSAGE,
+                    LogFields(
+                        request_id=request_id,
+                        method=method,
+                        path=path,
+                        status=status_code,
+                        duration_ms=round(duration_ms, 2),
+                        db_ms=round(database.seconds * 1000, 2),
+                        db_queries=database.count,
+                        redis_ms=round(redis.seconds * 1000, 2),
+                        redis_commands=redis.count,
+                        auth_ms=round(auth.seconds * 1000, 2),
+                        serialize_ms=round(serialization.seconds * 1000, 2),
+                        session_fp=context.session_fingerprint,
+                    ),
                 )
+            check_query_budget(
+                context,
+                query_budget=self.query_budget,
+                repeated_statement_limit=self.repeated_statement_limit,
+            )
             request_context.reset(context_token)
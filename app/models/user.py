@@ -44,4 +44,4 @@ class AuthUser(BigIntIdMixin, TimestampMixin, Base):
         nullable=False,
     )
     auth_id: Mapped[str] = mapped_column(String(64), nullable=False)
-    credential: Mapped[str] = mapped_column(String(60), nullable=False)
+    credential: Mapped[str] = mapped_column(String(255), nullable=False)
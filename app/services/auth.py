@@ -5,27 +5,155 @@ import re
 import secrets
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from time import perf_counter, time
 from typing import Any
 
-import bcrypt
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
-from sqlalchemy import select
+from sqlalchemy import Select, bindparam, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.logging import LogFields
 from app.core.request_context import get_request_context
+from app.db.mysql import after_commit, execute_read, read_from_replica
+from app.db.statement_cache import (
+    compiled_cache_stats,
+    reset_compiled_cache_stats,
+)
 from app.models import AuthUser, User
 from app.models.base import get_local_now
+from app.services.credential_pool import (
+    CredentialPoolBusyError,
+    run_credential_work,
+)
+from app.services.credentials import (
+    DUMMY_CREDENTIAL,
+    credential_needs_rehash,
+    hash_password,
+    verify_password,
+)
+from app.services.login_throttle import (
+    enforce_login_throttle,
+    release_login_attempt,
+)
+from app.services.session_cache import (
+    get_session_cache,
+    get_user_identity_cache,
+    publish_session_invalidation,
+)
+from app.services.session_codec import (
+    SESSION_ENCODINGS,
+    decode_payload_fields,
+    encode_session_payload,
+    format_session_created_at,
+    session_key_for,
+    session_key_fingerprint,
+)
+from app.services.session_refresh import session_needs_refresh
+from app.services.session_store import get_session_store
+from app.services.signed_tokens import (
+    SIGNED_TOKEN_PREFIX,
+    SignedTokenClaims,
+    decode_signed_token,
+    get_revocation_list,
+    is_token_revoked,
+    issue_signed_token,
+    signing_key,
+)
 
 
 AUTH_LOGGER = logging.getLogger("app.auth")
+SESSION_REJECTED_LOG_MESSAGE = (
+    "session_rejected user_id=%(user_id)s session_fp=%(session_fp)s"
+)
 AUTH_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9._-]{2,63}$")
 TOKEN_PREFIX = "sess_"
-SESSION_KEY_PREFIX = "auth:session:"
-DUMMY_CREDENTIAL = (
-    "$2b$12$ty6YYsI7bCgkpeWQzf3ty.3XgTShOSrSxn/AidP3MDVmLyS9AeJrK"
+USER_SNAPSHOT_KEY_PREFIX = "auth:user:"
+USER_VERSION_KEY_PREFIX = "auth:user-version:"
+SCRIPT_SESSION_MISSING = 0
+SCRIPT_SESSION_VALID = 1
+SCRIPT_SESSION_MALFORMED = -1
+SCRIPT_SESSION_STALE = -2
+# Fetches a session from the first candidate key that exists, compares it
+# with the user's version key, and deletes it when stale, all in one round
+# trip. User keys are derived from the payload, so this requires a
+# non-cluster Redis deployment.
+VALIDATE_SESSION_SCRIPT = """
+local key, payload
+for _, candidate in ipairs(KEYS) do
+    payload = redis.call('GET', candidate)
+    if payload then
+        key = candidate
+        break
+    end
+end
+if not payload then
+    return {0}
+end
+local user_id, session_version
+if string.sub(payload, 1, 3) == 'c1|' then
+    local compact_user_id, compact_version =
+        string.match(payload, '^c1|(%d+)|(%d+)|%d+$')
+    if compact_user_id then
+        user_id = compact_user_id
+        session_version = tonumber(compact_version)
+    end
+else
+    local ok, session = pcall(cjson.decode, payload)
+    if ok and type(session) == 'table'
+        and type(session.user_id) == 'number'
+        and type(session.session_version) == 'number' then
+        user_id = string.format('%d', session.user_id)
+        session_version = session.session_version
+    end
+end
+if not user_id then
+    redis.call('DEL', key)
+    return {-1}
+end
+local version = redis.call('GET', ARGV[1] .. user_id)
+if version and tonumber(version) ~= session_version then
+    redis.call('DEL', key)
+    return {-2, payload}
+end
+local snapshot = false
+if ARGV[2] ~= '' then
+    snapshot = redis.call('GET', ARGV[2] .. user_id)
+end
+return {1, payload, version or false, snapshot or false,
+    redis.call('PTTL', key), key}
+"""
+USERS = User.__table__
+AUTH_USERS = AuthUser.__table__
+IDENTITY_COLUMNS = (
+    USERS.c.id,
+    USERS.c.name,
+    AUTH_USERS.c.auth_id,
+    USERS.c.disabled_at,
+    USERS.c.session_version,
+    USERS.c.created_at,
+    USERS.c.updated_at,
+)
+# Hot-path lookups are built once as Core statements with bound parameters,
+# so every request reuses the memoized cache key and compiled SQL and skips
+# ORM entity loading.
+IDENTITY_BY_USER_ID = (
+    select(*IDENTITY_COLUMNS)
+    .join_from(USERS, AUTH_USERS, AUTH_USERS.c.user_id == USERS.c.id)
+    .where(USERS.c.id == bindparam("user_id"))
+)
+ACCOUNT_BY_AUTH_ID = (
+    select(
+        *IDENTITY_COLUMNS,
+        AUTH_USERS.c.id.label("auth_user_id"),
+        AUTH_USERS.c.credential,
+    )
+    .join_from(USERS, AUTH_USERS, AUTH_USERS.c.user_id == USERS.c.id)
+    .where(AUTH_USERS.c.auth_id == bindparam("auth_id"))
 )
 
 
@@ -41,18 +169,38 @@ class AccountAlreadyExistsError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class UserIdentity:
+    id: int
+    name: str
+    auth_id: str
+    disabled: bool
+    session_version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class Account:
+    user: UserIdentity
+    auth_user_id: int
+    credential: str
+
+
 @dataclass(frozen=True)
 class AuthenticatedSession:
-    user: User
+    user: UserIdentity
     username: str
     session_fingerprint: str
     token_digest: str
+    session_key: str | None = None
+    signed_claims: SignedTokenClaims | None = None
 
 
 @dataclass(frozen=True)
 class IssuedToken:
     access_token: str
-    user: User
+    user: UserIdentity
     username: str
 
 
@@ -67,6 +215,14 @@ class SessionInspection:
     created_at: str | None = None
 
 
+@dataclass(frozen=True)
+class IdentityLookupBenchmark:
+    path: str
+    microseconds_per_lookup: float
+    cache_hits: int
+    cache_misses: int
+
+
 def normalize_auth_id(auth_id: str) -> str:
     normalized = auth_id.strip().lower()
     if not AUTH_ID_PATTERN.fullmatch(normalized):
@@ -84,33 +240,192 @@ def normalize_name(name: str) -> str:
     return normalized
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt(rounds=12),
-    ).decode("ascii")
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def session_fingerprint(digest: str) -> str:
+    return digest[:12]
+
+
+def session_key(digest: str) -> str:
+    return session_key_for(digest, get_settings().AUTH_SESSION_ENCODING)
+
+
+def session_keys(digest: str, *, all_encodings: bool = False) -> list[str]:
+    settings = get_settings()
+    keys = [session_key_for(digest, settings.AUTH_SESSION_ENCODING)]
+    if all_encodings or settings.AUTH_SESSION_DUAL_READ:
+        keys.extend(
+            session_key_for(digest, encoding)
+            for encoding in SESSION_ENCODINGS
+            if encoding != settings.AUTH_SESSION_ENCODING
+        )
+    return keys
+
+
+def user_identity(user: User, auth_id: str) -> UserIdentity:
+    return UserIdentity(
+        id=user.id,
+        name=user.name,
+        auth_id=auth_id,
+        disabled=user.disabled_at is not None,
+        session_version=user.session_version,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
 
 
-def verify_password(password: str, credential: str) -> bool:
+def _identity_from_row(row: Row[Any]) -> UserIdentity:
+    return UserIdentity(
+        id=row.id,
+        name=row.name,
+        auth_id=row.auth_id,
+        disabled=row.disabled_at is not None,
+        session_version=row.session_version,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def user_snapshot_key(user_id: int) -> str:
+    return f"{USER_SNAPSHOT_KEY_PREFIX}{user_id}"
+
+
+def _encode_user_snapshot(identity: UserIdentity) -> str:
+    return json.dumps(
+        {
+            "id": identity.id,
+            "name": identity.name,
+            "auth_id": identity.auth_id,
+            "disabled": identity.disabled,
+            "session_version": identity.session_version,
+            "created_at": identity.created_at.isoformat(),
+            "updated_at": identity.updated_at.isoformat(),
+        },
+        separators=(",", ":"),
+    )
+
+
+def _decode_user_snapshot(raw_snapshot: str) -> UserIdentity | None:
     try:
-        return bcrypt.checkpw(
-            password.encode("utf-8"),
-            credential.encode("ascii"),
+        snapshot = json.loads(raw_snapshot)
+        return UserIdentity(
+            id=int(snapshot["id"]),
+            name=str(snapshot["name"]),
+            auth_id=str(snapshot["auth_id"]),
+            disabled=bool(snapshot["disabled"]),
+            session_version=int(snapshot["session_version"]),
+            created_at=datetime.fromisoformat(snapshot["created_at"]),
+            updated_at=datetime.fromisoformat(snapshot["updated_at"]),
         )
-    except (ValueError, UnicodeError):
-        return False
+    except (KeyError, TypeError, ValueError, json.JSONDecodeError):
+        return None
 
 
-def token_digest(token: str) -> str:
-    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+async def _store_user_snapshot(
+    redis: Redis,
+    identity: UserIdentity,
+    *,
+    only_if_missing: bool,
+) -> None:
+    settings = get_settings()
+    if not settings.AUTH_USER_SNAPSHOT_ENABLED:
+        if not only_if_missing and settings.AUTH_SESSION_STORE == "redis":
+            await redis.delete(user_snapshot_key(identity.id))
+        return
+    # Readers only fill a missing snapshot, so a snapshot built from a read
+    # that raced an account mutation can never replace the mutation's write.
+    await redis.set(
+        user_snapshot_key(identity.id),
+        _encode_user_snapshot(identity),
+        ex=settings.AUTH_USER_SNAPSHOT_TTL_SECONDS,
+        nx=only_if_missing,
+    )
 
 
-def session_fingerprint(digest: str) -> str:
-    return digest[:12]
+def user_version_key(user_id: int) -> str:
+    return f"{USER_VERSION_KEY_PREFIX}{user_id}"
 
 
-def session_key(digest: str) -> str:
-    return f"{SESSION_KEY_PREFIX}{digest}"
+async def _store_user_version(
+    redis: Redis,
+    identity: UserIdentity,
+    *,
+    only_if_missing: bool,
+) -> None:
+    # Version keys only serve script validation of Redis-stored sessions.
+    # An expired version key only costs a MySQL fallback, which refills it.
+    if get_settings().AUTH_SESSION_STORE != "redis":
+        return
+    await redis.set(
+        user_version_key(identity.id),
+        identity.session_version,
+        ex=get_settings().AUTH_SESSION_TTL_SECONDS,
+        nx=only_if_missing,
+    )
+
+
+async def _drop_user_state(redis: Redis, user_id: int) -> None:
+    # Until the mutation commits, readers refill these keys from the old row
+    # with NX writes, which the post-commit write then replaces.
+    settings = get_settings()
+    keys = []
+    if settings.AUTH_SESSION_STORE == "redis":
+        keys = [user_snapshot_key(user_id), user_version_key(user_id)]
+    elif settings.AUTH_USER_SNAPSHOT_ENABLED:
+        keys = [user_snapshot_key(user_id)]
+    if keys:
+        await redis.delete(*keys)
+
+
+async def _load_user_identity(
+    db: AsyncSession,
+    redis: Redis,
+    user_id: int,
+    *,
+    read_snapshot: bool = True,
+) -> UserIdentity | None:
+    snapshot_enabled = get_settings().AUTH_USER_SNAPSHOT_ENABLED
+    if snapshot_enabled and read_snapshot:
+        raw_snapshot = await redis.get(user_snapshot_key(user_id))
+        if raw_snapshot is not None:
+            identity = _decode_user_snapshot(raw_snapshot)
+            if identity is not None:
+                return identity
+
+    row = await _read_user_row(
+        db,
+        redis,
+        IDENTITY_BY_USER_ID,
+        {"user_id": user_id},
+    )
+    if row is None:
+        return None
+    identity = _identity_from_row(row)
+    if snapshot_enabled:
+        await _store_user_snapshot(redis, identity, only_if_missing=True)
+    return identity
+
+
+async def _read_user_row(
+    db: AsyncSession,
+    redis: Redis,
+    statement: Select[Any],
+    parameters: dict[str, Any],
+) -> Row[Any] | None:
+    rows = await read_from_replica(db, statement, parameters)
+    if rows:
+        row = rows[0]
+        # Account mutations write the version key once they commit, so a
+        # replica behind it has not yet applied a reset, disable, or enable.
+        current_version = await redis.get(user_version_key(row.id))
+        if current_version is None or int(current_version) <= (
+            row.session_version
+        ):
+            return row
+    # Unknown rows may have been created after the replica's position.
+    return (await execute_read(db, statement, parameters)).one_or_none()
 
 
 def _new_token() -> str:
@@ -121,21 +436,89 @@ async def _find_account(
     db: AsyncSession,
     auth_id: str,
     *,
-    for_update: bool = False,
+    redis: Redis | None = None,
+) -> Account | None:
+    parameters = {"auth_id": auth_id}
+    if redis is not None:
+        row = await _read_user_row(db, redis, ACCOUNT_BY_AUTH_ID, parameters)
+    else:
+        row = (
+            await execute_read(db, ACCOUNT_BY_AUTH_ID, parameters)
+        ).one_or_none()
+    if row is None:
+        return None
+    return Account(
+        user=_identity_from_row(row),
+        auth_user_id=row.auth_user_id,
+        credential=row.credential,
+    )
+
+
+async def _lock_account(
+    db: AsyncSession,
+    auth_id: str,
 ) -> tuple[User, AuthUser] | None:
-    statement = (
-        select(User, AuthUser)
-        .join(AuthUser, AuthUser.user_id == User.id)
-        .where(AuthUser.auth_id == auth_id)
-    )
-    if for_update:
-        statement = statement.with_for_update()
-    row = (await db.execute(statement)).one_or_none()
+    # Mutations keep ORM entities so their changes flush as usual.
+    row = (
+        await db.execute(
+            select(User, AuthUser)
+            .join(AuthUser, AuthUser.user_id == User.id)
+            .where(AuthUser.auth_id == auth_id)
+            .with_for_update()
+        )
+    ).one_or_none()
     if row is None:
         return None
     return row[0], row[1]
 
 
+_configured_dummy_credential: str | None = None
+
+
+async def _dummy_credential() -> str:
+    # Unknown and malformed usernames must cost the same as a real
+    # verification, so the dummy follows the configured scheme and cost.
+    global _configured_dummy_credential
+    if not credential_needs_rehash(DUMMY_CREDENTIAL):
+        return DUMMY_CREDENTIAL
+    if _configured_dummy_credential is None or credential_needs_rehash(
+        _configured_dummy_credential
+    ):
+        _configured_dummy_credential = await run_credential_work(
+            hash_password,
+            secrets.token_urlsafe(32),
+        )
+    return _configured_dummy_credential
+
+
+async def _rehash_credential(
+    db: AsyncSession,
+    *,
+    account: Account,
+    password: str,
+) -> None:
+    try:
+        credential = await run_credential_work(hash_password, password)
+    except CredentialPoolBusyError:
+        return
+
+    # Compare-and-set so a concurrent password reset is never overwritten.
+    result = await db.execute(
+        update(AuthUser)
+        .where(
+            AuthUser.id == account.auth_user_id,
+            AuthUser.credential == account.credential,
+        )
+        .values(credential=credential)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        AUTH_LOGGER.info(
+            "credential_rehashed user_id=%(user_id)d",
+            LogFields(user_id=account.user.id),
+        )
+
+
 async def create_internal_user(
     db: AsyncSession,
     *,
@@ -145,7 +528,7 @@ async def create_internal_user(
 ) -> User:
     normalized_auth_id = normalize_auth_id(auth_id)
     normalized_name = normalize_name(name)
-    credential = hash_password(password)
+    credential = await run_credential_work(hash_password, password)
     user = User(name=normalized_name)
 
     try:
@@ -173,42 +556,62 @@ async def authenticate_internal_user(
     *,
     auth_id: str,
     password: str,
+    client_address: str | None = None,
 ) -> IssuedToken:
+    login_attempt = await enforce_login_throttle(
+        redis,
+        auth_id=auth_id,
+        client_address=client_address,
+    )
     try:
         normalized_auth_id = normalize_auth_id(auth_id)
     except ValueError as exc:
-        verify_password(password, DUMMY_CREDENTIAL)
+        await run_credential_work(
+            verify_password,
+            password,
+            await _dummy_credential(),
+        )
         raise AuthenticationError from exc
 
-    account = await _find_account(db, normalized_auth_id)
-    credential = account[1].credential if account is not None else DUMMY_CREDENTIAL
-    password_matches = verify_password(password, credential)
+    account = await _find_account(db, normalized_auth_id, redis=redis)
+    credential = (
+        account.credential
+        if account is not None
+        else await _dummy_credential()
+    )
+    password_matches = await run_credential_work(
+        verify_password,
+        password,
+        credential,
+    )
     if (
         account is None
         or not password_matches
-        or account[0].disabled_at is not None
+        or account.user.disabled
     ):
         raise AuthenticationError
 
-    user = account[0]
-    token = _new_token()
-    digest = token_digest(token)
-    fingerprint = session_fingerprint(digest)
-    created_at = get_local_now().isoformat(timespec="seconds")
-    payload = {
-        "user_id": user.id,
-        "session_version": user.session_version,
-        "created_at": created_at,
-    }
-    await redis.set(
-        session_key(digest),
-        json.dumps(payload, separators=(",", ":")),
-        ex=get_settings().AUTH_SESSION_TTL_SECONDS,
-    )
+    await release_login_attempt(redis, login_attempt)
+    user = account.user
+    if credential_needs_rehash(credential):
+        await _rehash_credential(
+            db,
+            account=account,
+            password=password,
+        )
+    settings = get_settings()
+    if settings.AUTH_TOKEN_FORMAT == "signed":
+        token = _issue_signed_session(user)
+    else:
+        token = await _store_opaque_session(redis, user)
+    await _store_user_snapshot(redis, user, only_if_missing=True)
+    await _store_user_version(redis, user, only_if_missing=True)
     AUTH_LOGGER.info(
-        "session_created user_id=%d session_fp=%s",
-        user.id,
-        fingerprint,
+        "session_created user_id=%(user_id)d session_fp=%(session_fp)s",
+        LogFields(
+            user_id=user.id,
+            session_fp=session_fingerprint(token_digest(token)),
+        ),
     )
     return IssuedToken(
         access_token=token,
@@ -217,19 +620,54 @@ async def authenticate_internal_user(
     )
 
 
-def _decode_session_payload(raw_payload: str) -> dict[str, Any]:
+def _issue_signed_session(user: UserIdentity) -> str:
+    key = signing_key()
+    if key is None:
+        raise RuntimeError("AUTH_TOKEN_SIGNING_KEY is not configured")
+    token, _ = issue_signed_token(
+        user_id=user.id,
+        session_version=user.session_version,
+        ttl_seconds=get_settings().AUTH_SESSION_TTL_SECONDS,
+        key=key,
+    )
+    return token
+
+
+async def _store_opaque_session(redis: Redis, user: UserIdentity) -> str:
+    token = _new_token()
+    digest = token_digest(token)
+    created_at = time()
+    settings = get_settings()
+    evicted_keys = await get_session_store(redis).store_session(
+        session_key=session_key(digest),
+        user_id=user.id,
+        payload=encode_session_payload(
+            user_id=user.id,
+            session_version=user.session_version,
+            created_at=created_at,
+            encoding=settings.AUTH_SESSION_ENCODING,
+        ),
+        ttl_seconds=settings.AUTH_SESSION_TTL_SECONDS,
+        created_at_ms=int(created_at * 1000),
+        max_sessions=settings.AUTH_MAX_SESSIONS_PER_USER,
+    )
+    for evicted_key in evicted_keys:
+        await publish_session_invalidation(redis, session_key=evicted_key)
+        AUTH_LOGGER.info(
+            "session_evicted user_id=%(user_id)d session_fp=%(session_fp)s",
+            LogFields(
+                user_id=user.id,
+                session_fp=session_key_fingerprint(evicted_key),
+            ),
+        )
+    return token
+
+
+def decode_session_payload(raw_payload: str) -> dict[str, Any]:
     try:
-        payload = json.loads(raw_payload)
-        user_id = int(payload["user_id"])
-        session_version = int(payload["session_version"])
-        created_at = str(payload["created_at"])
+        return decode_payload_fields(raw_payload)
     except (KeyError, TypeError, ValueError, json.JSONDecodeError) as exc:
         raise AuthenticationError from exc
-    return {
-        "user_id": user_id,
-        "session_version": session_version,
-        "created_at": created_at,
-    }
 
 
 async def resolve_session(
@@ -237,60 +675,189 @@ async def resolve_session(
     redis: Redis,
     token: str,
 ) -> AuthenticatedSession:
+    if token.startswith(SIGNED_TOKEN_PREFIX):
+        return await _resolve_signed_session(db, redis, token)
     if not token.startswith(TOKEN_PREFIX):
         raise AuthenticationError
 
     digest = token_digest(token)
     fingerprint = session_fingerprint(digest)
-    key = session_key(digest)
-    raw_payload = await redis.get(key)
-    if raw_payload is None:
-        raise AuthenticationError
-
-    try:
-        payload = _decode_session_payload(raw_payload)
-    except AuthenticationError:
+    keys = session_keys(digest)
+    cache = get_session_cache()
+    if cache is not None:
+        for key in keys:
+            if (cached := cache.get(key)) is not None:
+                _bind_session_to_request(fingerprint)
+                return cached
+
+    validate = (
+        _validate_session_with_script
+        if get_settings().AUTH_SESSION_VALIDATION == "script"
+        else _validate_session
+    )
+    key, payload, identity, ttl_milliseconds = await validate(
+        db,
+        redis,
+        keys=keys,
+        fingerprint=fingerprint,
+    )
+    if (
+        identity is None
+        or identity.disabled
+        or identity.session_version != payload["session_version"]
+    ):
         await _delete_session_best_effort(
             redis,
             key=key,
             fingerprint=fingerprint,
+            user_id=payload["user_id"],
         )
-        raise
+        AUTH_LOGGER.info(
+            SESSION_REJECTED_LOG_MESSAGE,
+            LogFields(user_id=payload["user_id"], session_fp=fingerprint),
+        )
+        raise AuthenticationError
 
-    identity_statement = (
-        select(User, AuthUser.auth_id)
-        .join(AuthUser, AuthUser.user_id == User.id)
-        .where(User.id == payload["user_id"])
+    if session_needs_refresh(ttl_milliseconds):
+        await get_session_store(redis).refresh_session(
+            key,
+            user_id=payload["user_id"],
+        )
+
+    _bind_session_to_request(fingerprint)
+    session = AuthenticatedSession(
+        user=identity,
+        username=identity.auth_id,
+        session_fingerprint=fingerprint,
+        token_digest=digest,
+        session_key=key,
     )
-    identity = (await db.execute(identity_statement)).one_or_none()
-    user = identity[0] if identity is not None else None
+    if cache is not None:
+        cache.put(key, user_id=identity.id, value=session)
+    return session
+
+
+async def _resolve_signed_session(
+    db: AsyncSession,
+    redis: Redis,
+    token: str,
+) -> AuthenticatedSession:
+    key = signing_key()
+    if key is None:
+        raise AuthenticationError
+    claims = decode_signed_token(token, key)
+    if claims is None or claims.expires_at <= time():
+        raise AuthenticationError
+    if await get_revocation_list().contains(redis, claims.token_id):
+        raise AuthenticationError
+
+    digest = token_digest(token)
+    fingerprint = session_fingerprint(digest)
+    cache = get_user_identity_cache()
+    identity = cache.get(str(claims.user_id)) if cache is not None else None
+    if identity is None:
+        identity = await _load_user_identity(db, redis, claims.user_id)
+        if identity is not None and cache is not None:
+            cache.put(str(identity.id), user_id=identity.id, value=identity)
     if (
-        user is None
-        or user.disabled_at is not None
-        or user.session_version != payload["session_version"]
+        identity is None
+        or identity.disabled
+        or identity.session_version != claims.session_version
     ):
+        AUTH_LOGGER.info(
+            SESSION_REJECTED_LOG_MESSAGE,
+            LogFields(user_id=claims.user_id, session_fp=fingerprint),
+        )
+        raise AuthenticationError
+
+    _bind_session_to_request(fingerprint)
+    return AuthenticatedSession(
+        user=identity,
+        username=identity.auth_id,
+        session_fingerprint=fingerprint,
+        token_digest=digest,
+        signed_claims=claims,
+    )
+
+
+async def _validate_session(
+    db: AsyncSession,
+    redis: Redis,
+    *,
+    keys: list[str],
+    fingerprint: str,
+) -> tuple[str, dict[str, Any], UserIdentity | None, int | None]:
+    stored = await get_session_store(redis).fetch_session(
+        keys,
+        with_ttl=get_settings().AUTH_SESSION_SLIDING_ENABLED,
+    )
+    key, raw_payload = stored.key, stored.payload
+    if raw_payload is None:
+        raise AuthenticationError
+
+    try:
+        payload = decode_session_payload(raw_payload)
+    except AuthenticationError:
         await _delete_session_best_effort(
             redis,
             key=key,
             fingerprint=fingerprint,
-            user_id=payload["user_id"],
         )
+        raise
+
+    identity = await _load_user_identity(db, redis, payload["user_id"])
+    return key, payload, identity, stored.ttl_milliseconds
+
+
+async def _validate_session_with_script(
+    db: AsyncSession,
+    redis: Redis,
+    *,
+    keys: list[str],
+    fingerprint: str,
+) -> tuple[str, dict[str, Any], UserIdentity | None, int | None]:
+    snapshot_enabled = get_settings().AUTH_USER_SNAPSHOT_ENABLED
+    result = await redis.register_script(VALIDATE_SESSION_SCRIPT)(
+        keys=keys,
+        args=[
+            USER_VERSION_KEY_PREFIX,
+            USER_SNAPSHOT_KEY_PREFIX if snapshot_enabled else "",
+        ],
+    )
+    status = int(result[0])
+    if status in (SCRIPT_SESSION_MISSING, SCRIPT_SESSION_MALFORMED):
+        raise AuthenticationError
+
+    payload = decode_session_payload(result[1])
+    if status == SCRIPT_SESSION_STALE:
         AUTH_LOGGER.info(
-            "session_rejected user_id=%s session_fp=%s",
-            payload["user_id"],
-            fingerprint,
+            SESSION_REJECTED_LOG_MESSAGE,
+            LogFields(user_id=payload["user_id"], session_fp=fingerprint),
         )
         raise AuthenticationError
 
+    _, _, version, raw_snapshot, ttl_milliseconds, key = result
+    identity = (
+        _decode_user_snapshot(raw_snapshot)
+        if raw_snapshot is not None
+        else None
+    )
+    if identity is None:
+        identity = await _load_user_identity(
+            db,
+            redis,
+            payload["user_id"],
+            read_snapshot=False,
+        )
+    if version is None and identity is not None:
+        await _store_user_version(redis, identity, only_if_missing=True)
+    return key, payload, identity, int(ttl_milliseconds)
+
+
+def _bind_session_to_request(fingerprint: str) -> None:
     context = get_request_context()
     if context is not None:
         context.session_fingerprint = fingerprint
-    return AuthenticatedSession(
-        user=user,
-        username=identity[1],
-        session_fingerprint=fingerprint,
-        token_digest=digest,
-    )
 
 
 async def _delete_session_best_effort(
@@ -301,34 +868,69 @@ async def _delete_session_best_effort(
     user_id: int | None = None,
 ) -> None:
     try:
-        await redis.delete(key)
+        await get_session_store(redis).delete_session(key)
     except RedisError:
         AUTH_LOGGER.warning(
-            "session_cleanup_failed user_id=%s session_fp=%s",
-            user_id if user_id is not None else "-",
-            fingerprint,
+            "session_cleanup_failed user_id=%(user_id)s "
+            "session_fp=%(session_fp)s",
+            LogFields(user_id=user_id, session_fp=fingerprint),
             exc_info=True,
         )
 
 
 async def logout_session(redis: Redis, session: AuthenticatedSession) -> None:
-    await redis.delete(session_key(session.token_digest))
+    if session.signed_claims is not None:
+        await get_revocation_list().revoke(redis, session.signed_claims)
+        AUTH_LOGGER.info(
+            "session_revoked user_id=%(user_id)d session_fp=%(session_fp)s",
+            LogFields(
+                user_id=session.user.id,
+                session_fp=session.session_fingerprint,
+            ),
+        )
+        return
+
+    await get_session_store(redis).delete_session(
+        session.session_key,
+        user_id=session.user.id,
+    )
+    await publish_session_invalidation(redis, session_key=session.session_key)
+    AUTH_LOGGER.info(
+        "session_deleted user_id=%(user_id)d session_fp=%(session_fp)s",
+        LogFields(
+            user_id=session.user.id,
+            session_fp=session.session_fingerprint,
+        ),
+    )
+
+
+async def _purge_sessions(redis: Redis, *, user_id: int) -> None:
+    purged = await get_session_store(redis).purge_user_sessions(user_id)
     AUTH_LOGGER.info(
-        "session_deleted user_id=%d session_fp=%s",
-        session.user.id,
-        session.session_fingerprint,
+        "sessions_purged user_id=%(user_id)d sessions=%(sessions)d",
+        LogFields(user_id=user_id, sessions=purged),
     )
 
 
+async def _publish_account_change(
+    redis: Redis,
+    identity: UserIdentity,
+) -> None:
+    await _store_user_snapshot(redis, identity, only_if_missing=False)
+    await _store_user_version(redis, identity, only_if_missing=False)
+    await publish_session_invalidation(redis, user_id=identity.id)
+
+
 async def reset_internal_password(
     db: AsyncSession,
+    redis: Redis,
     *,
     auth_id: str,
     password: str,
 ) -> User:
     normalized_auth_id = normalize_auth_id(auth_id)
-    credential = hash_password(password)
-    account = await _find_account(db, normalized_auth_id, for_update=True)
+    credential = await run_credential_work(hash_password, password)
+    account = await _lock_account(db, normalized_auth_id)
     if account is None:
         raise AccountNotFoundError(
             f"account {normalized_auth_id!r} was not found"
@@ -336,17 +938,25 @@ async def reset_internal_password(
     user, auth_user = account
     auth_user.credential = credential
     user.session_version += 1
+    await db.flush()
+    identity = user_identity(user, normalized_auth_id)
+    await _drop_user_state(redis, user.id)
+    await _purge_sessions(redis, user_id=user.id)
+    # Other workers must not reload the old row before the new version is
+    # committed, and a rolled-back change must not be announced at all.
+    after_commit(db, partial(_publish_account_change, redis, identity))
     return user
 
 
 async def set_internal_user_enabled(
     db: AsyncSession,
+    redis: Redis,
     *,
     auth_id: str,
     enabled: bool,
 ) -> User:
     normalized_auth_id = normalize_auth_id(auth_id)
-    account = await _find_account(db, normalized_auth_id, for_update=True)
+    account = await _lock_account(db, normalized_auth_id)
     if account is None:
         raise AccountNotFoundError(
             f"account {normalized_auth_id!r} was not found"
@@ -354,23 +964,40 @@ async def set_internal_user_enabled(
     user = account[0]
     user.disabled_at = None if enabled else get_local_now()
     user.session_version += 1
+    await db.flush()
+    identity = user_identity(user, normalized_auth_id)
+    await _drop_user_state(redis, user.id)
+    await _purge_sessions(redis, user_id=user.id)
+    after_commit(db, partial(_publish_account_change, redis, identity))
     return user
 
 
 async def disable_internal_user(
     db: AsyncSession,
+    redis: Redis,
     *,
     auth_id: str,
 ) -> User:
-    return await set_internal_user_enabled(db, auth_id=auth_id, enabled=False)
+    return await set_internal_user_enabled(
+        db,
+        redis,
+        auth_id=auth_id,
+        enabled=False,
+    )
 
 
 async def enable_internal_user(
     db: AsyncSession,
+    redis: Redis,
     *,
     auth_id: str,
 ) -> User:
-    return await set_internal_user_enabled(db, auth_id=auth_id, enabled=True)
+    return await set_internal_user_enabled(
+        db,
+        redis,
+        auth_id=auth_id,
+        enabled=True,
+    )
 
 
 async def inspect_session(
@@ -381,13 +1008,27 @@ async def inspect_session(
 ) -> SessionInspection:
     digest = token_digest(token)
     fingerprint = session_fingerprint(digest)
-    key = session_key(digest)
-    raw_payload = await redis.get(key)
-    if raw_payload is None:
+    if token.startswith(SIGNED_TOKEN_PREFIX):
+        return await _inspect_signed_session(
+            db,
+            redis,
+            token=token,
+            fingerprint=fingerprint,
+        )
+    stored = await get_session_store(redis).fetch_session(
+        session_keys(digest, all_encodings=True),
+        with_ttl=True,
+    )
+    if stored.payload is None:
         return SessionInspection(fingerprint=fingerprint, exists=False)
 
-    payload = _decode_session_payload(raw_payload)
-    ttl_seconds = await redis.ttl(key)
+    payload = decode_session_payload(stored.payload)
+    ttl_milliseconds = stored.ttl_milliseconds
+    ttl_seconds = (
+        ttl_milliseconds // 1000
+        if ttl_milliseconds is not None and ttl_milliseconds > 0
+        else ttl_milliseconds
+    )
     user = await db.get(User, payload["user_id"])
     return SessionInspection(
         fingerprint=fingerprint,
@@ -396,5 +1037,97 @@ async def inspect_session(
         session_version=payload["session_version"],
         database_version=user.session_version if user is not None else None,
         ttl_seconds=ttl_seconds,
-        created_at=payload["created_at"],
+        created_at=format_session_created_at(payload["created_at"]),
+    )
+
+
+async def _inspect_signed_session(
+    db: AsyncSession,
+    redis: Redis,
+    *,
+    token: str,
+    fingerprint: str,
+) -> SessionInspection:
+    key = signing_key()
+    claims = decode_signed_token(token, key) if key is not None else None
+    ttl_seconds = claims.expires_at - int(time()) if claims is not None else 0
+    if (
+        claims is None
+        or ttl_seconds <= 0
+        or await is_token_revoked(redis, claims.token_id)
+    ):
+        return SessionInspection(fingerprint=fingerprint, exists=False)
+
+    user = await db.get(User, claims.user_id)
+    return SessionInspection(
+        fingerprint=fingerprint,
+        exists=True,
+        user_id=claims.user_id,
+        session_version=claims.session_version,
+        database_version=user.session_version if user is not None else None,
+        ttl_seconds=ttl_seconds,
+        created_at=format_session_created_at(claims.issued_at),
     )
+
+
+async def _orm_identity_lookup(
+    db: AsyncSession,
+    user_id: int,
+) -> UserIdentity | None:
+    row = (
+        await db.execute(
+            select(User, AuthUser.auth_id)
+            .join(AuthUser, AuthUser.user_id == User.id)
+            .where(User.id == user_id)
+        )
+    ).one_or_none()
+    # Each request starts with an empty identity map.
+    db.expunge_all()
+    return user_identity(row[0], row[1]) if row is not None else None
+
+
+async def _core_identity_lookup(
+    db: AsyncSession,
+    user_id: int,
+) -> UserIdentity | None:
+    row = (
+        await db.execute(IDENTITY_BY_USER_ID, {"user_id": user_id})
+    ).one_or_none()
+    return _identity_from_row(row) if row is not None else None
+
+
+async def benchmark_identity_lookup(
+    db: AsyncSession,
+    *,
+    auth_id: str,
+    lookups: int,
+) -> list[IdentityLookupBenchmark]:
+    normalized_auth_id = normalize_auth_id(auth_id)
+    account = await _find_account(db, normalized_auth_id)
+    if account is None:
+        raise AccountNotFoundError(
+            f"account {normalized_auth_id!r} was not found"
+        )
+
+    results = []
+    for path, lookup in (
+        ("orm", _orm_identity_lookup),
+        ("core", _core_identity_lookup),
+    ):
+        # Warm the compiled cache so both paths are measured steady-state.
+        await lookup(db, account.user.id)
+        reset_compiled_cache_stats()
+        started_at = perf_counter()
+        for _ in range(lookups):
+            await lookup(db, account.user.id)
+        elapsed = perf_counter() - started_at
+        stats = compiled_cache_stats()
+        results.append(
+            IdentityLookupBenchmark(
+                path=path,
+                microseconds_per_lookup=elapsed / lookups * 1_000_000,
+                cache_hits=stats.hits,
+                cache_misses=stats.misses,
+            )
+        )
+    return results
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from time import monotonic, perf_counter
+from typing import Any, Literal, TypeVar
+
+from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.core.request_context import PHASE_AUTH, record_phase
+
+
+CREDENTIAL_LOGGER = logging.getLogger("app.auth.credential_pool")
+ResultT = TypeVar("ResultT")
+
+
+class CredentialPoolBusyError(Exception):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("credential worker pool is saturated")
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass
+class CredentialPoolStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    wait_seconds_total: float = 0.0
+    run_seconds_total: float = 0.0
+
+
+def _timed_call(
+    func: Callable[..., ResultT],
+    *args: Any,
+) -> tuple[ResultT, float, float]:
+    # time.monotonic is system-wide on Linux, so timestamps taken inside a
+    # process-pool worker are comparable with the submitting process.
+    started_at = monotonic()
+    result = func(*args)
+    return result, started_at, monotonic()
+
+
+class CredentialPool:
+    def __init__(
+        self,
+        *,
+        kind: Literal["thread", "process"],
+        max_workers: int,
+        max_pending: int,
+        retry_after_seconds: int,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Executor | None = None
+        self._stats = CredentialPoolStats()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._stats.in_flight - self.max_workers, 0)
+
+    def stats(self) -> CredentialPoolStats:
+        return replace(self._stats)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="credential",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., ResultT], *args: Any) -> ResultT:
+        stats = self._stats
+        if stats.in_flight >= self.capacity:
+            stats.rejected += 1
+            CREDENTIAL_LOGGER.warning(
+                "credential_pool_rejected operation=%(operation)s "
+                "in_flight=%(in_flight)d capacity=%(capacity)d",
+                LogFields(
+                    operation=func.__name__,
+                    in_flight=stats.in_flight,
+                    capacity=self.capacity,
+                ),
+            )
+            raise CredentialPoolBusyError(self.retry_after_seconds)
+
+        stats.submitted += 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        queue_depth = self.queue_depth
+        submitted_at = monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            work = self._get_executor().submit(_timed_call, func, *args)
+        except BaseException:
+            stats.failed += 1
+            stats.in_flight -= 1
+            raise
+        # The slot belongs to the executor work, not to the awaiting request:
+        # a cancelled request must not free it while the hash still runs.
+        work.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release_slot)
+        )
+        try:
+            result, started_at, finished_at = await asyncio.wrap_future(work)
+        except BaseException:
+            stats.failed += 1
+            raise
+
+        wait_seconds = max(started_at - submitted_at, 0.0)
+        run_seconds = finished_at - started_at
+        stats.completed += 1
+        stats.wait_seconds_total += wait_seconds
+        stats.run_seconds_total += run_seconds
+        CREDENTIAL_LOGGER.debug(
+            "credential_work operation=%(operation)s wait_ms=%(wait_ms).2f "
+            "run_ms=%(run_ms).2f queue_depth=%(queue_depth)d",
+            LogFields(
+                operation=func.__name__,
+                wait_ms=round(wait_seconds * 1000, 2),
+                run_ms=round(run_seconds * 1000, 2),
+                queue_depth=queue_depth,
+            ),
+        )
+        return result
+
+    def _release_slot(self) -> None:
+        self._stats.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_credential_pool: CredentialPool | None = None
+
+
+def get_credential_pool() -> CredentialPool:
+    global _credential_pool
+    if _credential_pool is None:
+        settings = get_settings()
+        _credential_pool = CredentialPool(
+            kind=settings.AUTH_CREDENTIAL_EXECUTOR,
+            max_workers=settings.AUTH_CREDENTIAL_MAX_WORKERS,
+            max_pending=settings.AUTH_CREDENTIAL_MAX_PENDING,
+            retry_after_seconds=settings.AUTH_CREDENTIAL_RETRY_AFTER_SECONDS,
+        )
+    return _credential_pool
+
+
+async def run_credential_work(
+    func: Callable[..., ResultT],
+    *args: Any,
+) -> ResultT:
+    started_at = perf_counter()
+    try:
+        return await get_credential_pool().run(func, *args)
+    finally:
+        record_phase(PHASE_AUTH, perf_counter() - started_at)
+
+
+def close_credential_pool() -> None:
+    global _credential_pool
+    if _credential_pool is not None:
+        _credential_pool.shutdown()
+        _credential_pool = None
@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+import statistics
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Literal
+
+import bcrypt
+
+from app.core.config import get_settings
+
+
+CredentialScheme = Literal["bcrypt", "scrypt"]
+DUMMY_CREDENTIAL = (
+    "$2b$12$ty6YYsI7bCgkpeWQzf3ty.3XgTShOSrSxn/AidP3MDVmLyS9AeJrK"
+)
+BCRYPT_PATTERN = re.compile(r"^\$2[aby]\$(?P<cost>\d{2})\$[./A-Za-z0-9]{53}$")
+SCRYPT_PATTERN = re.compile(
+    r"^\$scrypt\$ln=(?P<cost>\d{1,2}),r=(?P<r>\d{1,3}),p=(?P<p>\d{1,3})"
+    r"\$(?P<salt>[A-Za-z0-9+/]+)\$(?P<hash>[A-Za-z0-9+/]+)$"
+)
+SCRYPT_SALT_BYTES = 16
+SCRYPT_HASH_BYTES = 32
+BENCHMARK_PASSWORD = "credential-benchmark-password"
+
+
+@dataclass(frozen=True)
+class CredentialParameters:
+    scheme: CredentialScheme
+    cost: int
+    block_size: int | None = None
+    parallelism: int | None = None
+
+
+@dataclass(frozen=True)
+class CredentialBenchmark:
+    scheme: CredentialScheme
+    cost: int
+    median_seconds: float
+    max_seconds: float
+
+
+def configured_credential_parameters() -> CredentialParameters:
+    settings = get_settings()
+    if settings.AUTH_CREDENTIAL_SCHEME == "scrypt":
+        return CredentialParameters(
+            scheme="scrypt",
+            cost=settings.AUTH_SCRYPT_LOG_N,
+            block_size=settings.AUTH_SCRYPT_BLOCK_SIZE,
+            parallelism=settings.AUTH_SCRYPT_PARALLELISM,
+        )
+    return CredentialParameters(
+        scheme="bcrypt",
+        cost=settings.AUTH_BCRYPT_ROUNDS,
+    )
+
+
+def credential_parameters(credential: str) -> CredentialParameters | None:
+    if match := BCRYPT_PATTERN.fullmatch(credential):
+        return CredentialParameters(
+            scheme="bcrypt",
+            cost=int(match.group("cost")),
+        )
+    if match := SCRYPT_PATTERN.fullmatch(credential):
+        return CredentialParameters(
+            scheme="scrypt",
+            cost=int(match.group("cost")),
+            block_size=int(match.group("r")),
+            parallelism=int(match.group("p")),
+        )
+    return None
+
+
+def credential_needs_rehash(credential: str) -> bool:
+    return credential_parameters(credential) != configured_credential_parameters()
+
+
+def _b64encode(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+def _scrypt(
+    password: bytes,
+    salt: bytes,
+    *,
+    log_n: int,
+    block_size: int,
+    parallelism: int,
+) -> bytes:
+    return hashlib.scrypt(
+        password,
+        salt=salt,
+        n=2**log_n,
+        r=block_size,
+        p=parallelism,
+        maxmem=256 * block_size * 2**log_n * parallelism,
+        dklen=SCRYPT_HASH_BYTES,
+    )
+
+
+def hash_password_with(password: str, parameters: CredentialParameters) -> str:
+    encoded = password.encode("utf-8")
+    if parameters.scheme == "scrypt":
+        block_size = parameters.block_size or 8
+        parallelism = parameters.parallelism or 1
+        salt = secrets.token_bytes(SCRYPT_SALT_BYTES)
+        digest = _scrypt(
+            encoded,
+            salt,
+            log_n=parameters.cost,
+            block_size=block_size,
+            parallelism=parallelism,
+        )
+        return (
+            f"$scrypt$ln={parameters.cost},r={block_size},p={parallelism}"
+            f"${_b64encode(salt)}${_b64encode(digest)}"
+        )
+    return bcrypt.hashpw(
+        encoded,
+        bcrypt.gensalt(rounds=parameters.cost),
+    ).decode("ascii")
+
+
+def hash_password(password: str) -> str:
+    return hash_password_with(password, configured_credential_parameters())
+
+
+def verify_password(password: str, credential: str) -> bool:
+    try:
+        encoded = password.encode("utf-8")
+        if match := SCRYPT_PATTERN.fullmatch(credential):
+            expected = _b64decode(match.group("hash"))
+            actual = _scrypt(
+                encoded,
+                _b64decode(match.group("salt")),
+                log_n=int(match.group("cost")),
+                block_size=int(match.group("r")),
+                parallelism=int(match.group("p")),
+            )
+            return hmac.compare_digest(actual, expected)
+        return bcrypt.checkpw(encoded, credential.encode("ascii"))
+    except (ValueError, UnicodeError):
+        return False
+
+
+def benchmark_credential_cost(
+    parameters: CredentialParameters,
+    *,
+    samples: int,
+) -> CredentialBenchmark:
+    durations: list[float] = []
+    for _ in range(samples):
+        started_at = perf_counter()
+        hash_password_with(BENCHMARK_PASSWORD, parameters)
+        durations.append(perf_counter() - started_at)
+    return CredentialBenchmark(
+        scheme=parameters.scheme,
+        cost=parameters.cost,
+        median_seconds=statistics.median(durations),
+        max_seconds=max(durations),
+    )
+
+
+def recommend_credential_cost(
+    results: list[CredentialBenchmark],
+    *,
+    target_seconds: float,
+) -> CredentialBenchmark | None:
+    within_target = [
+        result for result in results if result.median_seconds <= target_seconds
+    ]
+    if not within_target:
+        return None
+    return max(within_target, key=lambda result: result.cost)
@@ -0,0 +1,161 @@
+import hashlib
+import math
+import secrets
+from dataclasses import dataclass
+from ipaddress import IPv4Network, IPv6Network, ip_address
+from time import time
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+
+THROTTLE_KEY_PREFIX = "auth:throttle:"
+
+# Sliding-window log over one sorted set per scope. Every scope is checked
+# before any attempt is recorded, so a rejected attempt never extends its own
+# window and the whole decision costs one round trip.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local retry_after = 0
+for index, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[3 + index])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry_after then
+            retry_after = wait
+        end
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class LoginAttempt:
+    keys: tuple[str, ...]
+    member: str
+
+
+class LoginThrottledError(Exception):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("too many sign-in attempts")
+        self.retry_after_seconds = retry_after_seconds
+
+
+def _scope_key(scope: str, value: str) -> str:
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+    return f"{THROTTLE_KEY_PREFIX}{scope}:{digest}"
+
+
+def _is_trusted_proxy(
+    address: str,
+    trusted_proxies: list[IPv4Network | IPv6Network],
+) -> bool:
+    try:
+        parsed = ip_address(address)
+    except ValueError:
+        return False
+    return any(parsed in network for network in trusted_proxies)
+
+
+def login_client_address(
+    peer_address: str | None,
+    forwarded_for: str | None,
+) -> str | None:
+    trusted_proxies = get_settings().trusted_proxy_networks
+    if peer_address is None or not _is_trusted_proxy(
+        peer_address,
+        trusted_proxies,
+    ):
+        return peer_address
+    # Walk X-Forwarded-For from the nearest hop. Entries left of the first
+    # untrusted hop could have been written by the client itself.
+    address = peer_address
+    for hop in reversed((forwarded_for or "").split(",")):
+        if not hop.strip():
+            continue
+        address = hop.strip()
+        if not _is_trusted_proxy(address, trusted_proxies):
+            break
+    return address
+
+
+def login_throttle_keys(
+    *,
+    auth_id: str,
+    client_address: str | None,
+) -> list[tuple[str, int]]:
+    settings = get_settings()
+    keys = [
+        (
+            _scope_key("user", auth_id.strip().lower()),
+            settings.AUTH_LOGIN_MAX_ATTEMPTS_PER_USERNAME,
+        )
+    ]
+    if client_address:
+        keys.append(
+            (
+                _scope_key("client", client_address),
+                settings.AUTH_LOGIN_MAX_ATTEMPTS_PER_CLIENT,
+            )
+        )
+    return keys
+
+
+async def enforce_login_throttle(
+    redis: Redis,
+    *,
+    auth_id: str,
+    client_address: str | None,
+) -> LoginAttempt | None:
+    settings = get_settings()
+    if not settings.AUTH_LOGIN_THROTTLE_ENABLED:
+        return None
+
+    scoped_keys = login_throttle_keys(
+        auth_id=auth_id,
+        client_address=client_address,
+    )
+    now_ms = int(time() * 1000)
+    attempt = LoginAttempt(
+        keys=tuple(key for key, _ in scoped_keys),
+        member=f"{now_ms}-{secrets.token_hex(4)}",
+    )
+    retry_after_ms = await redis.register_script(SLIDING_WINDOW_SCRIPT)(
+        keys=list(attempt.keys),
+        args=[
+            now_ms,
+            settings.AUTH_LOGIN_THROTTLE_WINDOW_SECONDS * 1000,
+            attempt.member,
+            *(limit for _, limit in scoped_keys),
+        ],
+    )
+    if int(retry_after_ms) > 0:
+        raise LoginThrottledError(max(math.ceil(int(retry_after_ms) / 1000), 1))
+    return attempt
+
+
+async def release_login_attempt(
+    redis: Redis,
+    attempt: LoginAttempt | None,
+) -> None:
+    # A successful sign-in no longer counts toward either limit, so users
+    # sharing an address are not locked out by each other's sign-ins.
+    if attempt is None:
+        return
+    async with redis.pipeline(transaction=False) as pipeline:
+        for key in attempt.keys:
+            pipeline.zrem(key, attempt.member)
+        await pipeline.execute()
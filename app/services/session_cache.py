@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from time import monotonic
+from typing import Generic, TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.db.redis import create_redis_client
+
+
+CACHE_LOGGER = logging.getLogger("app.auth.session_cache")
+INVALIDATION_CHANNEL = "auth:session:invalidate"
+USER_MESSAGE_PREFIX = "user:"
+SESSION_MESSAGE_PREFIX = "session:"
+LISTENER_RETRY_SECONDS = 1.0
+ValueT = TypeVar("ValueT")
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+
+@dataclass(frozen=True)
+class _CacheEntry(Generic[ValueT]):
+    user_id: int
+    value: ValueT
+    expires_at: float
+
+
+class SessionCache(Generic[ValueT]):
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _CacheEntry[ValueT]] = OrderedDict()
+        self._digests_by_user: dict[int, set[str]] = {}
+        self._stats = SessionCacheStats()
+
+    def stats(self) -> SessionCacheStats:
+        return replace(self._stats, size=len(self._entries))
+
+    def get(self, digest: str) -> ValueT | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        if entry.expires_at <= monotonic():
+            self._remove(digest)
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self._stats.hits += 1
+        return entry.value
+
+    def put(self, digest: str, *, user_id: int, value: ValueT) -> None:
+        self._remove(digest)
+        self._entries[digest] = _CacheEntry(
+            user_id=user_id,
+            value=value,
+            expires_at=monotonic() + self.ttl_seconds,
+        )
+        self._digests_by_user.setdefault(user_id, set()).add(digest)
+        while len(self._entries) > self.max_entries:
+            oldest_digest = next(iter(self._entries))
+            self._remove(oldest_digest)
+            self._stats.evictions += 1
+
+    def invalidate_session(self, digest: str) -> None:
+        if self._remove(digest):
+            self._stats.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        for digest in tuple(self._digests_by_user.get(user_id, ())):
+            self.invalidate_session(digest)
+
+    def clear(self) -> None:
+        self._stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self._digests_by_user.clear()
+
+    def _remove(self, digest: str) -> bool:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return False
+        digests = self._digests_by_user.get(entry.user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_user[entry.user_id]
+        return True
+
+    def apply_invalidation(self, message: str) -> None:
+        if message.startswith(USER_MESSAGE_PREFIX):
+            try:
+                user_id = int(message.removeprefix(USER_MESSAGE_PREFIX))
+            except ValueError:
+                return
+            self.invalidate_user(user_id)
+        elif message.startswith(SESSION_MESSAGE_PREFIX):
+            self.invalidate_session(message.removeprefix(SESSION_MESSAGE_PREFIX))
+
+
+_session_cache: SessionCache | None = None
+_user_identity_cache: SessionCache | None = None
+
+
+def get_session_cache() -> SessionCache | None:
+    global _session_cache
+    settings = get_settings()
+    if not settings.AUTH_SESSION_CACHE_ENABLED:
+        return None
+    if _session_cache is None:
+        _session_cache = SessionCache(
+            max_entries=settings.AUTH_SESSION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AUTH_SESSION_CACHE_TTL_SECONDS,
+        )
+    return _session_cache
+
+
+def get_user_identity_cache() -> SessionCache | None:
+    global _user_identity_cache
+    settings = get_settings()
+    if settings.AUTH_TOKEN_FORMAT != "signed":
+        return None
+    if _user_identity_cache is None:
+        # Signed tokens are checked against identities keyed by user ID.
+        _user_identity_cache = SessionCache(
+            max_entries=settings.AUTH_SESSION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AUTH_SIGNED_TOKEN_REFRESH_SECONDS,
+        )
+    return _user_identity_cache
+
+
+def _invalidation_targets() -> list[SessionCache]:
+    return [
+        cache
+        for cache in (get_session_cache(), get_user_identity_cache())
+        if cache is not None
+    ]
+
+
+async def publish_session_invalidation(
+    redis: Redis,
+    *,
+    user_id: int | None = None,
+    session_key: str | None = None,
+) -> None:
+    messages = []
+    if user_id is not None:
+        messages.append(f"{USER_MESSAGE_PREFIX}{user_id}")
+    if session_key is not None:
+        messages.append(f"{SESSION_MESSAGE_PREFIX}{session_key}")
+
+    caches = _invalidation_targets()
+    for message in messages:
+        for cache in caches:
+            cache.apply_invalidation(message)
+        try:
+            await redis.publish(INVALIDATION_CHANNEL, message)
+        except RedisError:
+            # Other workers converge once their entries reach the TTL bound.
+            CACHE_LOGGER.warning(
+                "session_invalidation_publish_failed message=%(message)s",
+                LogFields(message=message),
+                exc_info=True,
+            )
+
+
+async def run_session_invalidation_listener(
+    caches: list[SessionCache],
+) -> None:
+    while True:
+        client = create_redis_client()
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Messages published while unsubscribed were lost.
+            for cache in caches:
+                cache.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    for cache in caches:
+                        cache.apply_invalidation(message["data"])
+        except RedisError:
+            for cache in caches:
+                cache.clear()
+            CACHE_LOGGER.warning(
+                "session_invalidation_listener_disconnected",
+                exc_info=True,
+            )
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+def start_session_invalidation_listener() -> asyncio.Task[None] | None:
+    caches = _invalidation_targets()
+    if not caches:
+        return None
+    return asyncio.create_task(
+        run_session_invalidation_listener(caches),
+        name="session-invalidation-listener",
+    )
+
+
+async def stop_session_invalidation_listener(
+    task: asyncio.Task[None] | None,
+) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,133 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from time import perf_counter, time
+from typing import Any, Literal
+
+from app.models.base import SHANGHAI_TIMEZONE
+
+
+SessionEncoding = Literal["json", "compact"]
+SESSION_KEY_PREFIX = "auth:session:"
+COMPACT_SESSION_KEY_PREFIX = "auth:s:"
+COMPACT_PAYLOAD_PREFIX = "c1|"
+COMPACT_DIGEST_BYTES = 16
+SESSION_ENCODINGS: tuple[SessionEncoding, ...] = ("json", "compact")
+
+
+@dataclass(frozen=True)
+class SessionEncodingBenchmark:
+    encoding: SessionEncoding
+    key_bytes: float
+    payload_bytes: float
+    decodes_per_second: float
+
+    @property
+    def bytes_per_session(self) -> float:
+        return self.key_bytes + self.payload_bytes
+
+
+def session_key_for(digest: str, encoding: SessionEncoding) -> str:
+    if encoding == "compact":
+        # 128 bits of a SHA-256 digest of a 256-bit random token.
+        compact_digest = base64.urlsafe_b64encode(
+            bytes.fromhex(digest)[:COMPACT_DIGEST_BYTES]
+        )
+        return (
+            f"{COMPACT_SESSION_KEY_PREFIX}"
+            f"{compact_digest.decode('ascii').rstrip('=')}"
+        )
+    return f"{SESSION_KEY_PREFIX}{digest}"
+
+
+def session_key_fingerprint(key: str) -> str:
+    if key.startswith(COMPACT_SESSION_KEY_PREFIX):
+        compact_digest = key.removeprefix(COMPACT_SESSION_KEY_PREFIX)
+        digest = base64.urlsafe_b64decode(f"{compact_digest}==").hex()
+    else:
+        digest = key.removeprefix(SESSION_KEY_PREFIX)
+    return digest[:12]
+
+
+def encode_session_payload(
+    *,
+    user_id: int,
+    session_version: int,
+    created_at: float,
+    encoding: SessionEncoding,
+) -> str:
+    if encoding == "compact":
+        return (
+            f"{COMPACT_PAYLOAD_PREFIX}{user_id}|{session_version}"
+            f"|{int(created_at)}"
+        )
+    created_at_local = datetime.fromtimestamp(created_at, SHANGHAI_TIMEZONE)
+    return json.dumps(
+        {
+            "user_id": user_id,
+            "session_version": session_version,
+            "created_at": created_at_local.replace(tzinfo=None).isoformat(
+                timespec="seconds"
+            ),
+        },
+        separators=(",", ":"),
+    )
+
+
+def decode_payload_fields(raw_payload: str) -> dict[str, Any]:
+    if raw_payload.startswith(COMPACT_PAYLOAD_PREFIX):
+        user_id, session_version, created_at = raw_payload[
+            len(COMPACT_PAYLOAD_PREFIX) :
+        ].split("|")
+        return {
+            "user_id": int(user_id),
+            "session_version": int(session_version),
+            "created_at": int(created_at),
+        }
+    payload = json.loads(raw_payload)
+    return {
+        "user_id": int(payload["user_id"]),
+        "session_version": int(payload["session_version"]),
+        "created_at": str(payload["created_at"]),
+    }
+
+
+def format_session_created_at(created_at: int | str) -> str:
+    if isinstance(created_at, str):
+        return created_at
+    return (
+        datetime.fromtimestamp(created_at, SHANGHAI_TIMEZONE)
+        .replace(tzinfo=None)
+        .isoformat(timespec="seconds")
+    )
+
+
+def benchmark_session_encoding(
+    encoding: SessionEncoding,
+    *,
+    sessions: int,
+) -> SessionEncodingBenchmark:
+    created_at = time()
+    keys = [
+        session_key_for(f"{index:064x}", encoding) for index in range(sessions)
+    ]
+    payloads = [
+        encode_session_payload(
+            user_id=100_000 + index,
+            session_version=1 + index % 5,
+            created_at=created_at,
+            encoding=encoding,
+        )
+        for index in range(sessions)
+    ]
+    started_at = perf_counter()
+    for payload in payloads:
+        decode_payload_fields(payload)
+    elapsed_seconds = perf_counter() - started_at
+    return SessionEncodingBenchmark(
+        encoding=encoding,
+        key_bytes=sum(len(key) for key in keys) / sessions,
+        payload_bytes=sum(len(payload) for payload in payloads) / sessions,
+        decodes_per_second=sessions / elapsed_seconds,
+    )
@@ -0,0 +1,137 @@
+from redis.asyncio import Redis
+
+
+SESSION_INDEX_KEY_PREFIX = "auth:user-sessions:"
+
+# Stores a session and indexes its key under the user in one atomic step.
+# With a per-user cap, every index entry whose session key has expired is
+# dropped, then the oldest live sessions beyond the cap are unlinked and
+# returned. Without a cap, only the few oldest entries are checked, so the
+# cost of a sign-in does not grow with the number of indexed sessions.
+# Members without a prefix are bare digests indexed before compact session
+# keys. Session keys are derived from index members, so this requires a
+# non-cluster Redis deployment.
+STORE_SESSION_SCRIPT = """
+local legacy_key_prefix = ARGV[1]
+local session_key = ARGV[2]
+local ttl_seconds = tonumber(ARGV[4])
+local created_at_ms = tonumber(ARGV[5])
+local max_sessions = tonumber(ARGV[6])
+local prune_limit = tonumber(ARGV[7])
+local function member_key(member)
+    if string.find(member, ':', 1, true) then
+        return member
+    end
+    return legacy_key_prefix .. member
+end
+redis.call('SET', session_key, ARGV[3], 'EX', ttl_seconds)
+redis.call('ZADD', KEYS[1], created_at_ms, session_key)
+local last_checked = -1
+if max_sessions <= 0 then
+    last_checked = prune_limit - 1
+end
+local live = {}
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, last_checked)) do
+    if redis.call('EXISTS', member_key(member)) == 1 then
+        table.insert(live, member)
+    else
+        redis.call('ZREM', KEYS[1], member)
+    end
+end
+local evicted = {}
+if max_sessions > 0 and #live > max_sessions then
+    for index = 1, #live - max_sessions do
+        redis.call('UNLINK', member_key(live[index]))
+        redis.call('ZREM', KEYS[1], live[index])
+        table.insert(evicted, member_key(live[index]))
+    end
+end
+redis.call('EXPIRE', KEYS[1], ttl_seconds)
+return evicted
+"""
+STORE_PRUNE_LIMIT = 8
+
+# Unlinks every indexed session, then the index itself. Keys are unlinked in
+# fixed-size chunks because unpack() overflows Lua's stack on large indexes.
+PURGE_SESSIONS_SCRIPT = """
+local chunk_size = tonumber(ARGV[2])
+local unlinked = 0
+local chunk = {}
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    if string.find(member, ':', 1, true) then
+        table.insert(chunk, member)
+    else
+        table.insert(chunk, ARGV[1] .. member)
+    end
+    if #chunk == chunk_size then
+        unlinked = unlinked + redis.call('UNLINK', unpack(chunk))
+        chunk = {}
+    end
+end
+if #chunk > 0 then
+    unlinked = unlinked + redis.call('UNLINK', unpack(chunk))
+end
+redis.call('UNLINK', KEYS[1])
+return unlinked
+"""
+PURGE_UNLINK_CHUNK_SIZE = 500
+
+
+def session_index_key(user_id: int) -> str:
+    return f"{SESSION_INDEX_KEY_PREFIX}{user_id}"
+
+
+async def store_indexed_session(
+    redis: Redis,
+    *,
+    legacy_key_prefix: str,
+    user_id: int,
+    session_key: str,
+    payload: str,
+    ttl_seconds: int,
+    created_at_ms: int,
+    max_sessions: int,
+) -> list[str]:
+    evicted = await redis.register_script(STORE_SESSION_SCRIPT)(
+        keys=[session_index_key(user_id)],
+        args=[
+            legacy_key_prefix,
+            session_key,
+            payload,
+            ttl_seconds,
+            created_at_ms,
+            max_sessions,
+            STORE_PRUNE_LIMIT,
+        ],
+    )
+    return list(evicted)
+
+
+async def delete_indexed_session(
+    redis: Redis,
+    *,
+    session_key: str,
+    user_id: int,
+    legacy_key_prefix: str,
+) -> None:
+    async with redis.pipeline(transaction=True) as pipeline:
+        pipeline.unlink(session_key)
+        pipeline.zrem(
+            session_index_key(user_id),
+            session_key,
+            session_key.removeprefix(legacy_key_prefix),
+        )
+        await pipeline.execute()
+
+
+async def purge_user_sessions(
+    redis: Redis,
+    *,
+    legacy_key_prefix: str,
+    user_id: int,
+) -> int:
+    unlinked = await redis.register_script(PURGE_SESSIONS_SCRIPT)(
+        keys=[session_index_key(user_id)],
+        args=[legacy_key_prefix, PURGE_UNLINK_CHUNK_SIZE],
+    )
+    return int(unlinked)
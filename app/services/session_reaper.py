@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logging import LogFields
+from app.models import User
+from app.services.auth import AuthenticationError, decode_session_payload
+from app.services.session_codec import (
+    COMPACT_SESSION_KEY_PREFIX,
+    SESSION_KEY_PREFIX,
+)
+from app.services.session_index import session_index_key
+
+
+REAPER_LOGGER = logging.getLogger("app.auth.session_reaper")
+
+
+@dataclass
+class SessionReapResult:
+    scanned: int = 0
+    reaped: int = 0
+    bytes_reclaimed: int = 0
+    batches: int = 0
+
+
+async def _live_versions(
+    sessions: async_sessionmaker[AsyncSession],
+    user_ids: set[int],
+) -> dict[int, int]:
+    if not user_ids:
+        return {}
+    # One short transaction per batch: a REPEATABLE READ snapshot held for
+    # the whole walk would judge new sessions against stale versions.
+    async with sessions() as db:
+        rows = (
+            await db.execute(
+                select(User.id, User.session_version).where(
+                    User.id.in_(user_ids),
+                    User.disabled_at.is_(None),
+                )
+            )
+        ).all()
+    return {user_id: session_version for user_id, session_version in rows}
+
+
+async def _reap_batch(
+    sessions: async_sessionmaker[AsyncSession],
+    redis: Redis,
+    keys: list[str],
+    *,
+    dry_run: bool,
+) -> tuple[int, int]:
+    raw_payloads = await redis.mget(keys)
+    decoded: dict[str, dict[str, Any] | None] = {}
+    for key, raw_payload in zip(keys, raw_payloads, strict=True):
+        if raw_payload is None:
+            continue
+        try:
+            decoded[key] = decode_session_payload(raw_payload)
+        except AuthenticationError:
+            decoded[key] = None
+
+    live_versions = await _live_versions(
+        sessions,
+        {payload["user_id"] for payload in decoded.values() if payload},
+    )
+    dead = [
+        (key, payload)
+        for key, payload in decoded.items()
+        if payload is None
+        or live_versions.get(payload["user_id"]) != payload["session_version"]
+    ]
+    if not dead:
+        return 0, 0
+
+    async with redis.pipeline(transaction=False) as pipeline:
+        for key, _ in dead:
+            pipeline.memory_usage(key)
+        if not dry_run:
+            for key, payload in dead:
+                pipeline.unlink(key)
+                if payload is not None:
+                    pipeline.zrem(
+                        session_index_key(payload["user_id"]),
+                        key,
+                        key.removeprefix(SESSION_KEY_PREFIX),
+                    )
+        results = await pipeline.execute()
+    reclaimed = sum(usage or 0 for usage in results[: len(dead)])
+    return len(dead), reclaimed
+
+
+async def _reap_prefix(
+    sessions: async_sessionmaker[AsyncSession],
+    redis: Redis,
+    result: SessionReapResult,
+    *,
+    key_prefix: str,
+    batch_size: int,
+    max_keys_per_second: float,
+    dry_run: bool,
+) -> None:
+    cursor = 0
+    while True:
+        started_at = perf_counter()
+        cursor, keys = await redis.scan(
+            cursor=cursor,
+            match=f"{key_prefix}*",
+            count=batch_size,
+        )
+        if keys:
+            reaped, reclaimed = await _reap_batch(
+                sessions,
+                redis,
+                list(keys),
+                dry_run=dry_run,
+            )
+            result.scanned += len(keys)
+            result.reaped += reaped
+            result.bytes_reclaimed += reclaimed
+            result.batches += 1
+            REAPER_LOGGER.info(
+                "session_reap_batch scanned=%(scanned)d reaped=%(reaped)d "
+                "bytes=%(bytes)d dry_run=%(dry_run)s",
+                LogFields(
+                    scanned=len(keys),
+                    reaped=reaped,
+                    bytes=reclaimed,
+                    dry_run=dry_run,
+                ),
+            )
+        if cursor == 0:
+            return
+        # Pace by the SCAN count, the keys Redis examines per call, so pages
+        # with few matching keys are paced too.
+        minimum_seconds = batch_size / max_keys_per_second
+        elapsed_seconds = perf_counter() - started_at
+        if elapsed_seconds < minimum_seconds:
+            await asyncio.sleep(minimum_seconds - elapsed_seconds)
+
+
+async def reap_stale_sessions(
+    sessions: async_sessionmaker[AsyncSession],
+    redis: Redis,
+    *,
+    batch_size: int,
+    max_keys_per_second: float,
+    dry_run: bool = False,
+) -> SessionReapResult:
+    result = SessionReapResult()
+    for key_prefix in (SESSION_KEY_PREFIX, COMPACT_SESSION_KEY_PREFIX):
+        await _reap_prefix(
+            sessions,
+            redis,
+            result,
+            key_prefix=key_prefix,
+            batch_size=batch_size,
+            max_keys_per_second=max_keys_per_second,
+            dry_run=dry_run,
+        )
+    return result
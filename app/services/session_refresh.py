@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.logging import LogFields
+from app.db.redis import create_redis_client
+from app.services.session_index import session_index_key
+
+
+REFRESH_LOGGER = logging.getLogger("app.auth.session_refresh")
+
+
+@dataclass
+class SessionRefreshStats:
+    scheduled: int = 0
+    coalesced: int = 0
+    refreshed: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+
+
+class SessionRefresher:
+    def __init__(self, *, ttl_seconds: int, batch_delay_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.batch_delay_seconds = batch_delay_seconds
+        # Session key -> user ID, whose session index is extended with it.
+        self._pending: dict[str, int] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        self._stats = SessionRefreshStats()
+
+    def stats(self) -> SessionRefreshStats:
+        return replace(self._stats)
+
+    def schedule(self, key: str, *, user_id: int) -> None:
+        if key in self._pending:
+            self._stats.coalesced += 1
+            return
+        self._pending[key] = user_id
+        self._stats.scheduled += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(
+                self._flush_after_delay(),
+                name="session-refresh-flush",
+            )
+
+    async def _flush_after_delay(self) -> None:
+        await asyncio.sleep(self.batch_delay_seconds)
+        await self.flush()
+
+    async def flush(self) -> None:
+        keys, self._pending = self._pending, {}
+        if not keys:
+            return
+        user_ids = set(keys.values())
+
+        client = create_redis_client()
+        try:
+            async with client.pipeline(transaction=False) as pipeline:
+                for key in keys:
+                    # EXPIRE is a no-op for a session deleted since it was read.
+                    pipeline.expire(key, self.ttl_seconds)
+                # The index must outlive its sessions, or logout-all and the
+                # session cap stop seeing them. Every index and session TTL
+                # is the same length, so now + TTL is never a shortening.
+                for user_id in user_ids:
+                    pipeline.expire(
+                        session_index_key(user_id),
+                        self.ttl_seconds,
+                    )
+                results = await pipeline.execute()
+        except RedisError:
+            self._stats.failed_batches += 1
+            REFRESH_LOGGER.warning(
+                "session_refresh_failed sessions=%(sessions)d",
+                LogFields(sessions=len(keys)),
+                exc_info=True,
+            )
+            return
+        finally:
+            await client.aclose()
+
+        self._stats.batches += 1
+        self._stats.refreshed += sum(
+            1 for result in results[: len(keys)] if result
+        )
+
+    async def close(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+
+
+_session_refresher: SessionRefresher | None = None
+
+
+def get_session_refresher() -> SessionRefresher | None:
+    global _session_refresher
+    settings = get_settings()
+    if not settings.AUTH_SESSION_SLIDING_ENABLED:
+        return None
+    if _session_refresher is None:
+        _session_refresher = SessionRefresher(
+            ttl_seconds=settings.AUTH_SESSION_TTL_SECONDS,
+            batch_delay_seconds=settings.AUTH_SESSION_REFRESH_BATCH_DELAY_SECONDS,
+        )
+    return _session_refresher
+
+
+def session_needs_refresh(ttl_milliseconds: int | None) -> bool:
+    settings = get_settings()
+    if not settings.AUTH_SESSION_SLIDING_ENABLED or ttl_milliseconds is None:
+        return False
+    # PTTL is -1 for a key without expiry and -2 for a missing key.
+    return (
+        0 <= ttl_milliseconds
+        < settings.AUTH_SESSION_REFRESH_THRESHOLD_SECONDS * 1000
+    )
+
+
+async def close_session_refresher() -> None:
+    global _session_refresher
+    if _session_refresher is not None:
+        await _session_refresher.close()
+        _session_refresher = None
@@ -0,0 +1,350 @@
+import heapq
+from dataclasses import dataclass
+from time import monotonic, perf_counter
+from typing import Literal, Protocol
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+from app.db.redis import get_client_cache
+from app.services.session_codec import SESSION_KEY_PREFIX
+from app.services.session_index import (
+    delete_indexed_session,
+    purge_user_sessions,
+    store_indexed_session,
+)
+from app.services.session_refresh import get_session_refresher
+
+
+SessionStoreKind = Literal["redis", "memory"]
+
+
+@dataclass(frozen=True)
+class StoredSession:
+    key: str
+    payload: str | None
+    ttl_milliseconds: int | None = None
+
+
+@dataclass(frozen=True)
+class SessionStoreBenchmark:
+    store: str
+    writes_per_second: float
+    reads_per_second: float
+
+
+class SessionStore(Protocol):
+    async def store_session(
+        self,
+        *,
+        session_key: str,
+        payload: str,
+        user_id: int,
+        ttl_seconds: int,
+        created_at_ms: int,
+        max_sessions: int,
+    ) -> list[str]: ...
+
+    async def fetch_session(
+        self,
+        keys: list[str],
+        *,
+        with_ttl: bool,
+    ) -> StoredSession: ...
+
+    async def delete_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int | None = None,
+    ) -> None: ...
+
+    async def purge_user_sessions(self, user_id: int) -> int: ...
+
+    async def refresh_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int,
+    ) -> None: ...
+
+
+class RedisSessionStore:
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def store_session(
+        self,
+        *,
+        session_key: str,
+        payload: str,
+        user_id: int,
+        ttl_seconds: int,
+        created_at_ms: int,
+        max_sessions: int,
+    ) -> list[str]:
+        return await store_indexed_session(
+            self.redis,
+            legacy_key_prefix=SESSION_KEY_PREFIX,
+            user_id=user_id,
+            session_key=session_key,
+            payload=payload,
+            ttl_seconds=ttl_seconds,
+            created_at_ms=created_at_ms,
+            max_sessions=max_sessions,
+        )
+
+    async def fetch_session(
+        self,
+        keys: list[str],
+        *,
+        with_ttl: bool,
+    ) -> StoredSession:
+        if not with_ttl and len(keys) == 1:
+            client_cache = get_client_cache()
+            if client_cache is not None:
+                payload = client_cache.get(keys[0])
+                if payload is not None:
+                    return StoredSession(key=keys[0], payload=payload)
+            payload = await self.redis.get(keys[0])
+            if client_cache is not None:
+                client_cache.put(keys[0], payload)
+            return StoredSession(key=keys[0], payload=payload)
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.get(key)
+                pipeline.pttl(key)
+            results = await pipeline.execute()
+        for key, payload, ttl_milliseconds in zip(
+            keys, results[::2], results[1::2], strict=True
+        ):
+            if payload is not None:
+                return StoredSession(key, payload, ttl_milliseconds)
+        return StoredSession(key=keys[0], payload=None)
+
+    async def delete_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int | None = None,
+    ) -> None:
+        client_cache = get_client_cache()
+        if client_cache is not None:
+            # Do not wait for the tracking invalidation of our own delete.
+            client_cache.invalidate([session_key])
+        if user_id is None:
+            await self.redis.delete(session_key)
+            return
+        await delete_indexed_session(
+            self.redis,
+            session_key=session_key,
+            user_id=user_id,
+            legacy_key_prefix=SESSION_KEY_PREFIX,
+        )
+
+    async def purge_user_sessions(self, user_id: int) -> int:
+        return await purge_user_sessions(
+            self.redis,
+            legacy_key_prefix=SESSION_KEY_PREFIX,
+            user_id=user_id,
+        )
+
+    async def refresh_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int,
+    ) -> None:
+        refresher = get_session_refresher()
+        if refresher is not None:
+            refresher.schedule(session_key, user_id=user_id)
+
+
+@dataclass
+class _MemoryEntry:
+    payload: str
+    user_id: int
+    created_at_ms: int
+    expires_at: float
+
+
+class MemorySessionStore:
+    def __init__(self) -> None:
+        self._entries: dict[str, _MemoryEntry] = {}
+        self._keys_by_user: dict[int, set[str]] = {}
+        # Sliding refreshes leave superseded heap items; sweeps skip them.
+        self._expiry_heap: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sweep(self) -> int:
+        now = monotonic()
+        swept = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                swept += 1
+        return swept
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self._expiry_heap.clear()
+
+    def _remove(self, key: str) -> _MemoryEntry | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        keys = self._keys_by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry.user_id]
+        return entry
+
+    def _live_entry(self, key: str) -> _MemoryEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def _set_expiry(
+        self,
+        key: str,
+        entry: _MemoryEntry,
+        seconds: float,
+    ) -> None:
+        entry.expires_at = monotonic() + seconds
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+
+    async def store_session(
+        self,
+        *,
+        session_key: str,
+        payload: str,
+        user_id: int,
+        ttl_seconds: int,
+        created_at_ms: int,
+        max_sessions: int,
+    ) -> list[str]:
+        self.sweep()
+        self._remove(session_key)
+        entry = _MemoryEntry(
+            payload=payload,
+            user_id=user_id,
+            created_at_ms=created_at_ms,
+            expires_at=0.0,
+        )
+        self._entries[session_key] = entry
+        self._set_expiry(session_key, entry, ttl_seconds)
+        user_keys = self._keys_by_user.setdefault(user_id, set())
+        user_keys.add(session_key)
+        if max_sessions <= 0 or len(user_keys) <= max_sessions:
+            return []
+
+        oldest_first = sorted(
+            user_keys,
+            key=lambda key: self._entries[key].created_at_ms,
+        )
+        evicted = oldest_first[: len(user_keys) - max_sessions]
+        for key in evicted:
+            self._remove(key)
+        return evicted
+
+    async def fetch_session(
+        self,
+        keys: list[str],
+        *,
+        with_ttl: bool,
+    ) -> StoredSession:
+        self.sweep()
+        for key in keys:
+            entry = self._live_entry(key)
+            if entry is not None:
+                ttl_milliseconds = (
+                    int((entry.expires_at - monotonic()) * 1000)
+                    if with_ttl
+                    else None
+                )
+                return StoredSession(key, entry.payload, ttl_milliseconds)
+        return StoredSession(key=keys[0], payload=None)
+
+    async def delete_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int | None = None,
+    ) -> None:
+        self._remove(session_key)
+
+    async def purge_user_sessions(self, user_id: int) -> int:
+        keys = tuple(self._keys_by_user.get(user_id, ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def refresh_session(
+        self,
+        session_key: str,
+        *,
+        user_id: int,
+    ) -> None:
+        entry = self._live_entry(session_key)
+        if entry is not None:
+            self._set_expiry(
+                session_key,
+                entry,
+                get_settings().AUTH_SESSION_TTL_SECONDS,
+            )
+
+
+_memory_session_store: MemorySessionStore | None = None
+
+
+def get_memory_session_store() -> MemorySessionStore:
+    global _memory_session_store
+    if _memory_session_store is None:
+        _memory_session_store = MemorySessionStore()
+    return _memory_session_store
+
+
+def get_session_store(redis: Redis) -> SessionStore:
+    if get_settings().AUTH_SESSION_STORE == "memory":
+        return get_memory_session_store()
+    return RedisSessionStore(redis)
+
+
+async def benchmark_session_store(
+    store: SessionStore,
+    *,
+    name: str,
+    sessions: int,
+) -> SessionStoreBenchmark:
+    keys = [f"auth:benchmark:{index}" for index in range(sessions)]
+    started_at = perf_counter()
+    for index, key in enumerate(keys):
+        await store.store_session(
+            session_key=key,
+            payload=f"c1|{index}|1|0",
+            user_id=-1 - index,
+            ttl_seconds=60,
+            created_at_ms=0,
+            max_sessions=0,
+        )
+    write_seconds = perf_counter() - started_at
+    started_at = perf_counter()
+    for key in keys:
+        await store.fetch_session([key], with_ttl=False)
+    read_seconds = perf_counter() - started_at
+    for index, key in enumerate(keys):
+        await store.delete_session(key, user_id=-1 - index)
+    return SessionStoreBenchmark(
+        store=name,
+        writes_per_second=sessions / write_seconds,
+        reads_per_second=sessions / read_seconds,
+    )
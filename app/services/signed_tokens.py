@@ -0,0 +1,168 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import secrets
+from dataclasses import dataclass
+from time import monotonic, time
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+
+SIGNED_TOKEN_PREFIX = "sst_"
+SIGNED_CLAIMS_VERSION = "v1"
+REVOKED_TOKENS_KEY = "auth:revoked-tokens"
+TOKEN_ID_BYTES = 12
+
+
+@dataclass(frozen=True)
+class SignedTokenClaims:
+    user_id: int
+    session_version: int
+    issued_at: int
+    expires_at: int
+    token_id: str
+
+
+def _urlsafe_encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).decode("ascii").rstrip("=")
+
+
+def _urlsafe_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(f"{value}{'=' * (-len(value) % 4)}")
+
+
+def _signature(encoded_claims: str, signing_key: bytes) -> str:
+    return _urlsafe_encode(
+        hmac.digest(
+            signing_key,
+            f"{SIGNED_TOKEN_PREFIX}{encoded_claims}".encode("utf-8"),
+            hashlib.sha256,
+        )
+    )
+
+
+def signing_key() -> bytes | None:
+    key = get_settings().AUTH_TOKEN_SIGNING_KEY
+    if key is None or not key.get_secret_value():
+        return None
+    return key.get_secret_value().encode("utf-8")
+
+
+def issue_signed_token(
+    *,
+    user_id: int,
+    session_version: int,
+    ttl_seconds: int,
+    key: bytes,
+) -> tuple[str, SignedTokenClaims]:
+    issued_at = int(time())
+    claims = SignedTokenClaims(
+        user_id=user_id,
+        session_version=session_version,
+        issued_at=issued_at,
+        expires_at=issued_at + ttl_seconds,
+        token_id=_urlsafe_encode(secrets.token_bytes(TOKEN_ID_BYTES)),
+    )
+    encoded_claims = _urlsafe_encode(
+        (
+            f"{SIGNED_CLAIMS_VERSION}|{claims.user_id}|{claims.session_version}"
+            f"|{claims.issued_at}|{claims.expires_at}|{claims.token_id}"
+        ).encode("ascii")
+    )
+    token = (
+        f"{SIGNED_TOKEN_PREFIX}{encoded_claims}."
+        f"{_signature(encoded_claims, key)}"
+    )
+    return token, claims
+
+
+def decode_signed_token(token: str, key: bytes) -> SignedTokenClaims | None:
+    encoded_claims, _, signature = token.removeprefix(
+        SIGNED_TOKEN_PREFIX
+    ).partition(".")
+    if not hmac.compare_digest(
+        signature.encode("utf-8"),
+        _signature(encoded_claims, key).encode("ascii"),
+    ):
+        return None
+    try:
+        (
+            claims_version,
+            user_id,
+            session_version,
+            issued_at,
+            expires_at,
+            token_id,
+        ) = _urlsafe_decode(encoded_claims).decode("ascii").split("|")
+        if claims_version != SIGNED_CLAIMS_VERSION:
+            return None
+        return SignedTokenClaims(
+            user_id=int(user_id),
+            session_version=int(session_version),
+            issued_at=int(issued_at),
+            expires_at=int(expires_at),
+            token_id=token_id,
+        )
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+class RevocationList:
+    def __init__(self, *, refresh_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._token_ids: set[str] = set()
+        self._refreshed_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._refreshed_at is not None
+            and monotonic() - self._refreshed_at < self.refresh_seconds
+        )
+
+    async def contains(self, redis: Redis, token_id: str) -> bool:
+        if not self._is_fresh():
+            async with self._refresh_lock:
+                # Concurrent requests share the refresh that was in flight.
+                if not self._is_fresh():
+                    await self.refresh(redis)
+        return token_id in self._token_ids
+
+    async def refresh(self, redis: Redis) -> None:
+        token_ids = await redis.zrangebyscore(
+            REVOKED_TOKENS_KEY,
+            int(time()),
+            "+inf",
+        )
+        self._token_ids = set(token_ids)
+        self._refreshed_at = monotonic()
+
+    async def revoke(self, redis: Redis, claims: SignedTokenClaims) -> None:
+        async with redis.pipeline(transaction=True) as pipeline:
+            pipeline.zadd(
+                REVOKED_TOKENS_KEY,
+                {claims.token_id: claims.expires_at},
+            )
+            # Expired tokens are rejected without the list, so drop them.
+            pipeline.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", int(time()))
+            await pipeline.execute()
+        self._token_ids.add(claims.token_id)
+
+
+_revocation_list: RevocationList | None = None
+
+
+def get_revocation_list() -> RevocationList:
+    global _revocation_list
+    if _revocation_list is None:
+        _revocation_list = RevocationList(
+            refresh_seconds=get_settings().AUTH_SIGNED_TOKEN_REFRESH_SECONDS,
+        )
+    return _revocation_list
+
+
+async def is_token_revoked(redis: Redis, token_id: str) -> bool:
+    return await redis.zscore(REVOKED_TOKENS_KEY, token_id) is not None
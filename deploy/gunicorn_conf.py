@@ -1,4 +1,6 @@
 import os
+from pathlib import Path
+from tempfile import mkdtemp
 
 
 bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
@@ -10,3 +12,22 @@ errorlog = "-"
 loglevel = os.getenv("LOG_LEVEL", "info")
 capture_output = False
 preload_app = False
+
+# Workers inherit the directory and share metrics through files in it. It
+# must be set before any worker imports prometheus_client.
+if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = mkdtemp(prefix="app-metrics-")
+
+
+def on_starting(_server) -> None:
+    # Files left by a previous master would be reported as live workers.
+    for path in Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).glob("*.db"):
+        path.unlink()
+
+
+def child_exit(_server, worker) -> None:
+    # Imported once PROMETHEUS_MULTIPROC_DIR is set, which selects
+    # multiprocess mode for every process that forks afterwards.
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,52 @@
+"""widen auth credential
+
+Revision ID: 20261018_0002
+Revises: 20260725_0001
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "20261018_0002"
+down_revision: str | Sequence[str] | None = "20260725_0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "auth_users",
+        "credential",
+        existing_type=sa.String(length=60),
+        type_=sa.String(length=255),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    # Only bcrypt hashes fit in 60 characters; narrowing the column would
+    # truncate or reject scrypt credentials, so those accounts must reset
+    # their password under AUTH_CREDENTIAL_SCHEME=bcrypt first.
+    wide_credentials = op.get_bind().scalar(
+        sa.text(
+            "SELECT COUNT(*) FROM auth_users "
+            "WHERE CHAR_LENGTH(credential) > 60"
+        )
+    )
+    if wide_credentials:
+        raise RuntimeError(
+            f"{wide_credentials} auth_users credentials are longer than 60 "
+            "characters; reset them to bcrypt before downgrading"
+        )
+    op.alter_column(
+        "auth_users",
+        "credential",
+        existing_type=sa.String(length=255),
+        type_=sa.String(length=60),
+        existing_nullable=False,
+    )
@@ -20,8 +20,9 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import NullPool
 
 from app.core.config import Settings, get_settings
-from app.db.mysql import close_database, get_db
+from app.db.mysql import close_database, commit, get_db
 from app.db.redis import close_redis, get_redis
+from app.db.slow_query import install_slow_query_logging
 from app.main import app, create_app
 from app.models import AuthUser, User
 from tests.factories import TEST_LOGIN_PASSWORD, build_internal_user
@@ -73,6 +74,13 @@ async def db_engine(
         safe_integration_settings.database_url,
         poolclass=NullPool,
     )
+    # Request query counts come from the same hooks as the app engine.
+    install_slow_query_logging(
+        engine.sync_engine,
+        threshold_seconds=(
+            safe_integration_settings.DB_SLOW_QUERY_THRESHOLD_SECONDS
+        ),
+    )
     try:
         yield engine
     finally:
@@ -135,7 +143,7 @@ async def test_app(
     async def override_db() -> AsyncIterator[AsyncSession]:
         try:
             yield db_session
-            await db_session.commit()
+            await commit(db_session)
         except Exception:
             await db_session.rollback()
             raise
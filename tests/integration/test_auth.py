@@ -4,11 +4,15 @@ from unittest.mock import AsyncMock
 import pytest
 from httpx import AsyncClient
 from redis.asyncio import Redis
+from pydantic import SecretStr
 from redis.exceptions import RedisError
-from sqlalchemy import inspect
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.models import User
+from app.core.config import get_settings
+from app.db.mysql import commit
+from app.db.redis import close_redis
+from app.models import AuthUser, User
 from app.services.auth import (
     AccountAlreadyExistsError,
     create_internal_user,
@@ -17,7 +21,9 @@ from app.services.auth import (
     inspect_session,
     reset_internal_password,
 )
+from app.services.session_refresh import close_session_refresher
 from tests.conftest import TEST_PASSWORD, TEST_USERNAME
+from tests.query_counts import assert_request_queries, capture_request_queries
 
 
 pytestmark = pytest.mark.integration
@@ -91,6 +97,14 @@ async def test_login_and_me_return_frontend_identity_fields(
     }
 
 
+async def test_me_reads_identity_with_one_query(client: AsyncClient) -> None:
+    with capture_request_queries() as contexts:
+        response = await client.get("/api/auth/me")
+
+    assert response.status_code == 200
+    assert_request_queries(contexts, "GET", "/api/auth/me", max_queries=1)
+
+
 async def test_invalid_credentials_share_one_response(
     unauth_client: AsyncClient,
     auth_user: User,
@@ -114,6 +128,78 @@ async def test_invalid_credentials_share_one_response(
     assert wrong_password.json() == unknown_user.json() == invalid_username.json()
 
 
+async def test_login_throttle_rejects_before_password_check(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        get_settings(),
+        "AUTH_LOGIN_MAX_ATTEMPTS_PER_USERNAME",
+        2,
+    )
+    verify = AsyncMock(return_value=False)
+    for _ in range(2):
+        response = await unauth_client.post(
+            "/api/auth/token",
+            data={"username": TEST_USERNAME, "password": "wrong-password"},
+        )
+        assert response.status_code == 401
+
+    monkeypatch.setattr("app.services.auth.run_credential_work", verify)
+    throttled = await unauth_client.post(
+        "/api/auth/token",
+        data={"username": TEST_USERNAME.upper(), "password": TEST_PASSWORD},
+    )
+
+    assert throttled.status_code == 429
+    assert 0 < int(throttled.headers["retry-after"]) <= 60
+    verify.assert_not_called()
+    assert all(
+        TEST_USERNAME not in key
+        for key in await redis_client.keys("auth:throttle:*")
+    )
+
+
+async def test_successful_logins_do_not_count_toward_throttle(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_LOGIN_MAX_ATTEMPTS_PER_USERNAME", 2)
+    monkeypatch.setattr(settings, "AUTH_LOGIN_MAX_ATTEMPTS_PER_CLIENT", 2)
+
+    for _ in range(3):
+        response = await unauth_client.post(
+            "/api/auth/token",
+            data={"username": TEST_USERNAME, "password": TEST_PASSWORD},
+        )
+        assert response.status_code == 200
+
+
+async def test_login_rehashes_credential_with_configured_parameters(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_CREDENTIAL_SCHEME", "scrypt")
+    monkeypatch.setattr(settings, "AUTH_SCRYPT_LOG_N", 10)
+
+    await login(unauth_client)
+
+    credential = await db_session.scalar(
+        select(AuthUser.credential)
+        .where(AuthUser.user_id == auth_user.id)
+        .execution_options(populate_existing=True)
+    )
+    assert credential.startswith("$scrypt$ln=10,")
+    assert await login(unauth_client)
+
+
 async def test_missing_token_uses_common_unauthorized_response(
     unauth_client: AsyncClient,
 ) -> None:
@@ -142,6 +228,7 @@ async def test_multi_session_and_password_reset_invalidation(
     unauth_client: AsyncClient,
     auth_user: User,
     db_session: AsyncSession,
+    redis_client: Redis,
 ) -> None:
     first_token = await login(unauth_client)
     second_token = await login(unauth_client)
@@ -150,10 +237,11 @@ async def test_multi_session_and_password_reset_invalidation(
     new_password = "new-test-password-123"
     await reset_internal_password(
         db_session,
+        redis_client,
         auth_id=TEST_USERNAME,
         password=new_password,
     )
-    await db_session.commit()
+    await commit(db_session)
 
     for token in (first_token, second_token):
         response = await unauth_client.get(
@@ -164,14 +252,178 @@ async def test_multi_session_and_password_reset_invalidation(
     assert await login(unauth_client, new_password)
 
 
+async def test_session_cap_evicts_oldest_and_reset_purges_index(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_MAX_SESSIONS_PER_USER", 2)
+    tokens = [await login(unauth_client) for _ in range(3)]
+    index_key = f"auth:user-sessions:{auth_user.id}"
+
+    assert await redis_client.zcard(index_key) == 2
+    assert len(await redis_client.keys("auth:session:*")) == 2
+    statuses = [
+        (
+            await unauth_client.get(
+                "/api/auth/me",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        ).status_code
+        for token in tokens
+    ]
+    assert statuses == [401, 200, 200]
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await commit(db_session)
+
+    assert await redis_client.keys("auth:session:*") == []
+    assert not await redis_client.exists(index_key)
+
+
+async def test_compact_sessions_migrate_with_dual_read(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    json_token = await login(unauth_client)
+    monkeypatch.setattr(settings, "AUTH_SESSION_ENCODING", "compact")
+    compact_token = await login(unauth_client)
+
+    [compact_key] = await redis_client.keys("auth:s:*")
+    assert (await redis_client.get(compact_key)).startswith("c1|")
+    index_key = f"auth:user-sessions:{auth_user.id}"
+    assert await redis_client.zcard(index_key) == 2
+
+    async def me_status(token: str) -> int:
+        response = await unauth_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return response.status_code
+
+    assert await me_status(compact_token) == 200
+    assert await me_status(json_token) == 401
+    monkeypatch.setattr(settings, "AUTH_SESSION_DUAL_READ", True)
+    for validation in ("standard", "script"):
+        monkeypatch.setattr(settings, "AUTH_SESSION_VALIDATION", validation)
+        assert await me_status(json_token) == 200
+        assert await me_status(compact_token) == 200
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await commit(db_session)
+
+    assert await redis_client.keys("auth:s:*") == []
+    assert await redis_client.keys("auth:session:*") == []
+
+
+async def test_signed_tokens_resolve_without_session_keys(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_TOKEN_FORMAT", "signed")
+    monkeypatch.setattr(settings, "AUTH_TOKEN_SIGNING_KEY", SecretStr("k" * 32))
+    monkeypatch.setattr("app.services.signed_tokens._revocation_list", None)
+    monkeypatch.setattr("app.services.session_cache._user_identity_cache", None)
+
+    async def me_status(token: str) -> int:
+        response = await unauth_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return response.status_code
+
+    first_token = await login(unauth_client)
+    second_token = await login(unauth_client)
+    assert first_token.startswith("sst_")
+    assert await redis_client.keys("auth:session:*") == []
+    assert await me_status(first_token) == 200
+
+    execute = AsyncMock(wraps=db_session.execute)
+    monkeypatch.setattr(db_session, "execute", execute)
+    assert await me_status(first_token) == 200
+    execute.assert_not_called()
+
+    response = await unauth_client.post(
+        "/api/auth/logout",
+        headers={"Authorization": f"Bearer {first_token}"},
+    )
+    assert response.status_code == 204
+    assert await me_status(first_token) == 401
+    assert await me_status(second_token) == 200
+    inspection = await inspect_session(
+        db_session,
+        redis_client,
+        token=first_token,
+    )
+    assert not inspection.exists
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await commit(db_session)
+    assert await me_status(second_token) == 401
+
+
+async def test_memory_session_store_keeps_sessions_out_of_redis(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_SESSION_STORE", "memory")
+    monkeypatch.setattr(
+        "app.services.session_store._memory_session_store",
+        None,
+    )
+    token = await login(unauth_client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert await redis_client.keys("auth:session:*") == []
+    assert await redis_client.keys("auth:user-sessions:*") == []
+    response = await unauth_client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    response = await unauth_client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 204
+    response = await unauth_client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 401
+
+
 async def test_disable_and_enable_invalidate_sessions(
     unauth_client: AsyncClient,
     auth_user: User,
     db_session: AsyncSession,
+    redis_client: Redis,
 ) -> None:
     old_token = await login(unauth_client)
-    await disable_internal_user(db_session, auth_id=TEST_USERNAME)
-    await db_session.commit()
+    await disable_internal_user(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+    )
+    await commit(db_session)
 
     assert (
         await unauth_client.get(
@@ -186,11 +438,186 @@ async def test_disable_and_enable_invalidate_sessions(
         )
     ).status_code == 401
 
-    await enable_internal_user(db_session, auth_id=TEST_USERNAME)
-    await db_session.commit()
+    await enable_internal_user(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+    )
+    await commit(db_session)
     assert await login(unauth_client)
 
 
+async def test_session_cache_serves_repeat_requests_until_invalidated(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_SESSION_CACHE_ENABLED", True)
+    monkeypatch.setattr("app.services.session_cache._session_cache", None)
+    assert (await client.get("/api/auth/me")).status_code == 200
+
+    get = AsyncMock(wraps=redis_client.get)
+    monkeypatch.setattr(redis_client, "get", get)
+    assert (await client.get("/api/auth/me")).status_code == 200
+    get.assert_not_called()
+
+    await disable_internal_user(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+    )
+    await commit(db_session)
+
+    assert (await client.get("/api/auth/me")).status_code == 401
+
+
+async def test_user_snapshot_replaces_database_identity_lookup(
+    client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_USER_SNAPSHOT_ENABLED", True)
+    assert (await client.get("/api/auth/me")).status_code == 200
+    assert await redis_client.exists(f"auth:user:{auth_user.id}")
+
+    execute = AsyncMock(wraps=db_session.execute)
+    monkeypatch.setattr(db_session, "execute", execute)
+    me_response = await client.get("/api/auth/me")
+    assert me_response.status_code == 200
+    assert me_response.json()["username"] == TEST_USERNAME
+    execute.assert_not_called()
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await commit(db_session)
+
+    snapshot = await redis_client.get(f"auth:user:{auth_user.id}")
+    assert '"session_version":2' in snapshot
+    assert (await client.get("/api/auth/me")).status_code == 401
+
+
+async def test_rolled_back_reset_leaves_no_user_snapshot_behind(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_USER_SNAPSHOT_ENABLED", True)
+    user_id = auth_user.id
+    await login(unauth_client)
+    assert await redis_client.exists(f"auth:user:{user_id}")
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await db_session.rollback()
+
+    assert not await redis_client.exists(f"auth:user:{user_id}")
+    token = await login(unauth_client)
+    response = await unauth_client.get(
+        "/api/auth/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    snapshot = await redis_client.get(f"auth:user:{user_id}")
+    assert '"session_version":1' in snapshot
+
+
+async def test_script_validation_uses_one_round_trip_and_drops_stale_keys(
+    client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_SESSION_VALIDATION", "script")
+    monkeypatch.setattr(settings, "AUTH_USER_SNAPSHOT_ENABLED", True)
+    assert (await client.get("/api/auth/me")).status_code == 200
+    assert await redis_client.get(f"auth:user-version:{auth_user.id}") == "1"
+
+    execute = AsyncMock(wraps=db_session.execute)
+    get = AsyncMock(wraps=redis_client.get)
+    monkeypatch.setattr(db_session, "execute", execute)
+    monkeypatch.setattr(redis_client, "get", get)
+    assert (await client.get("/api/auth/me")).status_code == 200
+    execute.assert_not_called()
+    get.assert_not_called()
+
+    await disable_internal_user(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+    )
+    await commit(db_session)
+
+    assert await redis_client.get(f"auth:user-version:{auth_user.id}") == "2"
+    assert (await client.get("/api/auth/me")).status_code == 401
+    assert await redis_client.keys("auth:session:*") == []
+
+
+async def test_rolled_back_reset_keeps_script_validated_sign_in(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_SESSION_VALIDATION", "script")
+    user_id = auth_user.id
+    await login(unauth_client)
+    assert await redis_client.get(f"auth:user-version:{user_id}") == "1"
+
+    await reset_internal_password(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+        password="new-test-password-123",
+    )
+    await db_session.rollback()
+
+    assert await redis_client.get(f"auth:user-version:{user_id}") is None
+    token = await login(unauth_client)
+    response = await unauth_client.get(
+        "/api/auth/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert await redis_client.get(f"auth:user-version:{user_id}") == "1"
+
+
+async def test_sliding_expiry_extends_sessions_near_expiry(
+    client: AsyncClient,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_SESSION_SLIDING_ENABLED", True)
+    monkeypatch.setattr(settings, "AUTH_SESSION_REFRESH_THRESHOLD_SECONDS", 60)
+    monkeypatch.setattr("app.services.session_refresh._session_refresher", None)
+    [key] = await redis_client.keys("auth:session:*")
+    await redis_client.expire(key, 30)
+
+    try:
+        assert (await client.get("/api/auth/me")).status_code == 200
+        await close_session_refresher()
+    finally:
+        await close_redis()
+
+    assert await redis_client.ttl(key) > 60
+
+
 async def test_stale_session_returns_401_when_cleanup_fails(
     unauth_client: AsyncClient,
     auth_user: User,
@@ -199,8 +626,12 @@ async def test_stale_session_returns_401_when_cleanup_fails(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     token = await login(unauth_client)
-    await disable_internal_user(db_session, auth_id=TEST_USERNAME)
-    await db_session.commit()
+    await disable_internal_user(
+        db_session,
+        redis_client,
+        auth_id=TEST_USERNAME,
+    )
+    await commit(db_session)
     monkeypatch.setattr(
         redis_client,
         "delete",
@@ -1,10 +1,25 @@
+import asyncio
+
 import pytest
 from alembic import command
 from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.core.config import Settings
 
 
+async def _execute(settings: Settings, *statements: str) -> None:
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    try:
+        async with engine.begin() as connection:
+            for statement in statements:
+                await connection.execute(text(statement))
+    finally:
+        await engine.dispose()
+
+
 @pytest.mark.integration
 def test_alembic_upgrade_head(
     safe_integration_settings: Settings,
@@ -12,3 +27,35 @@ def test_alembic_upgrade_head(
 ) -> None:
     assert safe_integration_settings.APP_ENV == "test"
     command.check(Config("alembic.ini"))
+
+
+@pytest.mark.integration
+def test_credential_downgrade_refuses_scrypt_hashes(
+    safe_integration_settings: Settings,
+    migrated_database: None,
+) -> None:
+    scrypt_credential = "$scrypt$ln=15,r=8,p=1$" + "a" * 22 + "$" + "b" * 43
+    asyncio.run(
+        _execute(
+            safe_integration_settings,
+            "DELETE FROM auth_users",
+            "DELETE FROM users",
+            "INSERT INTO users (id, name, session_version, created_at, "
+            "updated_at) VALUES (1, 'Scrypt User', 1, NOW(), NOW())",
+            "INSERT INTO auth_users (user_id, auth_id, credential, "
+            "created_at, updated_at) VALUES "
+            f"(1, 'scrypt.user', '{scrypt_credential}', NOW(), NOW())",
+        )
+    )
+    try:
+        with pytest.raises(RuntimeError, match="reset them to bcrypt"):
+            command.downgrade(Config("alembic.ini"), "20260725_0001")
+    finally:
+        asyncio.run(
+            _execute(
+                safe_integration_settings,
+                "DELETE FROM auth_users",
+                "DELETE FROM users",
+            )
+        )
+    command.check(Config("alembic.ini"))
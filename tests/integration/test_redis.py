@@ -1,9 +1,97 @@
+import asyncio
+
 import pytest
 from redis.asyncio import Redis
 
+from app.db.redis import (
+    ClientSideCache,
+    close_redis,
+    run_client_cache_tracking,
+)
+from app.services.session_index import (
+    STORE_PRUNE_LIMIT,
+    purge_user_sessions,
+    session_index_key,
+    store_indexed_session,
+)
+
 
 @pytest.mark.integration
 async def test_redis_connection(redis_client: Redis) -> None:
     await redis_client.set("scaffold:test", "ok")
 
     assert await redis_client.get("scaffold:test") == "ok"
+
+
+@pytest.mark.integration
+async def test_client_cache_is_invalidated_by_tracking(
+    redis_client: Redis,
+) -> None:
+    await redis_client.set("scaffold:tracked:a", "first")
+    cache = ClientSideCache(max_entries=10, prefixes=("scaffold:tracked:",))
+    tracking = asyncio.create_task(run_client_cache_tracking(cache))
+    try:
+        while not cache.active:
+            await asyncio.sleep(0.01)
+        assert cache.get("scaffold:tracked:a") is None
+        value = await redis_client.get("scaffold:tracked:a")
+        cache.put("scaffold:tracked:a", value)
+        assert cache.get("scaffold:tracked:a") == "first"
+
+        await redis_client.set("scaffold:tracked:a", "second")
+        for _ in range(100):
+            if cache.stats().invalidations:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.get("scaffold:tracked:a") is None
+    finally:
+        tracking.cancel()
+        await asyncio.gather(tracking, return_exceptions=True)
+        await close_redis()
+
+
+@pytest.mark.integration
+async def test_purge_unlinks_indexes_larger_than_the_lua_stack(
+    redis_client: Redis,
+) -> None:
+    session_keys = [f"auth:session:bulk-{index}" for index in range(10_000)]
+    async with redis_client.pipeline(transaction=False) as pipeline:
+        for score, key in enumerate(session_keys):
+            pipeline.set(key, "payload", ex=60)
+            pipeline.zadd(session_index_key(1), {key: score})
+        await pipeline.execute()
+
+    purged = await purge_user_sessions(
+        redis_client,
+        legacy_key_prefix="auth:session:",
+        user_id=1,
+    )
+
+    assert purged == len(session_keys)
+    assert await redis_client.exists(session_index_key(1)) == 0
+    assert await redis_client.exists(*session_keys[:100]) == 0
+
+
+@pytest.mark.integration
+async def test_uncapped_store_checks_only_the_oldest_index_entries(
+    redis_client: Redis,
+) -> None:
+    expired = {f"auth:session:expired-{index}": index for index in range(20)}
+    await redis_client.zadd(session_index_key(1), expired)
+
+    evicted = await store_indexed_session(
+        redis_client,
+        legacy_key_prefix="auth:session:",
+        user_id=1,
+        session_key="auth:session:new",
+        payload="payload",
+        ttl_seconds=60,
+        created_at_ms=1_000,
+        max_sessions=0,
+    )
+
+    assert evicted == []
+    assert await redis_client.zcard(session_index_key(1)) == (
+        len(expired) - STORE_PRUNE_LIMIT + 1
+    )
+    assert await redis_client.get("auth:session:new") == "payload"
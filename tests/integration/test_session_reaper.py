@@ -0,0 +1,106 @@
+import pytest
+from httpx import AsyncClient
+from redis.asyncio import Redis
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from app.models import User
+from app.services.session_reaper import _reap_batch, reap_stale_sessions
+from tests.conftest import TEST_PASSWORD, TEST_USERNAME
+from tests.factories import build_internal_user
+
+
+pytestmark = pytest.mark.integration
+
+
+async def login(
+    client: AsyncClient,
+    username: str = TEST_USERNAME,
+) -> None:
+    response = await client.post(
+        "/api/auth/token",
+        data={"username": username, "password": TEST_PASSWORD},
+    )
+    assert response.status_code == 200
+
+
+async def test_reaper_unlinks_only_invalidated_sessions(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    db_engine: AsyncEngine,
+    redis_client: Redis,
+) -> None:
+    sessions = async_sessionmaker(bind=db_engine)
+    await login(unauth_client)
+    await db_session.execute(
+        update(User)
+        .where(User.id == auth_user.id)
+        .values(session_version=User.session_version + 1)
+    )
+    await db_session.commit()
+    await login(unauth_client)
+    await redis_client.set("auth:session:malformed", "not-json")
+
+    dry_run = await reap_stale_sessions(
+        sessions,
+        redis_client,
+        batch_size=1,
+        max_keys_per_second=1000,
+        dry_run=True,
+    )
+    assert dry_run.reaped == 2
+    assert len(await redis_client.keys("auth:session:*")) == 3
+
+    result = await reap_stale_sessions(
+        sessions,
+        redis_client,
+        batch_size=1,
+        max_keys_per_second=1000,
+    )
+
+    assert result.scanned == 3
+    assert result.reaped == 2
+    assert result.bytes_reclaimed > 0
+    assert len(await redis_client.keys("auth:session:*")) == 1
+
+
+async def test_reaper_keeps_sessions_of_users_created_between_batches(
+    unauth_client: AsyncClient,
+    auth_user: User,
+    db_session: AsyncSession,
+    db_engine: AsyncEngine,
+    redis_client: Redis,
+) -> None:
+    sessions = async_sessionmaker(bind=db_engine)
+    await login(unauth_client)
+    first_keys = await redis_client.keys("auth:session:*")
+    assert await _reap_batch(
+        sessions,
+        redis_client,
+        first_keys,
+        dry_run=False,
+    ) == (0, 0)
+
+    await build_internal_user(
+        db_session,
+        auth_id="reaper.new-user",
+        login=True,
+    )
+    await db_session.commit()
+    await login(unauth_client, "reaper.new-user")
+    second_keys = list(
+        set(await redis_client.keys("auth:session:*")) - set(first_keys)
+    )
+
+    assert await _reap_batch(
+        sessions,
+        redis_client,
+        second_keys,
+        dry_run=False,
+    ) == (0, 0)
+    assert len(await redis_client.keys("auth:session:*")) == 2
@@ -0,0 +1,55 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from unittest.mock import patch
+
+from app.core.request_context import RequestContext
+from app.db.query_budget import check_query_budget
+from app.middlewares import request_observability
+
+
+@contextmanager
+def capture_request_queries() -> Iterator[list[RequestContext]]:
+    contexts: list[RequestContext] = []
+
+    def record(context: RequestContext, **limits: Any) -> Any:
+        contexts.append(context)
+        return check_query_budget(context, **limits)
+
+    with patch.object(
+        request_observability,
+        "check_query_budget",
+        side_effect=record,
+    ):
+        yield contexts
+
+
+def assert_request_queries(
+    contexts: list[RequestContext],
+    method: str,
+    path: str,
+    *,
+    max_queries: int,
+    max_repeats: int = 1,
+) -> None:
+    matching = [
+        context
+        for context in contexts
+        if (context.method, context.path) == (method, path)
+    ]
+    assert matching, f"no {method} {path} request was captured"
+    for context in matching:
+        counts = context.statement_counts
+        assert counts.total() <= max_queries, (
+            f"{method} {path} issued {counts.total()} queries, "
+            f"expected at most {max_queries}: {dict(counts)}"
+        )
+        repeated = {
+            sql_hash: count
+            for sql_hash, count in counts.items()
+            if count > max_repeats
+        }
+        assert not repeated, (
+            f"{method} {path} repeated statements more than "
+            f"{max_repeats} times: {repeated}"
+        )
@@ -0,0 +1,49 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.db.mysql import after_commit, commit, session_factory
+
+
+async def test_after_commit_hooks_run_once_the_commit_succeeds() -> None:
+    hook = AsyncMock()
+    async with session_factory() as db:
+        db.sync_session.begin()
+        after_commit(db, hook)
+        hook.assert_not_awaited()
+
+        await commit(db)
+        await commit(db)
+
+    hook.assert_awaited_once_with()
+
+
+async def test_after_commit_hooks_are_dropped_by_rollback() -> None:
+    hook = AsyncMock()
+    async with session_factory() as db:
+        db.sync_session.begin()
+        after_commit(db, hook)
+        await db.rollback()
+
+        db.sync_session.begin()
+        await commit(db)
+
+    hook.assert_not_awaited()
+
+
+async def test_after_commit_hooks_do_not_run_when_the_commit_fails(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hook = AsyncMock()
+    async with session_factory() as db:
+        after_commit(db, hook)
+        monkeypatch.setattr(
+            db,
+            "commit",
+            AsyncMock(side_effect=RuntimeError("commit failed")),
+        )
+
+        with pytest.raises(RuntimeError):
+            await commit(db)
+
+    hook.assert_not_awaited()
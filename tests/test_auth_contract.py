@@ -1,4 +1,10 @@
+import pytest
+from httpx import AsyncClient
+
+import app.api.auth as auth_api
 from app.main import app
+from app.services.credential_pool import CredentialPoolBusyError
+from app.services.login_throttle import LoginThrottledError
 
 
 def test_auth_openapi_declares_error_responses_and_headers() -> None:
@@ -17,3 +23,41 @@ def test_auth_openapi_declares_error_responses_and_headers() -> None:
         "Cache-Control"
         in paths["/api/auth/token"]["post"]["responses"]["200"]["headers"]
     )
+
+
+async def test_saturated_credential_pool_returns_retry_after(
+    base_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def saturated(*_args, **_kwargs):
+        raise CredentialPoolBusyError(retry_after_seconds=2)
+
+    monkeypatch.setattr(auth_api, "authenticate_internal_user", saturated)
+
+    response = await base_client.post(
+        "/api/auth/token",
+        data={"username": "scaffold.admin", "password": "test-password-123"},
+    )
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Authentication service busy"}
+    assert response.headers["retry-after"] == "2"
+
+
+async def test_throttled_login_returns_retry_after(
+    base_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def throttled(*_args, **_kwargs):
+        raise LoginThrottledError(retry_after_seconds=30)
+
+    monkeypatch.setattr(auth_api, "authenticate_internal_user", throttled)
+
+    response = await base_client.post(
+        "/api/auth/token",
+        data={"username": "scaffold.admin", "password": "test-password-123"},
+    )
+
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many sign-in attempts"}
+    assert response.headers["retry-after"] == "30"
@@ -7,8 +7,11 @@ import app.cli as cli_module
 from app.services.auth import (
     AccountAlreadyExistsError,
     AccountNotFoundError,
+    IdentityLookupBenchmark,
     SessionInspection,
 )
+from app.services.credentials import CredentialBenchmark
+from app.services.session_reaper import SessionReapResult
 
 
 runner = CliRunner()
@@ -102,10 +105,10 @@ def test_account_commands_succeed(
         return SimpleNamespace(id=8)
 
     async def fake_run(operation):
-        return await operation(None)
+        return await operation(None, None)
 
     monkeypatch.setattr(cli_module, service_name, fake_service)
-    monkeypatch.setattr(cli_module, "_run_with_database", fake_run)
+    monkeypatch.setattr(cli_module, "_run_with_database_and_redis", fake_run)
     input_text = (
         "test-password-123\ntest-password-123\n"
         if command == "reset-password"
@@ -139,10 +142,10 @@ def test_account_commands_return_nonzero_for_unknown_user(
         raise AccountNotFoundError("account was not found")
 
     async def fake_run(operation):
-        return await operation(None)
+        return await operation(None, None)
 
     monkeypatch.setattr(cli_module, service_name, fake_service)
-    monkeypatch.setattr(cli_module, "_run_with_database", fake_run)
+    monkeypatch.setattr(cli_module, "_run_with_database_and_redis", fake_run)
     input_text = (
         "test-password-123\ntest-password-123\n"
         if command == "reset-password"
@@ -202,3 +205,229 @@ def test_inspect_session_reports_missing_token(monkeypatch) -> None:
     assert "session_fp=abc123def456" in result.output
     assert "exists=false" in result.output
     assert "sess_missing-token" not in result.output
+
+
+def test_benchmark_credential_recommends_cost(monkeypatch) -> None:
+    def fake_benchmark(parameters, *, samples):
+        return CredentialBenchmark(
+            scheme=parameters.scheme,
+            cost=parameters.cost,
+            median_seconds=parameters.cost / 100,
+            max_seconds=parameters.cost / 100,
+        )
+
+    monkeypatch.setattr(cli_module, "benchmark_credential_cost", fake_benchmark)
+
+    result = runner.invoke(
+        cli_module.cli,
+        [
+            "benchmark-credential",
+            "--min-cost",
+            "10",
+            "--max-cost",
+            "14",
+            "--target-ms",
+            "125",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "scheme=bcrypt cost=14 median_ms=140.0" in result.output
+    assert "recommended_cost=12" in result.output
+    assert "AUTH_BCRYPT_ROUNDS=12" in result.output
+
+
+def test_benchmark_credential_rejects_unknown_scheme() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-credential", "--scheme", "md5"],
+    )
+
+    assert result.exit_code == 2
+    assert "is not one of 'bcrypt', 'scrypt'" in result.output
+
+
+def test_reap_sessions_prints_final_counts(monkeypatch) -> None:
+    async def fake_run(operation):
+        return SessionReapResult(
+            scanned=10,
+            reaped=4,
+            bytes_reclaimed=512,
+            batches=1,
+        )
+
+    monkeypatch.setattr(
+        cli_module,
+        "_run_with_redis",
+        fake_run,
+    )
+
+    result = runner.invoke(cli_module.cli, ["reap-sessions", "--dry-run"])
+
+    assert result.exit_code == 0
+    assert "reaped=4" in result.output
+    assert "bytes_reclaimed=512" in result.output
+    assert "dry_run=true" in result.output
+
+
+def test_benchmark_session_encoding_reports_both_formats() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-session-encoding", "--sessions", "10"],
+    )
+
+    assert result.exit_code == 0
+    assert "encoding=json key_bytes=77.0" in result.output
+    assert "encoding=compact key_bytes=29.0" in result.output
+    assert "bytes_per_session=" in result.output
+    assert "decodes_per_second=" in result.output
+
+
+def test_benchmark_log_format_reports_both_formats() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-log-format", "--records", "10"],
+    )
+
+    assert result.exit_code == 0
+    assert "log_format=text records_per_second=" in result.output
+    assert "log_format=json records_per_second=" in result.output
+    assert "bytes_per_record=" in result.output
+
+
+def test_benchmark_session_store_runs_against_memory() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-session-store", "--store", "memory", "--sessions", "10"],
+    )
+
+    assert result.exit_code == 0
+    assert "store=memory writes_per_second=" in result.output
+
+
+def test_benchmark_session_store_rejects_unknown_store() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-session-store", "--store", "disk"],
+    )
+
+    assert result.exit_code == 2
+    assert "is not one of 'redis', 'memory'" in result.output
+
+
+def test_benchmark_identity_lookup_reports_both_paths(monkeypatch) -> None:
+    async def fake_benchmark(_db, *, auth_id, lookups):
+        assert (auth_id, lookups) == ("scaffold.admin", 5)
+        return [
+            IdentityLookupBenchmark("orm", 410.0, 5, 0),
+            IdentityLookupBenchmark("core", 250.0, 5, 0),
+        ]
+
+    async def fake_run(operation):
+        return await operation(None)
+
+    monkeypatch.setattr(
+        cli_module,
+        "benchmark_identity_lookup",
+        fake_benchmark,
+    )
+    monkeypatch.setattr(cli_module, "_run_with_database", fake_run)
+
+    result = runner.invoke(
+        cli_module.cli,
+        ["benchmark-identity-lookup", "scaffold.admin", "--lookups", "5"],
+    )
+
+    assert result.exit_code == 0
+    assert "path=orm us_per_lookup=410.0" in result.output
+    assert "path=core us_per_lookup=250.0" in result.output
+    assert "compiled_cache_hits=5 compiled_cache_misses=0" in result.output
+
+
+def test_query_stats_prints_top_statements(monkeypatch) -> None:
+    def fake_fetch(base_url, path, **query):
+        assert (base_url, path) == ("http://worker:8000", "query-stats")
+        assert query == {"limit": 5, "order_by": "p99"}
+        return {
+            "worker_pid": 42,
+            "statements_tracked": 1,
+            "statements_evicted": 0,
+            "statements": [
+                {
+                    "sql_hash": "abc123def4567890",
+                    "operation": "SELECT",
+                    "count": 3,
+                    "total_ms": 6.0,
+                    "mean_ms": 2.0,
+                    "p50_ms": 2.0,
+                    "p95_ms": 2.2,
+                    "p99_ms": 2.2,
+                    "max_ms": 2.2,
+                    "rows": 3,
+                    "slow_count": 0,
+                }
+            ],
+        }
+
+    monkeypatch.setattr(cli_module, "_fetch_internal", fake_fetch)
+
+    result = runner.invoke(
+        cli_module.cli,
+        [
+            "query-stats",
+            "--url",
+            "http://worker:8000",
+            "--limit",
+            "5",
+            "--order-by",
+            "p99",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "worker_pid=42 statements_tracked=1" in result.output
+    assert "sql_hash=abc123def4567890 operation=SELECT count=3" in result.output
+
+
+def test_query_stats_rejects_unknown_order() -> None:
+    result = runner.invoke(
+        cli_module.cli,
+        ["query-stats", "--order-by", "latest"],
+    )
+
+    assert result.exit_code == 2
+    assert "'latest' is not one of 'total', 'mean'" in result.output
+
+
+def test_query_traces_filters_by_request_id(monkeypatch) -> None:
+    def fake_fetch(base_url, path, **query):
+        assert path == "query-traces"
+        assert query == {"limit": 100, "request_id": "request-123"}
+        return {
+            "worker_pid": 42,
+            "traces": [
+                {
+                    "request_id": "request-123",
+                    "method": "GET",
+                    "path": "/api/auth/me",
+                    "sql_hash": "abc123def4567890",
+                    "operation": "SELECT",
+                    "statement": "SELECT users.id FROM users",
+                    "duration_ms": 1.25,
+                    "rowcount": 1,
+                    "recorded_at": 1700000000.0,
+                }
+            ],
+        }
+
+    monkeypatch.setattr(cli_module, "_fetch_internal", fake_fetch)
+
+    result = runner.invoke(
+        cli_module.cli,
+        ["query-traces", "--request-id", "request-123"],
+    )
+
+    assert result.exit_code == 0
+    assert "worker_pid=42" in result.output
+    assert "request_id=request-123 method=GET" in result.output
+    assert "duration_ms=1.25 rowcount=1" in result.output
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.credential_pool import (
+    CredentialPool,
+    CredentialPoolBusyError,
+)
+
+
+def build_pool(*, max_workers: int = 1, max_pending: int = 0) -> CredentialPool:
+    return CredentialPool(
+        kind="thread",
+        max_workers=max_workers,
+        max_pending=max_pending,
+        retry_after_seconds=3,
+    )
+
+
+async def test_credential_pool_runs_work_off_the_event_loop() -> None:
+    pool = build_pool()
+    loop_thread = threading.get_ident()
+
+    def work_thread() -> int:
+        return threading.get_ident()
+
+    try:
+        assert await pool.run(work_thread) != loop_thread
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats.submitted == stats.completed == 1
+    assert stats.in_flight == 0
+
+
+async def test_saturated_credential_pool_rejects_immediately() -> None:
+    pool = build_pool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def blocked() -> bool:
+        return release.wait(timeout=5)
+
+    try:
+        running = [asyncio.create_task(pool.run(blocked)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.queue_depth == 1
+
+        with pytest.raises(CredentialPoolBusyError) as exc_info:
+            await pool.run(blocked)
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert exc_info.value.retry_after_seconds == 3
+    stats = pool.stats()
+    assert stats.rejected == 1
+    assert stats.completed == 2
+    assert stats.max_in_flight == 2
+
+
+async def test_failed_credential_work_releases_its_slot() -> None:
+    pool = build_pool()
+
+    def broken() -> None:
+        raise ValueError("broken")
+
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(broken)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats.failed == 1
+    assert stats.in_flight == 0
+
+
+async def test_cancelled_request_keeps_its_slot_until_work_finishes() -> None:
+    pool = build_pool(max_workers=1, max_pending=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocked() -> bool:
+        started.set()
+        return release.wait(timeout=5)
+
+    try:
+        request = asyncio.create_task(pool.run(blocked))
+        await asyncio.to_thread(started.wait, 5)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+        assert pool.stats().in_flight == 1
+        with pytest.raises(CredentialPoolBusyError):
+            await pool.run(blocked)
+
+        release.set()
+        for _ in range(100):
+            if pool.stats().in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert pool.stats().in_flight == 0
@@ -0,0 +1,69 @@
+import pytest
+
+from app.core.config import get_settings
+from app.services.credentials import (
+    DUMMY_CREDENTIAL,
+    CredentialBenchmark,
+    CredentialParameters,
+    credential_needs_rehash,
+    credential_parameters,
+    hash_password_with,
+    recommend_credential_cost,
+    verify_password,
+)
+
+
+SCRYPT_PARAMETERS = CredentialParameters(
+    scheme="scrypt",
+    cost=10,
+    block_size=8,
+    parallelism=1,
+)
+
+
+def test_scrypt_credential_round_trip_is_self_describing() -> None:
+    credential = hash_password_with("test-password-123", SCRYPT_PARAMETERS)
+
+    assert credential.startswith("$scrypt$ln=10,r=8,p=1$")
+    assert len(credential) <= 255
+    assert credential_parameters(credential) == SCRYPT_PARAMETERS
+    assert verify_password("test-password-123", credential)
+    assert not verify_password("wrong-password", credential)
+
+
+def test_malformed_credentials_never_verify() -> None:
+    assert credential_parameters("not-a-credential") is None
+    assert not verify_password("test-password-123", "not-a-credential")
+    assert not verify_password("test-password-123", "$scrypt$ln=10,r=8,p=1$$")
+
+
+def test_rehash_is_required_when_configured_parameters_change(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    assert credential_parameters(DUMMY_CREDENTIAL) == CredentialParameters(
+        scheme="bcrypt",
+        cost=12,
+    )
+    assert not credential_needs_rehash(DUMMY_CREDENTIAL)
+
+    monkeypatch.setattr(settings, "AUTH_BCRYPT_ROUNDS", 10)
+    assert credential_needs_rehash(DUMMY_CREDENTIAL)
+
+    monkeypatch.setattr(settings, "AUTH_CREDENTIAL_SCHEME", "scrypt")
+    monkeypatch.setattr(settings, "AUTH_SCRYPT_LOG_N", 10)
+    assert credential_needs_rehash(DUMMY_CREDENTIAL)
+    assert not credential_needs_rehash(
+        hash_password_with("test-password-123", SCRYPT_PARAMETERS)
+    )
+
+
+def test_recommendation_picks_highest_cost_within_target() -> None:
+    results = [
+        CredentialBenchmark("bcrypt", 10, median_seconds=0.06, max_seconds=0.07),
+        CredentialBenchmark("bcrypt", 11, median_seconds=0.12, max_seconds=0.13),
+        CredentialBenchmark("bcrypt", 12, median_seconds=0.25, max_seconds=0.26),
+    ]
+
+    assert recommend_credential_cost(results, target_seconds=0.2).cost == 11
+    assert recommend_credential_cost(results, target_seconds=0.01) is None
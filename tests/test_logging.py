@@ -0,0 +1,160 @@
+import json
+import logging
+import queue
+import sys
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app import main
+from app.core.logging import (
+    BoundedQueueHandler,
+    JsonFormatter,
+    LogFields,
+    create_formatter,
+    setup_logging,
+    stop_logging,
+)
+
+
+def _record(message: str, args: Any = None) -> logging.LogRecord:
+    return logging.LogRecord(
+        "app.test",
+        logging.INFO,
+        __file__,
+        1,
+        message,
+        args,
+        None,
+    )
+
+
+def _structured_record() -> logging.LogRecord:
+    return _record(
+        "session_event user_id=%(user_id)s path=%(path)r "
+        "duration_ms=%(duration_ms).2f cached=%(cached)s "
+        "tables=%(tables)s repeated=%(repeated)s",
+        (
+            LogFields(
+                user_id=None,
+                path="/api/auth/me",
+                duration_ms=1.5,
+                cached=True,
+                tables=["users", "auth_users"],
+                repeated={"3f2a": 4},
+            ),
+        ),
+    )
+
+
+def test_full_queue_drops_and_counts_records() -> None:
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), overflow="drop")
+
+    for message in ("first", "second", "third"):
+        handler.handle(_record(message))
+
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().getMessage() == "first"
+
+
+def test_queued_records_are_flushed_on_stop(monkeypatch, capsys) -> None:
+    app_logger = logging.getLogger("app")
+    monkeypatch.setattr(app_logger, "handlers", [])
+    setup_logging("info", queue_size=100)
+    assert isinstance(app_logger.handlers[0], BoundedQueueHandler)
+
+    for index in range(50):
+        logging.getLogger("app.test").info("queued_record index=%d", index)
+    stop_logging()
+    logging.getLogger("app.test").info("direct_record")
+
+    output = capsys.readouterr().out.splitlines()
+    assert len(output) == 51
+    assert output[0].endswith("logger=app.test queued_record index=0")
+    assert output[-1].endswith("direct_record")
+    assert not isinstance(app_logger.handlers[0], BoundedQueueHandler)
+
+
+def test_text_format_renders_structured_fields_as_key_values() -> None:
+    logged = create_formatter("text").format(_structured_record())
+
+    assert logged.endswith(
+        "level=INFO logger=app.test session_event user_id=- "
+        "path='/api/auth/me' duration_ms=1.50 cached=true "
+        "tables=users,auth_users repeated=3f2a:4"
+    )
+
+
+def test_json_format_keeps_structured_fields() -> None:
+    event = json.loads(JsonFormatter().format(_structured_record()))
+
+    assert event.pop("time").endswith("Z")
+    assert event == {
+        "level": "INFO",
+        "logger": "app.test",
+        "event": "session_event",
+        "user_id": None,
+        "path": "/api/auth/me",
+        "duration_ms": 1.5,
+        "cached": True,
+        "tables": ["users", "auth_users"],
+        "repeated": {"3f2a": 4},
+    }
+
+
+def test_json_format_without_the_c_encoder_matches(monkeypatch) -> None:
+    record = _structured_record()
+    expected = JsonFormatter().format(record)
+    monkeypatch.setattr("app.core.logging.c_make_encoder", None)
+
+    assert JsonFormatter().format(record) == expected
+
+
+def test_json_format_falls_back_to_the_message() -> None:
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = _record("task_failed name=%s", ("reaper",))
+        record.exc_info = sys.exc_info()
+
+    event = json.loads(JsonFormatter().format(record))
+
+    assert event["event"] == "task_failed"
+    assert event["message"] == "task_failed name=reaper"
+    assert "RuntimeError: boom" in event["exc_info"]
+
+
+def test_queued_structured_records_keep_their_fields(
+    monkeypatch,
+    capsys,
+) -> None:
+    app_logger = logging.getLogger("app")
+    monkeypatch.setattr(app_logger, "handlers", [])
+    setup_logging("info", queue_size=10, log_format="json")
+
+    logging.getLogger("app.test").info(
+        "session_created user_id=%(user_id)d",
+        LogFields(user_id=7),
+    )
+    stop_logging()
+
+    event = json.loads(capsys.readouterr().out)
+    assert event["event"] == "session_created"
+    assert event["user_id"] == 7
+
+
+async def test_lifespan_stops_logging_when_shutdown_fails(monkeypatch) -> None:
+    for name in dir(main):
+        if name.startswith("start_"):
+            monkeypatch.setattr(main, name, lambda *_args: None)
+    failing_stop = AsyncMock(side_effect=RuntimeError("redis down"))
+    monkeypatch.setattr(main, "stop_client_cache_tracking", failing_stop)
+    stop = Mock()
+    monkeypatch.setattr(main, "stop_logging", stop)
+
+    with pytest.raises(RuntimeError):
+        async with main.lifespan(main.app):
+            pass
+
+    stop.assert_called_once_with()
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, get_settings
+from app.services.login_throttle import (
+    login_client_address,
+    login_throttle_keys,
+)
+
+
+def test_throttle_keys_hash_username_and_client_address() -> None:
+    keys = login_throttle_keys(
+        auth_id=" Scaffold.Admin ",
+        client_address="203.0.113.7",
+    )
+
+    assert [key.split(":")[2] for key, _ in keys] == ["user", "client"]
+    assert keys[0] == login_throttle_keys(
+        auth_id="scaffold.admin",
+        client_address=None,
+    )[0]
+    assert all("scaffold.admin" not in key for key, _ in keys)
+    assert all("203.0.113.7" not in key for key, _ in keys)
+
+
+def test_client_address_ignores_forwarded_for_without_trusted_proxies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(get_settings(), "AUTH_TRUSTED_PROXIES", "")
+
+    assert login_client_address("10.0.0.5", "203.0.113.7") == "10.0.0.5"
+
+
+def test_client_address_skips_trusted_proxy_hops(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        get_settings(),
+        "AUTH_TRUSTED_PROXIES",
+        "10.0.0.0/8, 127.0.0.1",
+    )
+
+    # The left-most entry was supplied by the client and is not trusted.
+    assert (
+        login_client_address(
+            "10.0.0.5",
+            "198.51.100.1, 203.0.113.7, 10.0.0.9",
+        )
+        == "203.0.113.7"
+    )
+    assert login_client_address("10.0.0.5", None) == "10.0.0.5"
+    assert login_client_address("192.0.2.1", "203.0.113.7") == "192.0.2.1"
+
+
+def test_trusted_proxies_must_be_addresses_or_networks() -> None:
+    with pytest.raises(ValidationError, match="AUTH_TRUSTED_PROXIES"):
+        Settings(AUTH_TRUSTED_PROXIES="10.0.0.0/8,proxy.internal")
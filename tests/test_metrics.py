@@ -0,0 +1,89 @@
+import subprocess
+import sys
+
+from httpx import ASGITransport, AsyncClient
+from pydantic import SecretStr
+
+from app.core.config import get_settings
+from app.core.metrics import render_metrics
+from app.main import create_app
+
+
+INTERNAL_TOKEN = "internal-token-0123456789abcdef0123"
+RECORD_REQUEST = """
+from app.core.metrics import observe_pool, observe_request
+
+observe_request(
+    method="GET",
+    route="/api/auth/me",
+    status_code=200,
+    duration_seconds=0.01,
+)
+observe_pool(
+    pool="mysql",
+    size=5,
+    checked_out=1,
+    overflow=0,
+    wait_p95_seconds=0.001,
+)
+"""
+
+
+async def test_requests_are_labeled_by_route_template(monkeypatch) -> None:
+    monkeypatch.setattr(
+        get_settings(),
+        "INTERNAL_API_TOKEN",
+        SecretStr(INTERNAL_TOKEN),
+    )
+    app = create_app()
+
+    @app.get("/metrics-items/{item_id}")
+    async def read_item(item_id: int) -> int:
+        return item_id
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        await client.get("/metrics-items/7")
+        await client.get("/metrics-items/8")
+        await client.get("/metrics-items/not-a-number")
+        await client.get("/metrics-missing/7")
+        response = await client.get(
+            "/internal/metrics",
+            headers={"X-Internal-Token": INTERNAL_TOKEN},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    metrics = response.text
+    assert (
+        'http_requests_total{method="GET",route="/metrics-items/{item_id}",'
+        'status_class="2xx"} 2.0'
+    ) in metrics
+    assert (
+        'http_requests_total{method="GET",route="/metrics-items/{item_id}",'
+        'status_class="4xx"} 1.0'
+    ) in metrics
+    assert 'route="unmatched",status_class="4xx"' in metrics
+    assert "/metrics-items/7" not in metrics
+
+
+def test_worker_processes_are_aggregated(monkeypatch, tmp_path) -> None:
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", RECORD_REQUEST],
+            check=True,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)},
+        )
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    metrics = render_metrics().decode()
+
+    assert (
+        'http_requests_total{method="GET",route="/api/auth/me",'
+        'status_class="2xx"} 2.0'
+    ) in metrics
+    # Live gauges sum the workers until gunicorn marks them dead.
+    assert 'pool_size{pool="mysql"} 10.0' in metrics
+    assert 'pool_checked_out{pool="mysql"} 2.0' in metrics
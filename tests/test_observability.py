@@ -2,7 +2,13 @@ from unittest.mock import patch
 
 from httpx import ASGITransport, AsyncClient
 
-from app.core.request_context import get_request_context
+from app.core.request_context import (
+    PHASE_AUTH,
+    PHASE_DATABASE,
+    PHASE_REDIS,
+    get_request_context,
+    record_phase,
+)
 from app.main import app, create_app
 
 
@@ -37,7 +43,7 @@ async def test_access_log_omits_sensitive_request_data() -> None:
 
     assert response.status_code == 404
     log.assert_called_once()
-    logged = log.call_args.args[0] % log.call_args.args[1:]
+    logged = log.call_args.args[0] % log.call_args.args[1]
     assert "path='/missing'" in logged
     assert "query-value" not in logged
     assert "raw-secret-token" not in logged
@@ -83,6 +89,41 @@ async def test_unhandled_error_keeps_observability_headers() -> None:
     assert response.headers["x-request-id"] == "boom-123"
     assert response.headers["server-timing"].startswith("app;dur=")
     log.assert_called_once()
-    logged = log.call_args.args[0] % log.call_args.args[1:]
+    logged = log.call_args.args[0] % log.call_args.args[1]
     assert "status=500" in logged
     assert get_request_context() is None
+
+
+async def test_server_timing_breaks_down_request_phases() -> None:
+    test_app = create_app()
+
+    @test_app.get("/phases")
+    async def phases() -> dict[str, str]:
+        record_phase(PHASE_DATABASE, 0.004)
+        record_phase(PHASE_DATABASE, 0.002)
+        record_phase(PHASE_REDIS, 0.001, 3)
+        record_phase(PHASE_AUTH, 0.25)
+        return {"status": "ok"}
+
+    with patch(
+        "app.middlewares.request_observability.ACCESS_LOGGER.info"
+    ) as log:
+        async with AsyncClient(
+            transport=ASGITransport(app=test_app),
+            base_url="http://test",
+        ) as client:
+            response = await client.get("/phases")
+
+    metrics = response.headers["server-timing"].split(", ")
+    assert metrics[0].startswith("app;dur=")
+    assert metrics[1:4] == [
+        'db;dur=6.00;desc="2 queries"',
+        'redis;dur=1.00;desc="3 commands"',
+        "auth;dur=250.00",
+    ]
+    assert metrics[4].startswith("serialize;dur=")
+    logged = log.call_args.args[0] % log.call_args.args[1]
+    assert "db_ms=6.00 db_queries=2" in logged
+    assert "redis_ms=1.00 redis_commands=3" in logged
+    assert "auth_ms=250.00" in logged
+    assert "serialize_ms=" in logged
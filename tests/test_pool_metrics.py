@@ -0,0 +1,114 @@
+from time import time
+from unittest.mock import MagicMock
+
+from sqlalchemy.pool import ConnectionPoolEntry
+from sqlalchemy.util import greenlet_spawn
+
+from app.db.pool import (
+    CHECKED_IN_AT_INFO_KEY,
+    Histogram,
+    InstrumentedQueuePool,
+    PoolMetrics,
+    PoolValidation,
+)
+
+
+def test_histogram_reports_bucket_quantiles() -> None:
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.005, 0.05, 2.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.mean() == 0.515
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.75) == 0.1
+    assert histogram.quantile(0.95) == float("inf")
+
+
+async def test_adaptive_pool_grows_on_wait_and_shrinks_when_idle() -> None:
+    pool = InstrumentedQueuePool(MagicMock, pool_size=4, max_overflow=2)
+    pool.configure(metrics=PoolMetrics("test"), min_size=1, target_size=2)
+
+    def exercise() -> list[int]:
+        connections = [pool.connect() for _ in range(4)]
+        stats = pool.stats()
+        assert (stats.checked_out, stats.overflow) == (4, 2)
+        for connection in connections:
+            connection.close()
+        # Connections beyond the target are closed instead of kept idle.
+        assert pool.checkedin() == 2
+        return [
+            pool.adjust(wait_threshold_seconds=0),
+            pool.adjust(wait_threshold_seconds=1),
+            pool.adjust(wait_threshold_seconds=1),
+            pool.adjust(wait_threshold_seconds=1),
+        ]
+
+    assert await greenlet_spawn(exercise) == [4, 3, 2, 1]
+    assert pool.checkedin() == 1
+    assert pool.open_connections() == 1
+    stats = pool.stats()
+    assert (stats.pool, stats.checkouts) == ("test", 4)
+    assert stats.hold_mean_seconds > 0
+
+
+async def test_validation_pings_idle_and_replaces_expiring() -> None:
+    pool = InstrumentedQueuePool(MagicMock, pool_size=3, max_overflow=0)
+    pool._dialect = MagicMock()
+
+    def exercise() -> list[PoolValidation]:
+        connections = [pool.connect() for _ in range(3)]
+        records = [connection._connection_record for connection in connections]
+        for connection in connections:
+            connection.close()
+        now = time()
+        records[0].info[CHECKED_IN_AT_INFO_KEY] = now - 60
+        records[1].info[CHECKED_IN_AT_INFO_KEY] = now - 600
+        return [
+            pool.validate_idle(
+                ping_after_seconds=30,
+                replace_after_seconds=300,
+                recycle_seconds=0,
+            ),
+            pool.validate_idle(
+                ping_after_seconds=30,
+                replace_after_seconds=300,
+                recycle_seconds=0,
+            ),
+        ]
+
+    first, second = await greenlet_spawn(exercise)
+
+    assert first == PoolValidation(pinged=1, replaced=1, dropped=0)
+    assert second == PoolValidation()
+    assert pool._dialect.do_ping.call_count == 1
+    assert pool.checkedin() == 3
+
+
+async def test_validation_closes_records_when_check_ins_fill_queue() -> None:
+    pool = InstrumentedQueuePool(MagicMock, pool_size=2, max_overflow=2)
+    pool._dialect = MagicMock()
+
+    def exercise() -> tuple[PoolValidation, ConnectionPoolEntry]:
+        connections = [pool.connect() for _ in range(3)]
+        pinged = connections[0]._connection_record
+        connections[0].close()
+        connections[1].close()
+        pinged.info[CHECKED_IN_AT_INFO_KEY] = time() - 60
+        # A check-in during the ping refills the queue.
+        pool._dialect.do_ping.side_effect = (
+            lambda _connection: connections[2].close()
+        )
+        validation = pool.validate_idle(
+            ping_after_seconds=30,
+            replace_after_seconds=300,
+            recycle_seconds=0,
+        )
+        return validation, pinged
+
+    validation, pinged = await greenlet_spawn(exercise)
+
+    assert validation == PoolValidation(pinged=1, dropped=1)
+    assert pinged.dbapi_connection is None
+    assert pool.checkedin() == 2
+    assert (pool.checkedout(), pool.overflow()) == (0, 0)
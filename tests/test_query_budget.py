@@ -0,0 +1,82 @@
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+
+from app.core.config import get_settings
+from app.db.query_budget import find_query_budget_violation
+from app.db.query_stats import fingerprint_sql
+from app.db.slow_query import install_slow_query_logging
+from app.main import create_app
+from tests.query_counts import assert_request_queries, capture_request_queries
+
+
+def test_violation_reports_budget_and_repeated_statements() -> None:
+    counts = Counter({"aaaa": 4, "bbbb": 2, "cccc": 1})
+
+    assert find_query_budget_violation(
+        counts,
+        query_budget=0,
+        repeated_statement_limit=0,
+    ) is None
+    assert find_query_budget_violation(
+        counts,
+        query_budget=7,
+        repeated_statement_limit=4,
+    ) is None
+    violation = find_query_budget_violation(
+        counts,
+        query_budget=5,
+        repeated_statement_limit=3,
+    )
+    assert violation is not None
+    assert violation.queries == 7
+    assert violation.repeated == {"aaaa": 4}
+
+
+async def test_repeated_statements_are_logged_once_per_request(
+    monkeypatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DB_REQUEST_QUERY_BUDGET", 10)
+    monkeypatch.setattr(settings, "DB_REQUEST_REPEATED_STATEMENT_LIMIT", 2)
+    engine = create_engine("sqlite://")
+    install_slow_query_logging(engine, threshold_seconds=10)
+    app = create_app()
+
+    @app.get("/items")
+    def list_items() -> list[int]:
+        with engine.connect() as connection:
+            return [
+                connection.exec_driver_sql("SELECT ?", (item,)).scalar_one()
+                for item in range(3)
+            ]
+
+    with (
+        capture_request_queries() as contexts,
+        patch("app.db.query_budget.QUERY_BUDGET_LOGGER.warning") as log,
+    ):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test",
+        ) as client:
+            response = await client.get("/items")
+    engine.dispose()
+
+    assert response.json() == [0, 1, 2]
+    log.assert_called_once()
+    logged = log.call_args.args[0] % log.call_args.args[1]
+    sql_hash = fingerprint_sql("SELECT ?").sql_hash
+    assert "path='/items' queries=3" in logged
+    assert f"repeated={sql_hash}:3" in logged
+    assert_request_queries(
+        contexts,
+        "GET",
+        "/items",
+        max_queries=3,
+        max_repeats=3,
+    )
+    with pytest.raises(AssertionError, match="repeated statements"):
+        assert_request_queries(contexts, "GET", "/items", max_queries=3)
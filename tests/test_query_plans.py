@@ -0,0 +1,86 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+
+from app.db.query_plans import QueryPlanCapture, summarize_plan
+from app.db.query_stats import fingerprint_sql
+from app.db.slow_query import install_slow_query_logging
+
+
+MYSQL_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "cost_info": {"query_cost": "1204.50"},
+        "nested_loop": [
+            {
+                "table": {
+                    "table_name": "users",
+                    "access_type": "ALL",
+                    "rows_examined_per_scan": 9876,
+                    "attached_condition": "(`users`.`name` = 'secret')",
+                }
+            },
+            {
+                "table": {
+                    "table_name": "auth_users",
+                    "access_type": "eq_ref",
+                    "key": "PRIMARY",
+                    "rows_examined_per_scan": 1,
+                }
+            },
+        ],
+    }
+}
+
+
+def _logged_message(log) -> str:
+    return log.call_args.args[0] % log.call_args.args[1]
+
+
+def test_plan_summary_reports_full_scans_and_row_estimates() -> None:
+    plan = summarize_plan("abc123", MYSQL_PLAN)
+
+    assert plan.query_cost == 1204.5
+    assert plan.full_scans == ("users",)
+    assert plan.rows_examined == 9877
+    assert [table.key for table in plan.tables] == [None, "PRIMARY"]
+
+
+async def test_slow_statement_plan_is_captured_once_and_rate_limited(
+    monkeypatch,
+) -> None:
+    engine = create_engine("sqlite://")
+    engine.connect().close()
+    capture = QueryPlanCapture(max_plans=10, min_interval_seconds=60)
+    explained = []
+
+    def fake_explain(_engine, statement, parameters):
+        explained.append((statement, parameters))
+        return json.dumps(MYSQL_PLAN)
+
+    monkeypatch.setattr(capture, "_explain", fake_explain)
+    install_slow_query_logging(
+        engine,
+        threshold_seconds=0,
+        query_plans=capture,
+    )
+    with patch("app.db.query_plans.QUERY_PLAN_LOGGER.warning") as log:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT ?", ("top-secret",))
+            connection.exec_driver_sql("SELECT ?", ("top-secret",))
+            # Within the capture interval, another statement is skipped.
+            connection.exec_driver_sql("SELECT 2")
+        await asyncio.gather(*capture._tasks)
+    engine.dispose()
+
+    assert explained == [("SELECT ?", ("top-secret",))]
+    log.assert_called_once()
+    logged = _logged_message(log)
+    assert "full_scans=users" in logged
+    assert "tables=users:ALL:-:9876,auth_users:eq_ref:PRIMARY:1" in logged
+    assert "secret" not in logged
+    sql_hash = fingerprint_sql("SELECT ?").sql_hash
+    assert capture.plan(sql_hash).rows_examined == 9877
+    assert capture.plan(fingerprint_sql("SELECT 2").sql_hash) is None
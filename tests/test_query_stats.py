@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+from httpx import AsyncClient
+from pydantic import SecretStr
+from sqlalchemy import create_engine
+
+from app.core.config import get_settings
+from app.db import mysql
+from app.db.query_stats import QueryStats, fingerprint_sql
+from app.db.slow_query import install_slow_query_logging
+from app.main import app
+
+
+INTERNAL_TOKEN = "internal-token-0123456789abcdef0123"
+
+
+def test_statements_are_aggregated_by_hash_with_bounded_memory() -> None:
+    engine = create_engine("sqlite://")
+    # Dialect initialization runs its own statements on first connect.
+    engine.connect().close()
+    query_stats = QueryStats(max_statements=2)
+    install_slow_query_logging(
+        engine,
+        threshold_seconds=10,
+        query_stats=query_stats,
+    )
+    with engine.connect() as connection:
+        for _ in range(3):
+            connection.exec_driver_sql("SELECT  1")
+        connection.exec_driver_sql("SELECT 2")
+        connection.exec_driver_sql("SELECT 3")
+    engine.dispose()
+
+    top = query_stats.top(limit=10, order_by="count")
+    assert {snapshot.sql_hash for snapshot in top} == {
+        fingerprint_sql("SELECT 2").sql_hash,
+        fingerprint_sql("SELECT 3").sql_hash,
+    }
+    assert query_stats.evicted == 1
+    assert top[0].count == 1
+    assert top[0].p50_ms <= top[0].max_ms
+
+
+def test_repeated_slow_queries_are_summarized() -> None:
+    engine = create_engine("sqlite://")
+    query_stats = QueryStats(max_statements=10, summarize_slow_queries=True)
+    install_slow_query_logging(
+        engine,
+        threshold_seconds=0,
+        query_stats=query_stats,
+    )
+    with patch("app.db.slow_query.SLOW_QUERY_LOGGER.warning") as log:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.exec_driver_sql("SELECT 1")
+    engine.dispose()
+
+    log.assert_called_once()
+    (summary,) = query_stats.drain_slow_summaries()
+    assert summary.sql_hash == fingerprint_sql("SELECT 1").sql_hash
+    assert summary.count == 3
+    assert query_stats.drain_slow_summaries() == []
+
+
+def test_adaptive_threshold_follows_statement_baseline() -> None:
+    query_stats = QueryStats(
+        max_statements=10,
+        adaptive_multiplier=4,
+        adaptive_min_samples=3,
+        adaptive_floor_seconds=0.01,
+    )
+    stats = query_stats.statement(fingerprint_sql("SELECT 1"))
+    for _ in range(2):
+        stats.observe(0.004, 1)
+    assert query_stats.threshold_seconds(stats, 2.0) == 2.0
+
+    stats.observe(0.004, 1)
+    assert query_stats.threshold_seconds(stats, 2.0) == 0.016
+    assert query_stats.threshold_seconds(stats, 0.005) == 0.005
+
+
+async def test_query_stats_endpoint_requires_internal_token(
+    base_client: AsyncClient,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(
+        get_settings(),
+        "INTERNAL_API_TOKEN",
+        SecretStr(INTERNAL_TOKEN),
+    )
+    monkeypatch.setattr(mysql.query_stats, "_statements", {})
+    stats = mysql.query_stats.statement(fingerprint_sql("SELECT 1"))
+    stats.observe(0.002, 1)
+
+    missing = await base_client.get("/internal/query-stats")
+    response = await base_client.get(
+        "/internal/query-stats",
+        headers={"X-Internal-Token": INTERNAL_TOKEN},
+    )
+
+    assert missing.status_code == 404
+    assert response.status_code == 200
+    (statement,) = response.json()["statements"]
+    assert statement["operation"] == "SELECT"
+    assert statement["count"] == 1
+    assert "/internal/query-stats" not in app.openapi()["paths"]
@@ -0,0 +1,105 @@
+from httpx import ASGITransport, AsyncClient
+from pydantic import SecretStr
+from sqlalchemy import create_engine
+
+from app.core.config import get_settings
+from app.core.request_context import RequestContext
+from app.db import mysql
+from app.db.query_trace import QueryTraceBuffer
+from app.db.slow_query import install_slow_query_logging
+from app.main import create_app
+
+
+INTERNAL_TOKEN = "internal-token-0123456789abcdef0123"
+
+
+def test_buffer_keeps_newest_traces_per_request() -> None:
+    buffer = QueryTraceBuffer(size=2)
+    first = RequestContext(request_id="first", method="GET", path="/a")
+    second = RequestContext(request_id="second", method="GET", path="/b")
+    buffer.record(first, "SELECT 1", 0.001, 1)
+    buffer.record(second, "SELECT\n  2", 0.002, -1)
+    buffer.record(second, "SELECT 3", 0.003, 1)
+
+    entries = buffer.entries(limit=10)
+    assert [entry.statement for entry in entries] == ["SELECT 3", "SELECT 2"]
+    assert entries[1].rowcount is None
+    assert [
+        entry.statement
+        for entry in buffer.entries(limit=1, request_id="second")
+    ] == ["SELECT 3"]
+
+
+async def test_sampled_requests_record_statements_with_request_id(
+    monkeypatch,
+) -> None:
+    settings = get_settings()
+    engine = create_engine("sqlite://")
+    buffer = QueryTraceBuffer(size=10)
+    install_slow_query_logging(
+        engine,
+        threshold_seconds=10,
+        query_trace=buffer,
+    )
+
+    async def get_items(sample_rate: float) -> str:
+        monkeypatch.setattr(
+            settings,
+            "DB_QUERY_TRACE_SAMPLE_RATE",
+            sample_rate,
+        )
+        app = create_app()
+
+        @app.get("/items")
+        def list_items() -> int:
+            with engine.connect() as connection:
+                return connection.exec_driver_sql("SELECT 1").scalar_one()
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test",
+        ) as client:
+            response = await client.get("/items")
+        return response.headers["x-request-id"]
+
+    await get_items(0)
+    assert buffer.entries(limit=10) == []
+
+    request_id = await get_items(1)
+    engine.dispose()
+
+    (entry,) = buffer.entries(limit=10)
+    assert (entry.request_id, entry.path) == (request_id, "/items")
+    assert entry.statement == "SELECT 1"
+    assert entry.rowcount is None
+
+
+async def test_query_traces_endpoint_filters_by_request_id(
+    base_client: AsyncClient,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(
+        get_settings(),
+        "INTERNAL_API_TOKEN",
+        SecretStr(INTERNAL_TOKEN),
+    )
+    buffer = QueryTraceBuffer(size=10)
+    monkeypatch.setattr(mysql.query_trace, "_traces", buffer._traces)
+    for request_id in ("first", "second"):
+        buffer.record(
+            RequestContext(request_id=request_id, method="GET", path="/a"),
+            "SELECT 1",
+            0.001,
+            1,
+        )
+
+    response = await base_client.get(
+        "/internal/query-traces",
+        params={"request_id": "second"},
+        headers={"X-Internal-Token": INTERNAL_TOKEN},
+    )
+
+    assert response.status_code == 200
+    (trace,) = response.json()["traces"]
+    assert trace["request_id"] == "second"
+    assert trace["operation"] == "SELECT"
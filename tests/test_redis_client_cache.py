@@ -0,0 +1,46 @@
+from app.db.redis import ClientSideCache
+
+
+def active_cache(max_entries: int = 10) -> ClientSideCache:
+    cache = ClientSideCache(
+        max_entries=max_entries,
+        prefixes=("auth:session:",),
+    )
+    cache.activate()
+    return cache
+
+
+def test_client_cache_serves_tracked_prefixes_only_while_active() -> None:
+    cache = active_cache()
+    assert cache.get("auth:session:a") is None
+    cache.put("auth:session:a", "payload")
+    cache.put("other:key", "ignored")
+
+    assert cache.get("auth:session:a") == "payload"
+    assert cache.get("other:key") is None
+    cache.deactivate()
+    assert cache.get("auth:session:a") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 0)
+
+
+def test_reads_that_race_an_invalidation_are_not_cached() -> None:
+    cache = active_cache()
+    assert cache.get("auth:session:a") is None
+    cache.invalidate(["auth:session:a"])
+    cache.put("auth:session:a", "stale")
+
+    assert cache.get("auth:session:a") is None
+
+
+def test_invalidations_remove_keys_and_flush_everything() -> None:
+    cache = active_cache(max_entries=2)
+    for key in ("auth:session:a", "auth:session:b", "auth:session:c"):
+        cache.get(key)
+        cache.put(key, key)
+    assert cache.stats().size == 2
+
+    cache.invalidate(["auth:session:c"])
+    assert cache.stats().invalidations == 1
+    cache.invalidate(None)
+    assert cache.stats().size == 0
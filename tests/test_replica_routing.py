@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.db import mysql
+from app.db.mysql import (
+    ReplicaRouter,
+    execute_read,
+    read_from_replica,
+    session_factory,
+)
+
+
+async def test_router_skips_lagging_replicas_and_falls_back_to_primary(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    replicas = [
+        create_async_engine("mysql+aiomysql://user@replica-a/db"),
+        create_async_engine("mysql+aiomysql://user@replica-b/db"),
+    ]
+    lags = {"replica-a": 0.2, "replica-b": 30.0}
+
+    async def fake_lag(replica):
+        return lags[replica.url.host]
+
+    monkeypatch.setattr(mysql, "_replica_lag_seconds", fake_lag)
+    router = ReplicaRouter(
+        replicas,
+        max_lag_seconds=1.0,
+        check_interval_seconds=60,
+    )
+
+    assert await router.choose() is replicas[0]
+    assert await router.choose() is replicas[0]
+
+    lags["replica-a"] = None
+    await router.check()
+    assert await router.choose() is None
+
+
+def test_replica_hosts_reuse_primary_credentials(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(
+        settings,
+        "DB_REPLICA_HOSTS",
+        "replica-a, replica-b:3307",
+    )
+
+    urls = settings.replica_database_urls
+
+    assert [(url.host, url.port) for url in urls] == [
+        ("replica-a", settings.DB_PORT),
+        ("replica-b", 3307),
+    ]
+    assert {url.database for url in urls} == {settings.DB_NAME}
+
+
+async def test_sessions_with_writes_never_read_from_replicas(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def choose():
+        raise AssertionError("replica must not be chosen")
+
+    monkeypatch.setattr(mysql.replica_router, "choose", choose)
+    db = session_factory()
+    db.info[mysql.HAS_WRITES_INFO_KEY] = True
+
+    assert await read_from_replica(db, select(1)) is None
+
+
+async def test_first_read_is_retried_once_after_stale_connection() -> None:
+    stale = DBAPIError(
+        "SELECT 1",
+        None,
+        Exception("gone away"),
+        connection_invalidated=True,
+    )
+    db = MagicMock()
+    db.in_transaction.return_value = False
+    db.execute = AsyncMock(side_effect=[stale, "result"])
+    db.rollback = AsyncMock()
+
+    assert await execute_read(db, select(1)) == "result"
+    db.rollback.assert_awaited_once()
+
+    db.in_transaction.return_value = True
+    db.execute = AsyncMock(side_effect=[stale, "result"])
+    with pytest.raises(DBAPIError):
+        await execute_read(db, select(1))
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+from app.services.session_cache import SessionCache
+
+
+def test_session_cache_evicts_least_recently_used_entry() -> None:
+    cache = SessionCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", user_id=1, value="session-a")
+    cache.put("b", user_id=1, value="session-b")
+    assert cache.get("a") == "session-a"
+
+    cache.put("c", user_id=2, value="session-c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "session-a"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 1, 1, 2)
+
+
+def test_session_cache_entries_expire_after_ttl() -> None:
+    cache = SessionCache(max_entries=10, ttl_seconds=5)
+    with patch("app.services.session_cache.monotonic", return_value=100.0):
+        cache.put("a", user_id=1, value="session-a")
+    with patch("app.services.session_cache.monotonic", return_value=105.0):
+        assert cache.get("a") is None
+
+    assert cache.stats().expirations == 1
+
+
+def test_invalidation_messages_remove_user_and_session_entries() -> None:
+    cache = SessionCache(max_entries=10, ttl_seconds=60)
+    cache.put("a", user_id=1, value="session-a")
+    cache.put("b", user_id=1, value="session-b")
+    cache.put("c", user_id=2, value="session-c")
+
+    cache.apply_invalidation("user:1")
+    cache.apply_invalidation("session:c")
+    cache.apply_invalidation("user:not-a-number")
+
+    assert cache.stats().size == 0
+    assert cache.stats().invalidations == 3
@@ -0,0 +1,78 @@
+import hashlib
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.auth import (
+    AuthenticationError,
+    decode_session_payload,
+    session_fingerprint,
+    session_keys,
+)
+from app.services.session_codec import (
+    benchmark_session_encoding,
+    encode_session_payload,
+    format_session_created_at,
+    session_key_for,
+    session_key_fingerprint,
+)
+
+
+DIGEST = hashlib.sha256(b"sess_example").hexdigest()
+CREATED_AT = 1_790_000_000
+
+
+def test_compact_key_is_shorter_and_keeps_the_fingerprint() -> None:
+    json_key = session_key_for(DIGEST, "json")
+    compact_key = session_key_for(DIGEST, "compact")
+
+    assert json_key == f"auth:session:{DIGEST}"
+    assert compact_key.startswith("auth:s:")
+    assert len(compact_key) == len("auth:s:") + 22
+    assert session_key_fingerprint(json_key) == session_fingerprint(DIGEST)
+    assert session_key_fingerprint(compact_key) == session_fingerprint(DIGEST)
+
+
+@pytest.mark.parametrize("encoding", ["json", "compact"])
+def test_payloads_decode_to_the_same_session(encoding) -> None:
+    payload = decode_session_payload(
+        encode_session_payload(
+            user_id=42,
+            session_version=3,
+            created_at=CREATED_AT,
+            encoding=encoding,
+        )
+    )
+
+    assert payload["user_id"] == 42
+    assert payload["session_version"] == 3
+    assert format_session_created_at(payload["created_at"]) == (
+        "2026-09-21T22:13:20"
+    )
+
+
+@pytest.mark.parametrize("raw_payload", ["not-json", "c1|42|x|1", "c1|42"])
+def test_malformed_payloads_are_rejected(raw_payload) -> None:
+    with pytest.raises(AuthenticationError):
+        decode_session_payload(raw_payload)
+
+
+def test_dual_read_also_checks_the_other_encoding(monkeypatch) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_SESSION_ENCODING", "compact")
+
+    assert session_keys(DIGEST) == [session_key_for(DIGEST, "compact")]
+
+    monkeypatch.setattr(settings, "AUTH_SESSION_DUAL_READ", True)
+    assert session_keys(DIGEST) == [
+        session_key_for(DIGEST, "compact"),
+        session_key_for(DIGEST, "json"),
+    ]
+
+
+def test_compact_encoding_uses_fewer_bytes_per_session() -> None:
+    json_result = benchmark_session_encoding("json", sessions=100)
+    compact_result = benchmark_session_encoding("compact", sessions=100)
+
+    assert compact_result.bytes_per_session < json_result.bytes_per_session
+    assert compact_result.decodes_per_second > 0
@@ -0,0 +1,35 @@
+from unittest.mock import AsyncMock, patch
+
+from app.services.session_reaper import reap_stale_sessions
+
+
+class EmptyPagesRedis:
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.scans = 0
+
+    async def scan(self, *, cursor: int, match: str, count: int):
+        self.scans += 1
+        self.pages -= 1
+        return (0 if self.pages <= 0 else cursor + 1), []
+
+
+async def test_scan_calls_without_matches_are_paced() -> None:
+    redis = EmptyPagesRedis(pages=4)
+    sleep = AsyncMock()
+
+    with patch("app.services.session_reaper.asyncio.sleep", sleep):
+        result = await reap_stale_sessions(
+            None,
+            redis,
+            batch_size=100,
+            max_keys_per_second=1000,
+        )
+
+    assert result.scanned == 0
+    # Four pages of the first prefix and one of the second; the last page
+    # of each prefix ends the walk without a pause.
+    assert redis.scans == 5
+    assert sleep.await_count == 3
+    for call in sleep.await_args_list:
+        assert 0 < call.args[0] <= 0.1
@@ -0,0 +1,83 @@
+import pytest
+
+from app.core.config import get_settings
+from app.services.session_refresh import SessionRefresher, session_needs_refresh
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis") -> None:
+        self.client = client
+        self.commands: list[tuple[str, int]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        return None
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.commands.append((key, seconds))
+
+    async def execute(self) -> list[bool]:
+        self.client.batches.append(sorted(self.commands))
+        return [True for _ in self.commands]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.batches: list[list[tuple[str, int]]] = []
+
+    def pipeline(self, *, transaction: bool) -> FakePipeline:
+        assert transaction is False
+        return FakePipeline(self)
+
+    async def aclose(self) -> None:
+        return None
+
+
+async def test_refreshes_are_coalesced_into_one_pipelined_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = FakeRedis()
+    monkeypatch.setattr(
+        "app.services.session_refresh.create_redis_client",
+        lambda: client,
+    )
+    refresher = SessionRefresher(ttl_seconds=600, batch_delay_seconds=60)
+
+    for key, user_id in (
+        ("auth:session:a", 1),
+        ("auth:session:b", 1),
+        ("auth:session:a", 1),
+        ("auth:session:c", 2),
+    ):
+        refresher.schedule(key, user_id=user_id)
+    await refresher.close()
+
+    assert client.batches == [
+        [
+            ("auth:session:a", 600),
+            ("auth:session:b", 600),
+            ("auth:session:c", 600),
+            ("auth:user-sessions:1", 600),
+            ("auth:user-sessions:2", 600),
+        ]
+    ]
+    stats = refresher.stats()
+    assert (stats.scheduled, stats.coalesced, stats.refreshed) == (3, 1, 3)
+
+
+def test_refresh_is_needed_only_below_threshold(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTH_SESSION_SLIDING_ENABLED", True)
+    monkeypatch.setattr(settings, "AUTH_SESSION_REFRESH_THRESHOLD_SECONDS", 60)
+
+    assert session_needs_refresh(59_999)
+    assert not session_needs_refresh(60_000)
+    assert not session_needs_refresh(-1)
+    assert not session_needs_refresh(None)
+
+    monkeypatch.setattr(settings, "AUTH_SESSION_SLIDING_ENABLED", False)
+    assert not session_needs_refresh(1)
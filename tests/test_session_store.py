@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+from app.services.session_store import MemorySessionStore
+
+
+MONOTONIC = "app.services.session_store.monotonic"
+
+
+async def store(
+    sessions: MemorySessionStore,
+    key: str,
+    *,
+    user_id: int = 1,
+    created_at_ms: int = 0,
+    max_sessions: int = 0,
+) -> list[str]:
+    return await sessions.store_session(
+        session_key=key,
+        payload=f"payload-{key}",
+        user_id=user_id,
+        ttl_seconds=60,
+        created_at_ms=created_at_ms,
+        max_sessions=max_sessions,
+    )
+
+
+async def test_memory_store_expires_and_sweeps_sessions() -> None:
+    sessions = MemorySessionStore()
+    with patch(MONOTONIC, return_value=100.0):
+        await store(sessions, "a")
+        await store(sessions, "b", user_id=2)
+        stored = await sessions.fetch_session(["missing", "a"], with_ttl=True)
+    assert (stored.key, stored.payload) == ("a", "payload-a")
+    assert stored.ttl_milliseconds == 60000
+
+    with patch(MONOTONIC, return_value=130.0):
+        await sessions.refresh_session("a", user_id=1)
+    with patch(MONOTONIC, return_value=170.0):
+        stored = await sessions.fetch_session(["b"], with_ttl=False)
+        assert stored.payload is None
+        assert len(sessions) == 1
+        assert sessions.sweep() == 0
+    with patch(MONOTONIC, return_value=1_000_000.0):
+        assert sessions.sweep() == 1
+    assert len(sessions) == 0
+
+
+async def test_memory_store_caps_and_purges_user_sessions() -> None:
+    sessions = MemorySessionStore()
+    for index, key in enumerate(("a", "b", "c")):
+        evicted = await store(
+            sessions,
+            key,
+            created_at_ms=index,
+            max_sessions=2,
+        )
+    await store(sessions, "other", user_id=2)
+
+    assert evicted == ["a"]
+    stored = await sessions.fetch_session(["a"], with_ttl=False)
+    assert stored.payload is None
+    await sessions.delete_session("b", user_id=1)
+    assert await sessions.purge_user_sessions(1) == 1
+    assert len(sessions) == 1
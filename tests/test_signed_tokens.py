@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.services.signed_tokens import (
+    RevocationList,
+    decode_signed_token,
+    issue_signed_token,
+)
+
+
+SIGNING_KEY = b"k" * 32
+
+
+class FakeRedis:
+    def __init__(self, revoked: list[str]) -> None:
+        self.revoked = revoked
+        self.reads = 0
+
+    async def zrangebyscore(self, _key: str, _min: int, _max: str) -> list[str]:
+        self.reads += 1
+        return list(self.revoked)
+
+
+def test_signed_token_round_trip_rejects_tampering() -> None:
+    token, claims = issue_signed_token(
+        user_id=42,
+        session_version=3,
+        ttl_seconds=600,
+        key=SIGNING_KEY,
+    )
+
+    assert token.startswith("sst_")
+    assert decode_signed_token(token, SIGNING_KEY) == claims
+    assert claims.expires_at - claims.issued_at == 600
+    assert decode_signed_token(token, b"x" * 32) is None
+    encoded_claims, signature = token.split(".")
+    tampered = f"{encoded_claims}x.{signature}"
+    assert decode_signed_token(tampered, SIGNING_KEY) is None
+    assert decode_signed_token("sst_not-a-token", SIGNING_KEY) is None
+    assert decode_signed_token("sst_é.é", SIGNING_KEY) is None
+
+
+async def test_revocation_list_reads_redis_once_per_interval() -> None:
+    redis = FakeRedis(["revoked-id"])
+    revocations = RevocationList(refresh_seconds=5)
+
+    with patch("app.services.signed_tokens.monotonic", return_value=100.0):
+        assert await revocations.contains(redis, "revoked-id")
+        assert not await revocations.contains(redis, "live-id")
+    assert redis.reads == 1
+
+    redis.revoked.append("live-id")
+    with patch("app.services.signed_tokens.monotonic", return_value=105.0):
+        assert await revocations.contains(redis, "live-id")
+    assert redis.reads == 2
+
+
+def test_signed_format_requires_a_signing_key() -> None:
+    with pytest.raises(ValidationError, match="AUTH_TOKEN_SIGNING_KEY"):
+        Settings(AUTH_TOKEN_FORMAT="signed", AUTH_TOKEN_SIGNING_KEY="short")
@@ -7,7 +7,7 @@ from app.db.slow_query import install_slow_query_logging
 
 
 def _logged_message(log) -> str:
-    return log.call_args.args[0] % log.call_args.args[1:]
+    return log.call_args.args[0] % log.call_args.args[1]
 
 
 def test_slow_query_never_logs_sql_text_or_parameters() -> None:
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+
+from app.db.statement_cache import (
+    compiled_cache_stats,
+    install_compiled_cache_metrics,
+    reset_compiled_cache_stats,
+)
+from app.models import AuthUser, Base, User
+from app.services.auth import (
+    ACCOUNT_BY_AUTH_ID,
+    IDENTITY_BY_USER_ID,
+    UserIdentity,
+    _identity_from_row,
+)
+
+
+CREATED_AT = datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_identity_lookups_reuse_compiled_statements() -> None:
+    engine = create_engine("sqlite://")
+    install_compiled_cache_metrics(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User).values(
+                id=7,
+                name="Admin",
+                session_version=3,
+                created_at=CREATED_AT,
+                updated_at=CREATED_AT,
+            )
+        )
+        connection.execute(
+            insert(AuthUser).values(
+                id=11,
+                user_id=7,
+                auth_id="scaffold.admin",
+                credential="credential",
+                created_at=CREATED_AT,
+                updated_at=CREATED_AT,
+            )
+        )
+
+    reset_compiled_cache_stats()
+    with engine.connect() as connection:
+        for user_id in (7, 8, 7):
+            rows = connection.execute(
+                IDENTITY_BY_USER_ID,
+                {"user_id": user_id},
+            ).all()
+        account = connection.execute(
+            ACCOUNT_BY_AUTH_ID,
+            {"auth_id": "scaffold.admin"},
+        ).one()
+    engine.dispose()
+
+    stats = compiled_cache_stats()
+    assert (stats.hits, stats.misses, stats.uncached) == (2, 2, 0)
+    assert stats.hit_ratio == 0.5
+    assert _identity_from_row(rows[0]) == UserIdentity(
+        id=7,
+        name="Admin",
+        auth_id="scaffold.admin",
+        disabled=False,
+        session_version=3,
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+    )
+    assert not hasattr(_identity_from_row(account), "__dict__")
+    assert (account.auth_user_id, account.credential) == (11, "credential")
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from app.services.auth import (
+    UserIdentity,
+    _decode_user_snapshot,
+    _encode_user_snapshot,
+)
+
+
+def test_user_snapshot_round_trip() -> None:
+    identity = UserIdentity(
+        id=7,
+        name="Scaffold Admin",
+        auth_id="scaffold.admin",
+        disabled=False,
+        session_version=3,
+        created_at=datetime(2026, 7, 25, 11, 44, 10, 329974),
+        updated_at=datetime(2026, 7, 25, 11, 44, 10, 329980),
+    )
+
+    assert _decode_user_snapshot(_encode_user_snapshot(identity)) == identity
+
+
+def test_malformed_user_snapshot_is_treated_as_missing() -> None:
+    assert _decode_user_snapshot("not-json") is None
+    assert _decode_user_snapshot('{"id":7}') is None